@@ -46,7 +46,7 @@ import Utils
 ###############################################################################
 class Poison(object):
 	# Initialization
-	def __init__(self, mode=None, debug=False, verbose=False, config_path=None, generate_image=False, generate_music=False, generate_video=False):
+	def __init__(self, mode=None, debug=False, verbose=False, config_path=None, generate_image=False, generate_music=False, generate_video=False, cache=None):
 		self.mode = None
 
 		if mode is None:
@@ -69,6 +69,9 @@ class Poison(object):
 		self.generate_music = generate_music
 		self.generate_video = generate_video
 
+		# PoisonCache for get_asset, None generates every time
+		self.cache = cache
+
 		# Image Filter Variables
 		self.max_percent = None
 		self.max_threshold = None
@@ -117,6 +120,69 @@ class Poison(object):
 			from PoisonVideo import PoisonVideo
 			self.video = PoisonVideo(mode=self.mode, debug=self.debug, verbose=self.verbose, config=self.config)
 
+	# Generate Batch
+	def generate_batch(self, n, media="image", workers=None, chunksize=1, max_in_flight=None, **kwargs):
+		""" Generate Batch
+			:description:	Generates n assets of the given media type across a process pool, yielding as they complete
+			:param n:				int
+			:param media:			str 		"image" or "video"
+			:param workers:			int | None
+			:param chunksize:		int 		images only
+			:param max_in_flight:	int | None
+			:param kwargs:			dict 		forwarded to the media generator
+			:return results:		generator
+		"""
+		if media == "image":
+			if not self.generate_image:
+				raise Exception("Image generation is not enabled")
+
+			return self.image.generate_images(n, workers=workers, chunksize=chunksize, max_in_flight=max_in_flight, **kwargs)
+
+		if media == "video":
+			if not self.generate_video:
+				raise Exception("Video generation is not enabled")
+
+			return self.video.generate_videos(n, workers=workers, max_in_flight=max_in_flight, **kwargs)
+
+		raise Exception(f"Batch generation for {media} not implemented")
+
+	# Get Asset
+	def get_asset(self, media="image", seed=0, path=None, **kwargs):
+		""" Get Asset
+			:description:	Deterministic asset for (seed, mode, parameters), served from the cache when it is there
+			:param media:	str 		"image" or "music"
+			:param seed:	int
+			:param path:	str | None 	where to generate when there is no cache
+			:param kwargs:	dict 		forwarded to the media generator
+			:return path:	str
+		"""
+		if media == "image":
+			if not self.generate_image:
+				raise Exception("Image generation is not enabled")
+
+			generator = self.image
+			generate = lambda base_path, name: self.image.generate_image_simple(path=base_path, seed=seed, name=name, **kwargs)
+
+		elif media == "music":
+			if not self.generate_music:
+				raise Exception("Music generation is not enabled")
+
+			kwargs = dict({"octave_range": self.octave_range, "key": self.musical_key, "key_type": self.key_type, "num_notes": self.num_notes,
+						   "max_note_duration": self.max_note_duration, "song_duration": self.song_duration, "extension": self.song_extension}, **kwargs)
+
+			generator = self.music
+			generate = lambda base_path, name: self.music.generate_music_simple(base_path=base_path, seed=seed, name=name, **kwargs)
+
+		else:
+			raise Exception(f"Asset generation for {media} not implemented")
+
+		key = generator.get_key(seed, **kwargs)
+
+		if self.cache is None:
+			return generate(path if path is not None else os.getcwd(), key)
+
+		return self.cache.get_or_create(key, lambda: generate(self.cache.path, key))
+
 	# Save Config
 	def save_config(self):
 		with open(config_path, mode="w", encoding="utf-8") as f:
@@ -174,6 +240,7 @@ class Poison(object):
 				self.octave_range = "middle"
 				self.musical_key = "C"
 				self.key_type = "major"
+				# 100 notes of up to 100 beats at 600 samples a beat, about 1.1 minutes
 				self.num_notes = 100
 				self.max_note_duration = 100
 				self.song_duration = 600
@@ -191,9 +258,10 @@ class Poison(object):
 				self.octave_range = "middle"
 				self.musical_key = "C"
 				self.key_type = "major"
-				self.num_notes = 1000
-				self.max_note_duration = 250
-				self.song_duration = 6000
+				# About 2.3 minutes
+				self.num_notes = 200
+				self.max_note_duration = 100
+				self.song_duration = 600
 				self.song_extension = "wav"
 
 		elif self.mode.lower() == "heavy":
@@ -208,9 +276,10 @@ class Poison(object):
 				self.octave_range = "middle"
 				self.musical_key = "C"
 				self.key_type = "major"
-				self.num_notes = 1000
-				self.max_note_duration = 500
-				self.song_duration = 60000
+				# About 4.6 minutes
+				self.num_notes = 400
+				self.max_note_duration = 100
+				self.song_duration = 600
 				self.song_extension = "wav"
 
 		else:
@@ -268,7 +337,8 @@ if __name__ == "__main__":
 				start_time = time.thread_time()
 				print(f"\nGenerating music #{index}")
 
-			music_file = poison.music.generate_music_simple(key=poison.musical_key, key_type=poison.key_type, octave_range=poison.octave_range, song_duration=poison.song_duration)
+			music_file = poison.music.generate_music_simple(key=poison.musical_key, key_type=poison.key_type, octave_range=poison.octave_range,
+															num_notes=poison.num_notes, max_note_duration=poison.max_note_duration, song_duration=poison.song_duration)
 
 			if poison.debug:
 				elapsed_time = time.thread_time() - start_time
@@ -0,0 +1,162 @@
+###############################################################################
+# Program : Poison
+# File : PoisonCache.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Size bounded on-disk LRU cache of generated assets.
+#
+# Assets are stored under their content key (see Utils.generate_key), so
+# an evicted asset is simply regenerated from the same seed and parameters
+# the next time it is asked for. Recency survives restarts through the
+# files' modification times, which are bumped on every hit.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import os, threading
+from collections import OrderedDict
+
+
+###############################################################################
+# Constants
+###############################################################################
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+###############################################################################
+# Classes
+###############################################################################
+
+# Poison Cache Class
+class PoisonCache(object):
+	def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES, debug=False):
+		""" Initialize
+			:description:	LRU cache of asset files keyed by their content key
+			:param path:		str | None 	cache root, generators write into its Images / Music / Videos folders
+			:param max_bytes:	int 		total size kept on disk
+			:param debug:		bool
+		"""
+		self.path = path if path is not None else os.path.join(os.getcwd(), "Cache")
+		self.max_bytes = max_bytes
+		self.debug = debug
+
+		if not os.path.isdir(self.path):
+			os.makedirs(self.path)
+
+		self.lock = threading.Lock()
+		self.entries = OrderedDict()
+		self.total_bytes = 0
+
+		self.load()
+
+	def __contains__(self, key):
+		with self.lock:
+			return key in self.entries
+
+	def __len__(self):
+		with self.lock:
+			return len(self.entries)
+
+	# Load
+	def load(self):
+		""" Load
+			:description:	Rebuilds the index from the files under path, least recently used first
+		"""
+		list_of_files = []
+
+		for root, _, file_names in os.walk(self.path):
+			for file_name in file_names:
+				file_path = os.path.join(root, file_name)
+				stat = os.stat(file_path)
+				list_of_files.append((stat.st_mtime, os.path.splitext(file_name)[0], file_path, stat.st_size))
+
+		with self.lock:
+			self.entries.clear()
+			self.total_bytes = 0
+
+			for _, key, file_path, size in sorted(list_of_files):
+				self.entries[key] = (file_path, size)
+				self.total_bytes += size
+
+			self.evict()
+
+	# Get
+	def get(self, key):
+		""" Get
+			:description:	Path of a cached asset, marking it as most recently used
+			:param key:		str
+			:return path:	str | None
+		"""
+		with self.lock:
+			if key not in self.entries:
+				return None
+
+			file_path, _ = self.entries[key]
+
+			if not os.path.isfile(file_path):
+				self.remove(key)
+				return None
+
+			self.entries.move_to_end(key)
+			os.utime(file_path)
+
+			return file_path
+
+	# Put
+	def put(self, key, file_path):
+		""" Put
+			:description:	Adds a generated file and evicts the least recently used ones past max_bytes
+			:param key:			str
+			:param file_path:	str 	should live under path so it is found again by load
+			:return path:		str
+		"""
+		with self.lock:
+			if key in self.entries:
+				self.remove(key, delete=self.entries[key][0] != file_path)
+
+			size = os.path.getsize(file_path)
+
+			self.entries[key] = (file_path, size)
+			self.total_bytes += size
+
+			self.evict()
+
+		return file_path
+
+	# Get Or Create
+	def get_or_create(self, key, create):
+		""" Get Or Create
+			:description:	Cached path, or the path returned by create() after adding it to the cache
+			:param key:		str
+			:param create:	callable 	generates the asset and returns its path
+			:return path:	str
+		"""
+		file_path = self.get(key)
+
+		if file_path is not None:
+			return file_path
+
+		return self.put(key, create())
+
+	# Remove
+	def remove(self, key, delete=True):
+		file_path, size = self.entries.pop(key)
+		self.total_bytes -= size
+
+		if delete and os.path.isfile(file_path):
+			os.remove(file_path)
+
+	# Evict
+	def evict(self):
+		# The newest entry stays even when it alone is over budget, it was just asked for
+		while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+			key = next(iter(self.entries))
+
+			if self.debug:
+				print(f"Evicting {key} from cache")
+
+			self.remove(key)
@@ -0,0 +1,276 @@
+###############################################################################
+# Program : Poison
+# File : PoisonFilter.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Filter cost model.
+#
+# Every filter is timed once on a small canvas on this host and fitted to
+# a cost per pixel that grows with its radius or size. The sampler uses the
+# fit to keep a filter inside the per image budget, running it at reduced
+# resolution (with its radius or size scaled to match) when the full size
+# run would not fit, and dropping it only when nothing fits.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import json, time
+
+from PIL import Image
+
+import numpy as np
+
+import PoisonPlan
+
+
+###############################################################################
+# Constants
+###############################################################################
+DICT_OF_FILTER_PARAMETERS = {"box_blur": "radius",
+							 "gaussian_blur": "radius",
+							 "unsharp_mask": "radius",
+							 "rank_filter": "size",
+							 "median_filter": "size",
+							 "min_filter": "size",
+							 "max_filter": "size",
+							 "mode_filter": "size"
+}
+
+# Cost per pixel is fitted as a polynomial of the parameter, blurs are close to flat, rank filters grow with the window area
+DICT_OF_PARAMETER_DEGREES = {"radius": 1, "size": 2}
+
+DICT_OF_CALIBRATION_VALUES = {"radius": [1, 8, 32, 64], "size": [3, 5, 7, 9]}
+
+# PIL rank filters need an odd size and crash the interpreter on size 1
+LIST_OF_RANK_FILTERS = ["rank_filter", "median_filter", "min_filter", "max_filter"]
+
+MIN_RANK_SIZE = 3
+
+CALIBRATION_SIZE = (128, 128)
+
+CALIBRATION_REPEATS = 2
+
+MAX_DOWNSCALE = 16
+
+RESIZE_KEY = "resize"
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Calibration Attributes
+def calibration_attributes(name, value):
+	if name == "unsharp_mask":
+		return {'radius': value, 'percent': 150, 'threshold': 3}
+
+	elif name == "rank_filter":
+		return {'size': value, 'rank': value * value // 2}
+
+	elif DICT_OF_FILTER_PARAMETERS.get(name) == "radius":
+		return {'radius': value}
+
+	elif DICT_OF_FILTER_PARAMETERS.get(name) == "size":
+		return {'size': value}
+
+	return {}
+
+# Scale Attributes
+def scale_attributes(name, attributes, downscale):
+	""" Scale Attributes
+		:description:	Copy of a filter's attributes for a run on an image shrunk by downscale
+		:param name:		str
+		:param attributes:	dict
+		:param downscale:	int
+		:return attributes:	dict
+	"""
+	scaled = dict(attributes)
+	scaled['downscale'] = downscale
+
+	if DICT_OF_FILTER_PARAMETERS.get(name) == "radius":
+		scaled['radius'] = attributes['radius'] / downscale
+
+	elif DICT_OF_FILTER_PARAMETERS.get(name) == "size":
+		size = max(1, round(attributes['size'] / downscale))
+
+		if name in LIST_OF_RANK_FILTERS:
+			size = max(MIN_RANK_SIZE, size + 1 - size % 2)
+
+		scaled['size'] = size
+
+		if 'rank' in attributes:
+			scaled['rank'] = min(attributes['rank'] // (downscale * downscale), size * size - 1)
+
+	return scaled
+
+# Time Call
+def time_call(fn, repeats=CALIBRATION_REPEATS):
+	best = None
+
+	for _ in range(repeats):
+		start_time = time.perf_counter()
+		fn()
+		elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+		best = elapsed_ms if best is None else min(best, elapsed_ms)
+
+	return best
+
+
+###############################################################################
+# Classes
+###############################################################################
+
+# Filter Cost Model Class
+class FilterCostModel(object):
+	def __init__(self, coefficients=None):
+		""" Initialize
+			:description:	Per filter cost in milliseconds, keyed by filter name, parameter and image area
+			:param coefficients:	dict | None 	filter name -> polynomial coefficients of the cost per pixel
+		"""
+		self.coefficients = dict(coefficients) if coefficients is not None else {}
+
+	# Calibrate
+	def calibrate(self, names=None):
+		""" Calibrate
+			:description:	Times each filter on a CALIBRATION_SIZE canvas and fits its cost per pixel
+			:param names:	list | None 	filters to calibrate, defaults to every filter PoisonPlan can build
+			:return self:	FilterCostModel
+		"""
+		if names is None:
+			names = list(PoisonPlan.DICT_OF_FILTER_BUILDERS)
+
+		rng = np.random.default_rng(0)
+		image = Image.fromarray(rng.integers(0, 256, size=(CALIBRATION_SIZE[1], CALIBRATION_SIZE[0], 3), dtype=np.uint8))
+		area = CALIBRATION_SIZE[0] * CALIBRATION_SIZE[1]
+
+		if RESIZE_KEY not in self.coefficients:
+			small_size = (CALIBRATION_SIZE[0] // 2, CALIBRATION_SIZE[1] // 2)
+			resize_ms = time_call(lambda: image.resize(small_size, resample=Image.Resampling.BILINEAR).resize(image.size, resample=Image.Resampling.BILINEAR))
+			self.coefficients[RESIZE_KEY] = [resize_ms / area]
+
+		for name in names:
+			parameter = DICT_OF_FILTER_PARAMETERS.get(name)
+
+			# ImageFilter.Kernel only takes 3x3 and 5x5, sampled kernels are bigger and fail without doing any work
+			if name == "kernel":
+				self.coefficients[name] = [0.0]
+				continue
+
+			if parameter is None:
+				self.coefficients[name] = [time_call(lambda: PoisonPlan.filter_image(image, name, {})) / area]
+				continue
+
+			values = DICT_OF_CALIBRATION_VALUES[parameter]
+			costs = [time_call(lambda: PoisonPlan.filter_image(image, name, calibration_attributes(name, value))) / area for value in values]
+
+			design = np.vander(np.array(values, dtype=np.float64), DICT_OF_PARAMETER_DEGREES[parameter] + 1, increasing=True)
+			fitted = np.linalg.lstsq(design, np.array(costs), rcond=None)[0]
+
+			# Timing noise can tilt a fit negative, a filter never gets cheaper with a bigger window
+			self.coefficients[name] = np.maximum(fitted, 0.0).tolist()
+
+		return self
+
+	# Prepare
+	def prepare(self, names=None):
+		""" Prepare
+			:description:	Calibrates the filters in names that have no fit yet, so the timing runs happen before a render's deadline starts
+			:param names:	list | None 	filter names as in a plan, defaults to every filter PoisonPlan can build
+			:return self:	FilterCostModel
+		"""
+		if names is None:
+			names = list(PoisonPlan.DICT_OF_FILTER_BUILDERS)
+
+		missing = [name for name in dict.fromkeys(names) if name not in self.coefficients]
+
+		if missing or RESIZE_KEY not in self.coefficients:
+			self.calibrate(missing)
+
+		return self
+
+	# Get Coefficients
+	def get_coefficients(self, name):
+		if name not in self.coefficients:
+			self.calibrate([name])
+
+		return self.coefficients[name]
+
+	# Estimate
+	def estimate_ms(self, name, attributes, height, width):
+		""" Estimate
+			:description:	Predicted run time of one filter op
+			:param name:		str
+			:param attributes:	dict 	as produced by get_filter_attributes, optionally scaled
+			:param height:		int
+			:param width:		int
+			:return cost:		float 	milliseconds
+		"""
+		downscale = attributes.get('downscale', 1)
+		area = height * width
+		parameter = DICT_OF_FILTER_PARAMETERS.get(name)
+		value = attributes[parameter] if parameter is not None else 0
+
+		coefficients = self.get_coefficients(name)
+		cost = area / (downscale * downscale) * sum(coefficient * value ** power for power, coefficient in enumerate(coefficients))
+
+		if downscale > 1:
+			cost += area * self.get_coefficients(RESIZE_KEY)[0]
+
+		return cost
+
+	# Fit Attributes
+	def fit_attributes(self, name, attributes, height, width, budget_ms=None):
+		""" Fit Attributes
+			:description:	Keeps a filter inside budget_ms, downscaling it if needed
+			:param name:		str
+			:param attributes:	dict
+			:param height:		int
+			:param width:		int
+			:param budget_ms:	float | None 	None leaves the attributes untouched
+			:return result:		tuple 	(attributes, estimated ms), attributes is None when the filter cannot fit
+		"""
+		if budget_ms is None:
+			return attributes, 0.0
+
+		cost = self.estimate_ms(name, attributes, height, width)
+
+		if cost <= budget_ms:
+			return attributes, cost
+
+		# Fixed kernels act on single pixels, shrinking the image would change what they look like
+		if name not in DICT_OF_FILTER_PARAMETERS:
+			return None, 0.0
+
+		for downscale in range(2, min(MAX_DOWNSCALE, height, width) + 1):
+			scaled = scale_attributes(name, attributes, downscale)
+			cost = self.estimate_ms(name, scaled, height, width)
+
+			if cost <= budget_ms:
+				return scaled, cost
+
+		return None, 0.0
+
+	def to_dict(self):
+		return dict(self.coefficients)
+
+	@staticmethod
+	def from_dict(coefficients):
+		return FilterCostModel(coefficients)
+
+	def save(self, file_path):
+		with open(file_path, mode="w", encoding="utf-8") as f:
+			f.write(json.dumps(self.to_dict()))
+
+	@staticmethod
+	def load(file_path):
+		with open(file_path, mode="r", encoding="utf-8") as f:
+			return FilterCostModel.from_dict(json.loads(f.read()))
+
+
+# Shared by every PoisonImage of the process, so calibration is paid once rather than per instance
+COST_MODEL = FilterCostModel()
@@ -10,17 +10,17 @@
 ###############################################################################
 # Imports
 ###############################################################################
-import os, random, signal
-from collections import OrderedDict
+import os, io, random
 from itertools import zip_longest
+from concurrent.futures import ProcessPoolExecutor
 
-from PIL import Image, ImageDraw, ImageColor, ImageFilter
+from PIL import Image, ImageDraw, ImageColor
 from PIL.ExifTags import Base as ExifTags
 
-import skimage
 import numpy as np
 
 from Poison import Utils
+import PoisonFilter, PoisonNoise, PoisonPlan, PoisonRaster, PoisonRing
 
 
 ###############################################################################
@@ -46,6 +46,14 @@ LIGHT_MODE_EXCLUDED_FILTERS = ["rank_filter", "median_filter", "min_filter", "ma
 
 MEDIUM_MODE_EXCLUDED_FILTERS = ["rank_filter", "median_filter", "min_filter", "max_filter", "mode_filter"]
 
+DICT_OF_IMAGE_FORMATS = {"jpg": "JPEG", "png": "PNG"}
+
+# Decoding one of these gives back the exact pixels, so encoding between noise stages changes nothing
+LIST_OF_LOSSLESS_EXTENSIONS = ["png"]
+
+# Share of a render's deadline its filters may use
+FILTER_BUDGET_FRACTION = 0.5
+
 LIST_OF_SHAPES = [x for x in LIST_OF_SHAPES if x not in NOT_IMPLEMENTED_SHAPES]
 
 LIST_OF_FILTERS = [x for x in LIST_OF_FILTERS if x not in NOT_IMPLEMENTED_FILTERS]
@@ -61,307 +69,369 @@ DICT_OF_COLORS = {"pride": [(288, 3, 3), (255, 140, 0), (255, 237, 0), (0, 128,
 				  "nonbinary": [(252, 244, 52), (255, 255, 255), (156, 89, 209), (44, 44, 44)]
 }
 
-TIME_OUT = 1
-
 
 ###############################################################################
 # Helper Functions
 ###############################################################################
 
-def timeout_handler(signum, frame):
-	raise TimeoutError("Rendering function timed out.")
-
-
-# Get Shape Attributes
-def get_shape_attributes(height, width, shape, points, density=2):
-	shape_attributes = OrderedDict()
+# Sample Box
+def sample_box(rng, count, height, width):
+	x = np.sort(rng.integers(0, height + 1, size=(count, 2)), axis=1)
+	y = np.sort(rng.integers(0, width + 1, size=(count, 2)), axis=1)
+
+	return np.stack([x[:, 0], y[:, 0], x[:, 1], y[:, 1]], axis=1)
+
+# Sample Span
+def sample_span(rng, length, gap):
+	# Closed form draw of 0 <= lo, lo + gap <= hi <= length without rejection
+	gap = np.minimum(gap, length)
+	lo = rng.integers(0, length - gap + 1)
+	hi = lo + gap + rng.integers(0, length - lo - gap + 1)
+
+	return lo, hi
+
+# Sample Shape Attributes
+def sample_shape_attributes(height, width, shape, count, density=2, rng=None):
+	""" Sample Shape Attributes
+		:description:	Draws the attributes of count shapes of one kind in a single call
+		:param height:		int 	canvas extent along x
+		:param width:		int 	canvas extent along y
+		:param shape:		str 	entry of LIST_OF_SHAPES
+		:param count:		int
+		:param density:		int
+		:param rng:			np.random.Generator | None
+		:return attributes:	dict 	name -> np.ndarray with count rows
+	"""
+	if rng is None:
+		rng = np.random.default_rng()
+
+	limit = min(height, width)
+	w = max(limit // density, 2)
 
 	if shape == "line":
-		w = max(min(height, width) // density, 2)
-		shape_attributes.update({'x0': random.randint(0, height)})
-		shape_attributes.update({'y0': random.randint(0, width)})
-		shape_attributes.update({'x1': random.randint(0, height)})
-		shape_attributes.update({'y1': random.randint(0, width)})
-		shape_attributes.update({'w': random.randint(1, w)})
-	
-	elif shape == "curve":
-		x = list(random.randint(0, height) for _ in range(points))
-		y = list(random.randint(0, width) for _ in range(points))
-		w = max(min(height, width) // density, 2)
-
-		for index, coordinate in enumerate(zip(x, y)):
-			shape_attributes.update({f'x{index}': coordinate[0]})
-			shape_attributes.update({f'y{index}': coordinate[1]})
-
-		shape_attributes.update({'w': random.randint(1, w)})
+		xy = np.stack([rng.integers(0, height + 1, size=count), rng.integers(0, width + 1, size=count),
+					   rng.integers(0, height + 1, size=count), rng.integers(0, width + 1, size=count)], axis=1)
+		shape_attributes = {'xy': xy, 'w': rng.integers(1, w + 1, size=count)}
+
+	elif shape in ["curve", "polygon"]:
+		xy = np.empty((count, 10, 2), dtype=np.int64)
+		xy[..., 0] = rng.integers(0, height + 1, size=(count, 10))
+		xy[..., 1] = rng.integers(0, width + 1, size=(count, 10))
+		shape_attributes = {'xy': xy.reshape(count, 20),
+							'points': rng.integers(3, 11, size=count),
+							'w': rng.integers(1, w + 1, size=count)}
 
 	elif shape == "circle":
-		r = max(min(height, width) // density, 2)
-		w = max(min(height, width) // density, 2)
-		shape_attributes.update({'x0': random.randint(0, height)})
-		shape_attributes.update({'y0': random.randint(0, width)})
-		shape_attributes.update({'r': random.randint(1, r)})
-		shape_attributes.update({'w': random.randint(1, w)})
+		shape_attributes = {'xy': np.stack([rng.integers(0, height + 1, size=count), rng.integers(0, width + 1, size=count)], axis=1),
+							'r': rng.integers(1, w + 1, size=count),
+							'w': rng.integers(1, w + 1, size=count)}
 
 	elif shape == "arc":
-		x = sorted([random.randint(0, height) for _ in range(2)])
-		y = sorted([random.randint(0, width) for _ in range(2)])
-
-		shape_attributes.update({'x0': x[0]})
-		shape_attributes.update({'y0': y[0]})
-		shape_attributes.update({'x1': x[1]})
-		shape_attributes.update({'y1': y[1]})
-		shape_attributes.update({'start': random.uniform(0, 360)})
-		shape_attributes.update({'end': random.uniform(0, 360)})
-		shape_attributes.update({'w': random.randint(0, min(height, width) // density)})
-
-	elif shape == "chord":
-		x = sorted([random.randint(0, height) for _ in range(2)])
-		y = sorted([random.randint(0, width) for _ in range(2)])
-		w = max(min(height, width) // density, 2)
-
-		shape_attributes.update({'x0': x[0]})
-		shape_attributes.update({'y0': y[0]})
-		shape_attributes.update({'x1': x[1]})
-		shape_attributes.update({'y1': y[1]})
-		shape_attributes.update({'start': random.uniform(0, 360)})
-		shape_attributes.update({'end': random.uniform(0, 360)})
-		shape_attributes.update({'w': random.randint(1, w)})
-
-	elif shape == "ellipse":
-		x = sorted([random.randint(0, height) for _ in range(2)])
-		y = sorted([random.randint(0, width) for _ in range(2)])
-		w = max(min(height, width) // density, 2)
-
-		shape_attributes.update({'x0': x[0]})
-		shape_attributes.update({'y0': y[0]})
-		shape_attributes.update({'x1': x[1]})
-		shape_attributes.update({'y1': y[1]})
-		shape_attributes.update({'w': random.randint(1, w)})
-
-	elif shape == "pieslice":
-		x = sorted([random.randint(0, height) for _ in range(2)])
-		y = sorted([random.randint(0, width) for _ in range(2)])
-		w = max(min(height, width) // density, 2)
-
-		shape_attributes.update({'x0': x[0]})
-		shape_attributes.update({'y0': y[0]})
-		shape_attributes.update({'x1': x[1]})
-		shape_attributes.update({'y1': y[1]})
-		shape_attributes.update({'start': random.uniform(0, 360)})
-		shape_attributes.update({'end': random.uniform(0, 360)})
-		shape_attributes.update({'w': random.randint(1, w)})
-
-	elif shape == "point":
-		shape_attributes.update({'x0': random.randint(0, height)})
-		shape_attributes.update({'y0': random.randint(0, width)})
+		shape_attributes = {'xy': sample_box(rng, count, height, width),
+							'start': rng.uniform(0, 360, size=count),
+							'end': rng.uniform(0, 360, size=count),
+							'w': rng.integers(0, limit // density + 1, size=count)}
 
-	elif shape == "polygon":
-		x = list(random.randint(0, height) for _ in range(points))
-		y = list(random.randint(0, width) for _ in range(points))
-		w = max(min(height, width) // density, 2)
+	elif shape in ["chord", "pieslice"]:
+		shape_attributes = {'xy': sample_box(rng, count, height, width),
+							'start': rng.uniform(0, 360, size=count),
+							'end': rng.uniform(0, 360, size=count),
+							'w': rng.integers(1, w + 1, size=count)}
 
-		for index, coordinate in enumerate(zip(x, y)):
-			shape_attributes.update({f'x{index}': coordinate[0]})
-			shape_attributes.update({f'y{index}': coordinate[1]})
+	elif shape in ["ellipse", "rectangle"]:
+		shape_attributes = {'xy': sample_box(rng, count, height, width),
+							'w': rng.integers(1, w + 1, size=count)}
 
-		shape_attributes.update({'w': random.randint(1, w)})
+	elif shape == "point":
+		shape_attributes = {'xy': np.stack([rng.integers(0, height + 1, size=count), rng.integers(0, width + 1, size=count)], axis=1)}
 
 	elif shape == "regular_polygon":
-		w = max(min(height, width) // density, 2)
-		shape_attributes.update({'bounding_circle': (random.randint(0, height), random.randint(0, width), random.randint(1, min(height, width)))})
-		shape_attributes.update({'n_sides': random.randint(3, max(density, 4))})
-		shape_attributes.update({'rotation': random.uniform(0, 360)})
-		shape_attributes.update({'w': random.randint(1, w)})
-
-	elif shape == "rectangle":
-		x = sorted([random.randint(0, height) for _ in range(2)])
-		y = sorted([random.randint(0, width) for _ in range(2)])
-		w = max(min(height, width) // density, 2)
-		shape_attributes.update({'x0': x[0]})
-		shape_attributes.update({'y0': y[0]})
-		shape_attributes.update({'x1': x[1]})
-		shape_attributes.update({'y1': y[1]})
-		shape_attributes.update({'w': random.randint(1, w)})
+		shape_attributes = {'bounding_circle': np.stack([rng.integers(0, height + 1, size=count), rng.integers(0, width + 1, size=count),
+														 rng.integers(1, max(limit, 1) + 1, size=count)], axis=1),
+							'n_sides': rng.integers(3, max(density, 4) + 1, size=count),
+							'rotation': rng.uniform(0, 360, size=count),
+							'w': rng.integers(1, w + 1, size=count)}
 
 	elif shape == "rounded_rectangle":
-		r = random.randint(1, max(min(height, width) // density, 2))
-		w = max(min(height, width) // density, 2)
-		x = [0, 0]
-		y = [0, 0]
-		while not (x[0] + r + 1 <= x[1] - r - 1):
-			x = sorted([random.randint(0, height) for _ in range(2)])
-		while not (y[0] + r + 1 <= y[1] - r - 1):
-			y = sorted([random.randint(0, width) for _ in range(2)])
-
-		shape_attributes.update({'x0': x[0]})
-		shape_attributes.update({'y0': y[0]})
-		shape_attributes.update({'x1': x[1]})
-		shape_attributes.update({'y1': y[1]})
-		shape_attributes.update({'w': random.randint(1, w)})
-		shape_attributes.update({'r': r})
-		shape_attributes.update({'corners': (random.randint(0,1), random.randint(0,1), random.randint(0,1), random.randint(0,1))})
-
-	return shape_attributes
-
-# Select Filter
-def select_filter(filt, radius, size, percent, threshold, kernel, scale, offset, rank):
-	if filt == "blur":
-		cmd = "image.filter(ImageFilter.BLUR)"
-
-	elif filt == "contour":
-		cmd = "image.filter(ImageFilter.CONTOUR)"
-
-	elif filt == "detail":
-		cmd = "image.filter(ImageFilter.DETAIL)"
-
-	elif filt == "edge_enhance":
-		cmd = "image.filter(ImageFilter.EDGE_ENHANCE)"
+		# The radius is capped so that both sides can fit 2 * r + 2, which keeps every draw valid
+		r = rng.integers(1, max(min(w, (limit - 2) // 2), 1) + 1, size=count)
+		x0, x1 = sample_span(rng, height, 2 * r + 2)
+		y0, y1 = sample_span(rng, width, 2 * r + 2)
+		shape_attributes = {'xy': np.stack([x0, y0, x1, y1], axis=1),
+							'w': rng.integers(1, w + 1, size=count),
+							'r': r,
+							'corners': rng.integers(0, 2, size=(count, 4))}
 
-	elif filt == "edge_enhance_more":
-		cmd = "image.filter(ImageFilter.EDGE_ENHANCE_MORE)"
-
-	elif filt == "emboss":
-		cmd = "image.filter(ImageFilter.EMBOSS)"
-
-	elif filt == "find_edges":
-		cmd = "image.filter(ImageFilter.FIND_EDGES)"
+	else:
+		raise Exception(f'{shape} not implemented')
 
-	elif filt == "sharpen":
-		cmd = "image.filter(ImageFilter.SHARPEN)"
+	return shape_attributes
 
-	elif filt == "smooth":
-		cmd = "image.filter(ImageFilter.SMOOTH)"
+# Get Shape Attributes
+def get_shape_attributes(height, width, shape, count, density=2, rng=None):
+	""" Get Shape Attributes
+		:description:	Batched sample_shape_attributes converted to one draw-ready dict per shape
+		:return list_of_attributes:	list
+	"""
+	columns = {key: value.tolist() for key, value in sample_shape_attributes(height, width, shape, count, density, rng).items()}
 
-	elif filt == "smooth_more":
-		cmd = "image.filter(ImageFilter.SMOOTH_MORE)"
+	points = columns.pop('points', None)
 
-	elif filt == "box_blur":
-		cmd = f"image.filter(ImageFilter.BoxBlur(radius={radius}))"
+	for key in ['bounding_circle', 'corners']:
+		if key in columns:
+			columns[key] = [tuple(value) for value in columns[key]]
 
-	elif filt == "gaussian_blur":
-		cmd = f"image.filter(ImageFilter.GaussianBlur(radius={radius}))"
+	list_of_attributes = [dict(zip(columns, row)) for row in zip(*columns.values())]
 
-	elif filt == "unsharp_mask":
-		cmd = f"image.filter(ImageFilter.UnsharpMask(radius={radius}, percent={percent}, threshold={threshold}))"
+	if points is not None:
+		for attributes, num_points in zip(list_of_attributes, points):
+			attributes['xy'] = attributes['xy'][:2 * num_points]
 
-	elif filt == "kernel":
-		cmd = f"image.filter(ImageFilter.Kernel(size={size}, kernel={kernel}, scale={scale}, offset={offset}))"
+	return list_of_attributes
 
-	elif filt == "rank_filter":
-		cmd = f"image.filter(ImageFilter.RankFilter(size=random.randint(1, ({size[0]} // 2)), rank={rank}))"
+# Get Frame Shape
+def get_frame_shape(image_size=(1920, 1080), image_mode='RGB'):
+	""" Get Frame Shape
+		:description:	Shape of the array generate_frame returns, image_size is the PIL size generate_image_simple passes on
+		:param image_size:	tuple
+		:param image_mode:	str
+		:return shape:		tuple
+	"""
+	bands = Image.getmodebands(image_mode)
+	shape = (image_size[1], image_size[0])
 
-	elif filt == "median_filter":
-		cmd = f"image.filter(ImageFilter.MedianFilter(size={size[0]}))"
+	return shape if bands == 1 else shape + (bands,)
 
-	elif filt == "min_filter":
-		cmd = f"image.filter(ImageFilter.MinFilter(size=random.randint(1, ({size[0]} // 2))))"
+# Get Noise Parameters
+def get_noise_parameters(noise_level, rand=random):
+	if noise_level is None:
+		return {}
 
-	elif filt == "max_filter":
-		cmd = f"image.filter(ImageFilter.MaxFilter(size=random.randint(1, ({size[0]} // 2))))"
+	if noise_level.lower() in ["light", "medium"]:
+		amount = rand.uniform(0.1, 0.5)
 
-	elif filt == "mode_filter":
-		cmd = f"image.filter(ImageFilter.ModeFilter(size=random.randint(1, ({size[0]} // 2))))"
+	elif noise_level.lower() == "heavy":
+		amount = rand.uniform(0.5, 1.0)
 
 	else:
-		raise Exception(f'{filt} not implemented')
+		raise Exception(f"Noise level {noise_level} not implemented")
 
-	return cmd
-
-# Select Shape
-def select_shape(shape, points):
-	if shape == "line":
-		cmd = "draw.line((attributes['x0'], attributes['y0']) + (attributes['x1'], attributes['y1']), width=attributes['w'], fill=random.choice(colors))"
+	return {'mean': rand.uniform(10, 100),
+			'var': rand.uniform(10, 100),
+			'local_var_range': (10, 100),
+			'amount': amount,
+			'salt_vs_pepper': 0.5}
 
-	elif shape == "curve":
-		string = ""
 
-		for index, digit in enumerate(range(points)):
-			if index == 0:
-				string += '['
+###############################################################################
+# Classes
+###############################################################################
+class PoisonImage(object):
+	def __init__(self, mode, debug, verbose, max_percent, max_threshold, max_kernel, max_scale, max_offset, single_encode=False, deadline_ms=None, backend="pil",
+				 filter_budget_ms=None, cost_model=None):
+		self.mode = mode
+		self.debug = debug
+		self.verbose = verbose
+		self.max_percent = max_percent
+		self.max_threshold = max_threshold
+		self.max_kernel = max_kernel
+		self.max_scale = max_scale
+		self.max_offset = max_offset
 
-			string += f"(attributes['x{digit}'], attributes['y{digit}'])"
+		# Encode once, keeping the noise stages in memory
+		self.single_encode = single_encode
 
-			if index < len(range(points)) - 1:
-				string += ', '
+		# Per image time budget in milliseconds, None renders every op
+		self.deadline_ms = deadline_ms
 
-			if index == len(range(points)) - 1:
-				string += ']'
+		# Rasterizer, "pil" draws with ImageDraw and "numpy" paints straight into the noise buffer. PIL stays the default, see PoisonRaster
+		if backend not in PoisonRaster.LIST_OF_BACKENDS:
+			raise Exception(f"Backend {backend} not implemented. Try {PoisonRaster.LIST_OF_BACKENDS}")
 
-		cmd = f"draw.line({string}, width=attributes['w'], fill=random.choice(colors), joint='curve')"
+		self.backend = backend
 
-	elif shape == "circle":
-		cmd = "draw.circle((attributes['x0'], attributes['y0']), radius=attributes['r'], outline=random.choice(colors), fill=random.choice(colors), width=attributes['w'])"
+		# Filter time budget per image in milliseconds, None takes a share of each render's deadline (see get_filter_budget)
+		self.filter_budget_ms = filter_budget_ms
 
-	elif shape == "arc":
-		cmd = "draw.arc([(attributes['x0'], attributes['y0']), (attributes['x1'], attributes['y1'])], start=attributes['start'], end=attributes['end'], fill=random.choice(colors), width=attributes['w'])"
-	
-	elif shape == "chord":
-		cmd = "draw.chord([(attributes['x0'], attributes['y0']), (attributes['x1'], attributes['y1'])], start=attributes['start'], end=attributes['end'], outline=random.choice(colors), fill=random.choice(colors), width=attributes['w'])"
-	
-	elif shape == "ellipse":
-		cmd = "draw.ellipse([(attributes['x0'], attributes['y0']), (attributes['x1'], attributes['y1'])], outline=random.choice(colors), fill=random.choice(colors), width=attributes['w'])"
-	
-	elif shape == "pieslice":
-		cmd = "draw.pieslice([(attributes['x0'], attributes['y0']), (attributes['x1'], attributes['y1'])], start=attributes['start'], end=attributes['end'], outline=random.choice(colors), fill=random.choice(colors), width=attributes['w'])"
+		# Calibrated on this host before the first render that needs it, shared across the process unless one is given
+		self.cost_model = cost_model if cost_model is not None else PoisonFilter.COST_MODEL
 
-	elif shape == "point":
-		cmd = "draw.point((attributes['x0'], attributes['y0']), fill=random.choice(colors))"
+	# Add Noise
+	def add_noise(self, image, noise_type, rng, noise_params):
+		if noise_type.lower() == "guassian":
+			noise_mode = "gaussian"
 
-	elif shape == "polygon":
-		string = ""
+		elif noise_type.lower() == "localvar":
+			noise_mode = "localvar"
 
-		for index, digit in enumerate(range(points)):
-			if index == 0:
-				string += '['
+		elif noise_type.lower() == "poisson":
+			noise_mode = "poisson"
 
-			string += f"(attributes['x{digit}'], attributes['y{digit}'])"
+		elif noise_type.lower() == "salt":
+			noise_mode = "salt"
 
-			if index < len(range(points)) - 1:
-				string += ', '
+		elif noise_type.lower() == "pepper":
+			noise_mode = "pepper"
 
-			if index == len(range(points)) - 1:
-				string += ']'
+		elif noise_type.lower() == "salt_pepper":
+			noise_mode = "s&p"
 
-		cmd = f"draw.polygon({string}, width=attributes['w'], fill=random.choice(colors))"
+		elif noise_type.lower() == "speckle":
+			noise_mode = "speckle"
 
-	elif shape == "regular_polygon":
-		cmd = f"draw.regular_polygon(bounding_circle=attributes['bounding_circle'], n_sides=attributes['n_sides'], rotation=attributes['rotation'], fill=random.choice(colors), outline=random.choice(colors), width=attributes['w'])"
+		else:
+			raise Exception(f"Noise type {noise_type} not implemented")
 
-	elif shape == "rectangle":
-		cmd = f"draw.rectangle([(attributes['x0'], attributes['y0']), (attributes['x1'], attributes['y1'])], fill=random.choice(colors), outline=random.choice(colors), width=attributes['w'])"
+		if noise_mode in ["gaussian", "speckle"]:
+			PoisonNoise.random_noise(image, mode=noise_mode, rng=rng, mean=noise_params['mean'], var=noise_params['var'])
 
-	elif shape == "rounded_rectangle":
-		cmd = f"draw.rounded_rectangle([(attributes['x0'], attributes['y0']), (attributes['x1'], attributes['y1'])], radius=attributes['r'], fill=random.choice(colors), outline=random.choice(colors), corners=attributes['corners'])"
+		elif noise_mode == "localvar":
+			low, high = noise_params['local_var_range']
+			local_vars = rng.uniform(low=low, high=high, size=image.shape[:2]).astype(np.float32)
 
-	else:
-		raise Exception(f'{shape} not implemented')
+			PoisonNoise.random_noise(image, mode=noise_mode, rng=rng, local_vars=local_vars)
 
-	return cmd
+		elif noise_mode in ["salt", "pepper"]:
+			PoisonNoise.random_noise(image, mode=noise_mode, rng=rng, amount=noise_params['amount'])
 
+		elif noise_mode == "s&p":
+			PoisonNoise.random_noise(image, mode=noise_mode, rng=rng, amount=noise_params['amount'], salt_vs_pepper=noise_params['salt_vs_pepper'])
 
-###############################################################################
-# Classes
-###############################################################################
-class PoisonImage(object):
-	def __init__(self, mode, debug, verbose, max_percent, max_threshold, max_kernel, max_scale, max_offset):
-		self.mode = mode
-		self.debug = debug
-		self.verbose = verbose
-		self.max_percent = max_percent
-		self.max_threshold = max_threshold
-		self.max_kernel = max_kernel
-		self.max_scale = max_scale
-		self.max_offset = max_offset
+		elif noise_mode == "poisson":
+			PoisonNoise.random_noise(image, mode=noise_mode, rng=rng)
 
-		signal.signal(signal.SIGALRM, timeout_handler)
+		return image
 
 	# Delect Image
 	def delete_image(self, file_path):
 		os.remove(file_path)
 
+	# Get Filter Budget
+	def get_filter_budget(self, deadline=None):
+		""" Get Filter Budget
+			:description:	Filter time budget of one render, a share of its deadline so filters are not started just to be cut off,
+							capped by filter_budget_ms when that is set
+			:param deadline:	Utils.Deadline | None
+			:return budget:		float | None 	milliseconds, None leaves the filters untrimmed
+		"""
+		budgets = [self.filter_budget_ms]
+
+		if deadline is not None and deadline.deadline_ms is not None:
+			budgets.append(deadline.deadline_ms * FILTER_BUDGET_FRACTION)
+
+		budgets = [budget for budget in budgets if budget is not None]
+
+		return min(budgets) if budgets else None
+
+	# Prepare Cost Model
+	def prepare_cost_model(self, filters=None, deadline_ms=None):
+		""" Prepare Cost Model
+			:description:	Calibrates the cost model for filters, but only when renders get a filter budget, the only thing that reads it
+			:param filters:		list | None 	None calibrates every filter
+			:param deadline_ms:	int | float | None 	deadline of the renders, None uses the default deadline_ms
+		"""
+		if self.get_filter_budget(Utils.Deadline(deadline_ms if deadline_ms is not None else self.deadline_ms)) is not None:
+			self.cost_model.prepare(filters)
+
+	# Get Key
+	def get_key(self, seed, **parameters):
+		""" Get Key
+			:description:	Content address of the image generated from seed, this generator's settings and parameters
+			:param seed:		int
+			:param parameters:	dict 	arguments of the generate call
+			:return key:		str
+		"""
+		settings = {"mode": self.mode.lower(), "max_percent": self.max_percent, "max_threshold": self.max_threshold,
+					"max_kernel": self.max_kernel, "max_scale": self.max_scale, "max_offset": self.max_offset,
+					"single_encode": self.single_encode, "deadline_ms": self.deadline_ms, "backend": self.backend,
+					"filter_budget_ms": self.filter_budget_ms}
+
+		return Utils.generate_key(media="image", seed=seed, settings=settings, parameters=parameters)
+
+	# Get Worker Arguments
+	def get_worker_arguments(self):
+		return {"mode": self.mode, "debug": self.debug, "verbose": self.verbose,
+				"max_percent": self.max_percent, "max_threshold": self.max_threshold, "max_kernel": self.max_kernel,
+				"max_scale": self.max_scale, "max_offset": self.max_offset,
+				"single_encode": self.single_encode, "deadline_ms": self.deadline_ms, "backend": self.backend,
+				"filter_budget_ms": self.filter_budget_ms, "cost_model": self.cost_model}
+
+	# Generate Images
+	def generate_images(self, n, workers=None, chunksize=1, max_in_flight=None, colors=None, as_bytes=False, mp_context=None, seed=None, **kwargs):
+		""" Generate Images
+			:description:	Fans generate_image_simple out over a process pool and yields results as they complete
+			:param n:				int 		number of images to generate
+			:param workers:			int | None 	pool size, defaults to os.cpu_count()
+			:param chunksize:		int 		images generated per task
+			:param max_in_flight:	int | None 	tasks queued at once, defaults to twice the pool size
+			:param colors:			list | None palette, resolved once and shared with every worker
+			:param as_bytes:		bool 		yield encoded bytes instead of file names
+			:param mp_context:		multiprocessing context | None
+			:param seed:			int | None 	image i is generated from Utils.derive_seed(seed, i)
+			:param kwargs:			dict 		forwarded to generate_image_simple
+			:return results:		generator 	file names, or bytes when as_bytes is set
+		"""
+		palette = PoisonPlan.resolve_palette(colors, kwargs.get("image_mode", "RGB")) if colors is not None else None
+
+		# Workers get a copy of the calibrated model instead of each timing the filters themselves
+		self.prepare_cost_model(kwargs.get("filters"), kwargs.get("deadline_ms"))
+
+		chunksize = max(1, chunksize)
+		counts = [(min(chunksize, n - start), as_bytes, kwargs, [Utils.derive_seed(seed, index) for index in range(start, min(start + chunksize, n))])
+				  for start in range(0, n, chunksize)]
+
+		with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+								 initializer=init_image_worker, initargs=(self.get_worker_arguments(), palette)) as executor:
+			for results in Utils.run_bounded(executor, generate_image_worker, counts, max_in_flight=max_in_flight):
+				yield from results
+
+	# Generate Frames
+	def generate_frames(self, seeds, workers=None, max_in_flight=None, colors=None, mp_context=None, **kwargs):
+		""" Generate Frames
+			:description:	generate_frame for every seed over a process pool, yielded in the order of seeds. Workers write
+							frames into a PoisonRing.FrameRing and finished ones wait there for the ones before them, at most
+							max_in_flight at a time. Pooled frames are views of a ring slot, valid until the next frame is asked for.
+			:param seeds:			list 		one frame per seed, None draws a fresh one
+			:param workers:			int | None 	pool size, defaults to os.cpu_count(), 1 renders on the calling process
+			:param max_in_flight:	int | None 	frames queued or waiting to be consumed, defaults to twice the pool size
+			:param colors:			list | None palette, resolved once and shared with every worker
+			:param mp_context:		multiprocessing context | None
+			:param kwargs:			dict 		forwarded to generate_frame
+			:return frames:			generator 	np.ndarray
+		"""
+		if workers == 1:
+			for seed in seeds:
+				yield self.generate_frame(colors=colors, seed=seed, **kwargs)
+
+			return
+
+		if max_in_flight is None:
+			max_in_flight = 2 * (workers if workers is not None else os.cpu_count() or 1)
+
+		max_in_flight = max(1, max_in_flight)
+
+		palette = PoisonPlan.resolve_palette(colors, kwargs.get("image_mode", "RGB")) if colors is not None else None
+
+		shape = get_frame_shape(kwargs.get("image_size", (1920, 1080)), kwargs.get("image_mode", 'RGB'))
+
+		# Workers get a copy of the calibrated model instead of each timing the filters themselves
+		self.prepare_cost_model(kwargs.get("filters"), kwargs.get("deadline_ms"))
+
+		# One slot more than the window, frame i is only submitted once frame i - num_slots was consumed
+		with PoisonRing.FrameRing(shape, max_in_flight + 1) as ring:
+			with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+									 initializer=init_frame_worker, initargs=(self.get_worker_arguments(), palette, ring.get_arguments())) as executor:
+				for slot in Utils.run_ordered(executor, generate_frame_worker, [(kwargs, seed, index) for index, seed in enumerate(seeds)], max_in_flight=max_in_flight):
+					yield ring.get_slot(slot)
+
 	# Generate Image Simple
-	def generate_image_simple(self, path=None, image_mode='RGB', extension='jpg', image_name_length=32, image_size=(1920, 1080), colors=None, shapes=None, filters=None):
+	def generate_image_simple(self, path=None, image_mode='RGB', extension='jpg', image_name_length=32, image_size=(1920, 1080), colors=None, shapes=None, filters=None, single_encode=None, deadline_ms=None, seed=None, name=None, sink=None, as_array=False):
+		rand, rng = Utils.get_random(seed)
+
+		if name is None and seed is not None:
+			name = self.get_key(seed, simple=True, image_mode=image_mode, extension=extension, image_size=image_size, colors=colors,
+								shapes=shapes, filters=filters, single_encode=single_encode, deadline_ms=deadline_ms)
+
 		if self.mode.lower() == "light":
 			shapes_k = 50
 			filters_k = 5
@@ -386,21 +456,21 @@ class PoisonImage(object):
 			noise_types = ["guassian", "salt_pepper", "poisson", "speckle"]
 			noise_level = "medium"
 
-		dir_path = Utils.check_path(base_path=path if path is not None else os.getcwd(), folder_name='Images')
+		dir_path = Utils.check_path(base_path=path if path is not None else os.getcwd(), folder_name='Images') if sink is None and not as_array else None
 
-		density = random.randint(1, 300)
+		density = rand.randint(1, 300)
 
 		if shapes is None:
-			shapes = random.choices(LIST_OF_SHAPES, k=shapes_k)
+			shapes = rand.choices(LIST_OF_SHAPES, k=shapes_k)
 
 		else:
-			shapes = random.choices(shapes, k=shapes_k)
+			shapes = rand.choices(shapes, k=shapes_k)
 
 		if filters is None:
-			filters = random.choices(LIST_OF_FILTERS, k=filters_k)
+			filters = rand.choices(LIST_OF_FILTERS, k=filters_k)
 
 		else:
-			filters = random.choices(filters, k=filters_k)
+			filters = rand.choices(filters, k=filters_k)
 
 		if self.mode.lower() == "light":
 			filters = [filt for filt in filters if filt not in LIGHT_MODE_EXCLUDED_FILTERS]
@@ -412,165 +482,288 @@ class PoisonImage(object):
 					  			   height=image_size[0], width=image_size[1], density=density, colors=colors,
 					  			   num_shapes=num_shapes, shapes=shapes,
 					  			   num_filters=num_filters, filters=filters,
-					  			   noise_level=noise_level, noise_types=noise_types)
+					  			   noise_level=noise_level, noise_types=noise_types, single_encode=single_encode, deadline_ms=deadline_ms,
+					  			   seed=seed, rand=rand, rng=rng, name=name, sink=sink, as_array=as_array)
+
+	# Generate Image Bytes
+	def generate_image_bytes(self, **kwargs):
+		""" Generate Image Bytes
+			:description:	generate_image_simple encoded straight into memory
+			:param kwargs:	dict 	forwarded to generate_image_simple
+			:return image:	bytes
+		"""
+		return self.generate_image_simple(sink=io.BytesIO(), **kwargs).getvalue()
+
+	# Generate Frame
+	def generate_frame(self, **kwargs):
+		""" Generate Frame
+			:description:	generate_image_simple left as raw pixels, for encoders that take frames instead of files. A lossless
+							extension skips the encodes between noise stages, the pixels are the same either way
+			:param kwargs:	dict 	forwarded to generate_image_simple
+			:return frame:	np.ndarray 	uint8 (height, width, channels)
+		"""
+		return self.generate_image_simple(as_array=True, **kwargs)
+
+	# Get Filter Attributes
+	def get_filter_attributes(self, filt, height, width, density=2, rand=random):
+		if filt in ["blur", "contour", "detail", "edge_enhance", "edge_enhance_more",
+					"emboss", "find_edges", "sharpen", "smooth", "smooth_more"]:
+			filter_attributes = {}
+
+		elif filt in ["box_blur", "gaussian_blur"]:
+			filter_attributes = {'radius': rand.uniform(1, min(height, width))}
+
+		elif filt == "unsharp_mask":
+			filter_attributes = {'radius': rand.uniform(1, min(height, width)),
+								 'percent': rand.randint(0, self.max_percent),
+								 'threshold': rand.randint(0, self.max_threshold)}
+
+		elif filt == "kernel":
+			filter_attributes = {'size': [rand.randint(10, max(height // 4, 11)), rand.randint(1, max(width // density, 2))],
+								 'kernel': list(rand.uniform(0, self.max_kernel[0]) for _ in range(self.max_kernel[1])),
+								 'scale': rand.uniform(1, self.max_scale),
+								 'offset': rand.uniform(0, self.max_offset)}
+
+		elif filt == "rank_filter":
+			filter_attributes = {'size': rand.randint(1, rand.randint(10, max(height // 4, 11)) // 2),
+								 'rank': rand.randint(0, min(height, width) // 4)}
+
+		elif filt == "median_filter":
+			filter_attributes = {'size': rand.randint(10, max(height // 4, 11))}
+
+		elif filt in ["min_filter", "max_filter", "mode_filter"]:
+			filter_attributes = {'size': rand.randint(1, rand.randint(10, max(height // 4, 11)) // 2)}
 
-	# Generate Image
-	def generate_image(self, path=None, image_mode='RGB', extension='jpg', image_name_length=32,
-					   height=120, width=120, background_color=None, colors=None, density=2,
-					   num_shapes=0, shapes=list(),
-					   num_filters=0, filters=list(),
-					   noise_level=None, noise_types=list()):
-		output_file_name = Utils.generate_file_name(path=path, extension=extension, length=image_name_length)
+		else:
+			raise Exception(f'{filt} not implemented')
+
+		return filter_attributes
+
+	# Build Plan
+	def build_plan(self, image_mode='RGB', height=120, width=120, background_color=None, colors=None, density=2,
+				   num_shapes=0, shapes=list(),
+				   num_filters=0, filters=list(),
+				   noise_level=None, noise_types=list(), rng=None, rand=random, deadline=None):
+		if rng is None:
+			rng = np.random.default_rng()
 
 		if colors is None:
 			colors = list(ImageColor.colormap.keys())
 
+		palette = PoisonPlan.resolve_palette(colors, image_mode)
+
 		if background_color is not None:
-			image = Image.new(mode=image_mode, size=(height, width), color=background_color)
-		
-		else:
-			image = Image.new(mode=image_mode, size=(height, width), color=random.choice(colors))
+			background = PoisonPlan.resolve_color(background_color, image_mode)
 
-		draw = ImageDraw.Draw(image)
+		else:
+			background = rand.choice(palette)
 
-		if noise_level is not None:
-			if noise_level.lower() == "light":
-				self.mean = random.uniform(10, 100)
-				self.var = random.uniform(10, 100)
-				self.local_vars = np.random.uniform(low=10, high=100, size=image.size)
-				self.amount = random.uniform(0.1, 0.5)
-				self.salt_vs_pepper = 0.5
-
-			elif noise_level.lower() == "medium":
-				self.mean = random.uniform(10, 100)
-				self.var = random.uniform(10, 100)
-				self.local_vars = np.random.uniform(low=10, high=100, size=image.size)
-				self.amount = random.uniform(0.1, 0.5)
-				self.salt_vs_pepper = 0.5
-
-			elif noise_level.lower() == "heavy":
-				self.mean = random.uniform(10, 100)
-				self.var = random.uniform(10, 100)
-				self.local_vars = np.random.uniform(low=10, high=100, size=image.size)
-				self.amount = random.uniform(0.5, 1.0)
-				self.salt_vs_pepper = 0.5
-
-			else:
-				raise Exception(f"Noise level {noise_level} not implemented")
+		noise_params = get_noise_parameters(noise_level, rand)
 
+		# Same draw as shuffling num_shapes copies of every shape and keeping the first num_shapes
 		list_of_shapes = []
-		for shape in shapes:
-			for _ in range(num_shapes):
-				list_of_shapes.append(shape)
+		if len(shapes) > 0 and num_shapes > 0:
+			shape_indices = rng.permutation(np.repeat(np.arange(len(shapes)), num_shapes))[:num_shapes]
+			list_of_shapes = [None] * len(shape_indices)
+
+			for shape_index in np.unique(shape_indices):
+				positions = np.flatnonzero(shape_indices == shape_index)
+				list_of_attributes = get_shape_attributes(height, width, shapes[shape_index], len(positions), density, rng)
+
+				for position, attributes in zip(positions.tolist(), list_of_attributes):
+					list_of_shapes[position] = (shapes[shape_index], attributes)
+
+			color_indices = rng.integers(0, len(palette), size=(len(list_of_shapes), 2)).tolist()
 
-		random.shuffle(list_of_shapes)
+			for (shape, attributes), (fill, outline) in zip(list_of_shapes, color_indices):
+				attributes['fill'] = palette[fill]
+				attributes['outline'] = palette[outline]
 
 		list_of_filters = []
 		for filt in filters:
 			for _ in range(num_filters):
 				list_of_filters.append(filt)
 
-		random.shuffle(list_of_filters)
+		rand.shuffle(list_of_filters)
 
-		for shape, filt in zip_longest(list_of_shapes[:num_shapes], list_of_filters[:num_filters], fillvalue=None):
+		filter_budget_ms = self.get_filter_budget(deadline)
+
+		ops = []
+		for shape, filt in zip_longest(list_of_shapes, list_of_filters[:num_filters], fillvalue=None):
 			if shape:
-				points = random.randint(3, 10)
-				cmd = select_shape(shape, points)
+				ops.append(PoisonPlan.RenderOp("shape", shape[0], shape[1]))
 
-				attributes = get_shape_attributes(height, width, shape, points, density)
+			if filt:
+				filter_attributes, cost = self.cost_model.fit_attributes(filt, self.get_filter_attributes(filt, height, width, density, rand),
+																		 height, width, filter_budget_ms)
 
-				if self.debug and self.verbose:
-					print("\t\t" + cmd)
-					print("\t\t" + str(attributes))
+				if filter_attributes is None:
+					if self.debug:
+						print(f"Skipping {filt}, it does not fit the remaining {filter_budget_ms:.0f} ms")
 
-				signal.alarm(TIME_OUT)
+					continue
 
-				try:
-					eval(cmd)
-				except Exception as ex:
-					if self.debug:
-						print(f"Bailing on creating shape due to: {ex}")
+				if filter_budget_ms is not None:
+					filter_budget_ms -= cost
 
-				signal.alarm(0)
+				ops.append(PoisonPlan.RenderOp("filter", filt, filter_attributes))
 
-			if filt:
-				radius = random.uniform(1, min(height, width))
-				size = [random.randint(10, max(height // 4, 11)), random.randint(1, max(width // density, 2))]
-				rank = random.randint(0, min(height, width) // 4)
-				percent = random.randint(0, self.max_percent)
-				threshold = random.randint(0, self.max_threshold)
-				kernel = list(random.uniform(0, self.max_kernel[0]) for _ in range(self.max_kernel[1]))
-				scale = random.uniform(1, self.max_scale)
-				offset = random.uniform(0, self.max_offset)
+		return PoisonPlan.RenderPlan(image_mode=image_mode, size=(height, width), background=background, palette=palette, ops=ops,
+									 noise_types=list(noise_types), noise_params=noise_params, description=f"mode: {self.mode.lower()}")
+
+	# Render Plan
+	def render_plan(self, plan, deadline=None):
+		image = plan.new_image()
+		draw = ImageDraw.Draw(image)
 
-				cmd = select_filter(filt, radius, size, percent, threshold, kernel, scale, offset, rank)
+		for index, op in enumerate(plan.ops):
+			if deadline is not None and deadline.expired():
+				if self.debug:
+					print(f"Deadline reached after {index} of {len(plan.ops)} ops")
 
-				if self.debug and self.verbose:
-					print("\t\t" + cmd)
+				break
 
-				signal.alarm(TIME_OUT)
+			if self.debug and self.verbose:
+				print("\t\t" + str(op))
 
-				try:
-					eval(cmd)
-				except Exception as ex:
-					if self.debug:
-						print(f"Bailing on creating filter due to: {ex}")
-				
-				signal.alarm(0)
+			try:
+				image, draw = PoisonPlan.apply_op(image, draw, op)
+			except Exception as ex:
+				if self.debug:
+					print(f"Bailing on creating {op.kind} due to: {ex}")
+
+		return image
+
+	# Render Plan Array
+	def render_plan_array(self, plan, deadline=None):
+		if self.backend == "pil":
+			return np.array(self.render_plan(plan, deadline=deadline))
+
+		canvas = PoisonRaster.new_canvas(plan)
+
+		for index, op in enumerate(plan.ops):
+			if deadline is not None and deadline.expired():
+				if self.debug:
+					print(f"Deadline reached after {index} of {len(plan.ops)} ops")
 
-		exif = image.getexif()
+				break
 
-		exif[ExifTags.ImageDescription.value] = f"mode: {self.mode.lower()}"
+			if self.debug and self.verbose:
+				print("\t\t" + str(op))
 
-		image.save(output_file_name, exif=exif)
+			try:
+				canvas = PoisonRaster.apply_op(canvas, op)
+			except Exception as ex:
+				if self.debug:
+					print(f"Bailing on creating {op.kind} due to: {ex}")
+
+		return canvas
+
+	# Generate Image
+	def generate_image(self, path=None, image_mode='RGB', extension='jpg', image_name_length=32,
+					   height=120, width=120, background_color=None, colors=None, density=2,
+					   num_shapes=0, shapes=list(),
+					   num_filters=0, filters=list(),
+					   noise_level=None, noise_types=list(), single_encode=None, rng=None, deadline_ms=None,
+					   seed=None, rand=None, name=None, sink=None, as_array=False):
+		# Calibrating inside the deadline would eat the budget of the first image
+		if num_filters > 0:
+			self.prepare_cost_model(filters, deadline_ms)
 
-		del(image)
+		deadline = Utils.Deadline(deadline_ms if deadline_ms is not None else self.deadline_ms)
 
-		for noise_type in noise_types:
-			image = skimage.io.imread(output_file_name)
+		if rand is None or rng is None:
+			seeded_rand, seeded_rng = Utils.get_random(seed)
 
-			if noise_type.lower() == "guassian":
-				noise_mode = "gaussian"
+			rand = rand if rand is not None else seeded_rand
+			rng = rng if rng is not None else seeded_rng
 
-			elif noise_type.lower() == "localvar":
-				noise_mode = "localvar"
+		if name is None and seed is not None:
+			name = self.get_key(seed, image_mode=image_mode, extension=extension, height=height, width=width, background_color=background_color,
+								colors=colors, density=density, num_shapes=num_shapes, shapes=shapes, num_filters=num_filters, filters=filters,
+								noise_level=noise_level, noise_types=noise_types, single_encode=single_encode, deadline_ms=deadline_ms)
 
-			elif noise_type.lower() == "poisson":
-				noise_mode = "poisson"
+		plan = self.build_plan(image_mode=image_mode, height=height, width=width, background_color=background_color, colors=colors, density=density,
+							   num_shapes=num_shapes, shapes=shapes, num_filters=num_filters, filters=filters,
+							   noise_level=noise_level, noise_types=noise_types, rng=rng, rand=rand, deadline=deadline)
 
-			elif noise_type.lower() == "salt":
-				noise_mode = "salt"
+		return self.generate_image_from_plan(plan, path=path, extension=extension, image_name_length=image_name_length,
+											 single_encode=single_encode, rng=rng, deadline=deadline, name=name, sink=sink, as_array=as_array)
 
-			elif noise_type.lower() == "pepper":
-				noise_mode = "pepper"
+	# Generate Image From Plan
+	def generate_image_from_plan(self, plan, path=None, extension='jpg', image_name_length=32, single_encode=None, rng=None, deadline=None, name=None, sink=None, as_array=False):
+		""" Generate Image From Plan
+			:description:	Rasterizes, noises and encodes a plan to a file, or to sink when one is given
+			:param plan:				PoisonPlan.RenderPlan
+			:param path:				str | None
+			:param extension:			str 	entry of DICT_OF_IMAGE_FORMATS
+			:param image_name_length:	int
+			:param single_encode:		bool | None 	None encodes once for lossless extensions and as the instance is set otherwise
+			:param rng:					np.random.Generator | None
+			:param deadline:			Utils.Deadline | None
+			:param name:				str | None 	file name without extension
+			:param sink:				writable binary stream | None 	nothing touches the filesystem when set
+			:param as_array:			bool 	return the pixels without encoding them, extension only picks the format between noise stages
+			:return result:				str | stream | np.ndarray 	the file name, sink, or the pixels
+		"""
+		if extension not in DICT_OF_IMAGE_FORMATS:
+			raise Exception(f"Unknown extension {extension}. Try {list(DICT_OF_IMAGE_FORMATS.keys())}")
 
-			elif noise_type.lower() == "salt_pepper":
-				noise_mode = "s&p"
+		image_format = DICT_OF_IMAGE_FORMATS[extension]
 
-			elif noise_type.lower() == "speckle":
-				noise_mode = "speckle"
+		if single_encode is None:
+			single_encode = self.single_encode or extension in LIST_OF_LOSSLESS_EXTENSIONS
 
-			else:
-				raise Exception(f"Noise type {noise_type} not implemented")
+		if deadline is None:
+			deadline = Utils.Deadline(self.deadline_ms)
 
-			if noise_mode in ["guassian", "speckle"]:
-				image = skimage.util.random_noise(image, mode=noise_mode, mean=self.mean, var=self.var)
+		if rng is None:
+			rng = np.random.default_rng()
 
-			elif noise_mode == "localvar":
-				image = skimage.util.random_noise(image, mode=noise_mode, local_vars=self.local_vars)
+		output_file_name = Utils.generate_file_name(path=path, extension=extension, length=image_name_length, name=name) if sink is None and not as_array else None
 
-			elif noise_mode in ["salt", "pepper"]:
-				image = skimage.util.random_noise(image, mode=noise_mode, amount=self.amount)
+		exif = Image.Exif()
 
-			elif noise_mode == "s&p":
-				image = skimage.util.random_noise(image, mode=noise_mode, amount=self.amount, salt_vs_pepper=self.salt_vs_pepper)
+		exif[ExifTags.ImageDescription.value] = plan.description
 
-			noise_img = np.array(255 * image, dtype='uint8')
+		# The numpy backend already renders into the noise buffer, so it always encodes once
+		if single_encode or self.backend == "numpy":
+			noise_img = self.render_plan_array(plan, deadline=deadline)
 
-			del(image)
+			for noise_type in plan.noise_types:
+				if deadline.expired():
+					break
 
-			image = Image.fromarray(np.array(noise_img))
-			image.save(output_file_name)
+				self.add_noise(noise_img, noise_type, rng, plan.noise_params)
+
+			if as_array:
+				return noise_img
+
+			image = Image.fromarray(noise_img)
+
+		else:
+			image = self.render_plan(plan, deadline=deadline)
+
+			# Every noise stage works on the decoded previous encode, kept in memory instead of re-read from disk
+			for noise_type in plan.noise_types:
+				if deadline.expired():
+					break
+
+				buffer = io.BytesIO()
+				image.save(buffer, format=image_format)
+				buffer.seek(0)
+
+				noise_img = self.add_noise(np.array(Image.open(buffer)), noise_type, rng, plan.noise_params)
+
+				image = Image.fromarray(noise_img)
+
+			if as_array:
+				return np.asarray(image)
+
+		image.save(output_file_name if sink is None else sink, format=image_format, exif=exif)
+
+		if sink is not None:
+			return sink
 
 		if self.debug:
 			print(f"\nFile saved @ {output_file_name}")
@@ -578,6 +771,54 @@ class PoisonImage(object):
 		return output_file_name
 
 
+###############################################################################
+# Workers
+###############################################################################
+WORKER_IMAGE = None
+
+WORKER_PALETTE = None
+
+WORKER_RING = None
+
+# Init Image Worker
+def init_image_worker(image_arguments, palette):
+	global WORKER_IMAGE, WORKER_PALETTE
+
+	# Forked workers inherit the parent's random state and would draw identical images
+	random.seed()
+
+	WORKER_IMAGE = PoisonImage(**image_arguments)
+	WORKER_PALETTE = palette
+
+# Generate Image Worker
+def generate_image_worker(count, as_bytes, kwargs, seeds=None):
+	results = []
+
+	for index in range(count):
+		seed = seeds[index] if seeds is not None else None
+
+		if as_bytes:
+			results.append(WORKER_IMAGE.generate_image_bytes(colors=WORKER_PALETTE, seed=seed, **kwargs))
+
+		else:
+			results.append(WORKER_IMAGE.generate_image_simple(colors=WORKER_PALETTE, seed=seed, **kwargs))
+
+	return results
+
+# Init Frame Worker
+def init_frame_worker(image_arguments, palette, ring_arguments):
+	global WORKER_RING
+
+	init_image_worker(image_arguments, palette)
+
+	WORKER_RING = PoisonRing.FrameRing(**ring_arguments)
+
+# Generate Frame Worker
+def generate_frame_worker(kwargs, seed=None, index=0):
+	# Only the slot goes back through the pipe, the frame stays in shared memory
+	return WORKER_RING.write(index, WORKER_IMAGE.generate_frame(colors=WORKER_PALETTE, seed=seed, **kwargs))
+
+
 if __name__ == "__main__":
 	mode = "medium"
 	debug = True
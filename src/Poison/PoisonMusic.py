@@ -1,6 +1,6 @@
 ###############################################################################
 # Program : Poison
-# File : PoisonImage.py
+# File : PoisonMusic.py
 # Author : catte
 # Created : Sept 19, 2024
 # Copyright : catte @ 2024
@@ -10,7 +10,10 @@
 ###############################################################################
 # Imports
 ###############################################################################
-import random, os, wave
+import random, os, io, wave
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 # Signals
 from gensound import Sine, Triangle, Square, Sawtooth
@@ -22,6 +25,7 @@ from gensound import Gain, SineAM, Limiter, Mono, Pan, Repan, Convolution, ADSR
 # Poison
 # from . import Utils
 import Utils
+import PoisonSynth
 
 
 ###############################################################################
@@ -41,6 +45,30 @@ LIST_OF_ACCIDENTALS = ["#", "b", None]
 
 LIST_OF_OCTAVES = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
 
+SAMPLE_RATE = PoisonSynth.SAMPLE_RATE
+
+DICT_OF_SONG_LAYERS = {"light": 5,
+					   "medium": 50,
+					   "heavy": 100
+}
+
+DICT_OF_SIGNAL_CLASSES = {"sine": Sine,
+						  "triangle": Triangle,
+						  "square": Square,
+						  "sawtooth": Sawtooth
+}
+
+DICT_OF_TRANSFORM_BUILDERS = {"shift": lambda attributes: Shift(duration=attributes['duration']),
+							  "extend": lambda attributes: Extend(duration=attributes['duration']),
+							  "reverse": lambda attributes: Reverse(),
+							  "fadein": lambda attributes: FadeIn(duration=attributes['duration'], curve=attributes['curve'], degree=attributes['degree']),
+							  "fadeout": lambda attributes: FadeOut(duration=attributes['duration'], curve=attributes['curve'], degree=attributes['degree']),
+							  "sineam": lambda attributes: SineAM(frequency=attributes['frequency'], size=attributes['size'], phase=attributes['phase'])
+}
+
+# Redraws of a gensound song before generate_music gives up
+MAX_RETRIES = 3
+
 NOT_IMPLEMENTED_TRANSFORMS = ["crossfade", "limiter", "mono", "pan", "convolution", "adsr"]
 
 LIST_OF_TRANSFORMS = [x for x in LIST_OF_TRANSFORMS if x not in NOT_IMPLEMENTED_TRANSFORMS ]
@@ -94,30 +122,98 @@ def is_rest(pitch):
 	"""
 	return pitch.lower() == 'r'
 
-# Select Signal
-def select_signal(signal, song_duration):
-	""" Select Signal
-		:description:
-		:param signal:			str
-		:param song_duration:	int
-		:return cmd:			str
+# Validate Parameters
+def validate_parameters(pitches=[], accidentals=[], octaves=[], cents=[], max_note_duration=100, num_notes=100, num_song_layers=100,
+						song_duration=600, signals=[], transforms=[], num_transforms=10):
+	""" Validate Parameters
+		:description:	Rejects generate_music inputs up front instead of failing while the song renders
 	"""
-	if signal.lower() == "sine":
-		cmd = f"Sine(song_layer, duration={song_duration})"
+	for pitch in pitches:
+		if pitch[:1].lower() not in LIST_OF_PITCHES or pitch[1:].strip('#b'):
+			raise Exception(f"Unknown pitch {pitch}. Try {LIST_OF_PITCHES}")
 
-	elif signal.lower() == "triangle":
-		cmd = f"Triangle(song_layer, duration={song_duration})"
+	for accidental in accidentals:
+		if accidental not in LIST_OF_ACCIDENTALS + ['']:
+			raise Exception(f"Unknown accidental {accidental}. Try {LIST_OF_ACCIDENTALS}")
+
+	for octave in octaves:
+		if octave not in LIST_OF_OCTAVES:
+			raise Exception(f"Unknown octave {octave}. Try {LIST_OF_OCTAVES}")
+
+	for cent in cents:
+		if cent is not None and not (-255 <= cent <= 255):
+			raise Exception(f"Unknown cents {cent}. Use a number between -255 and 255, inclusive")
+
+	for signal in signals:
+		if signal.lower() not in LIST_OF_SIGNALS:
+			raise Exception(f"Signal {signal} not recognized. Try {LIST_OF_SIGNALS}")
+
+	for transform in transforms:
+		if transform.lower() not in LIST_OF_TRANSFORMS:
+			raise Exception(f"Transform {transform} not implemented. Try {LIST_OF_TRANSFORMS}")
+
+	for parameter, values in (("pitches", pitches), ("accidentals", accidentals), ("octaves", octaves), ("cents", cents),
+							  ("signals", signals), ("transforms", transforms)):
+		if len(values) == 0:
+			raise Exception(f"No {parameter} to choose from")
+
+	for parameter, value in (("max_note_duration", max_note_duration), ("num_notes", num_notes), ("num_song_layers", num_song_layers),
+							 ("song_duration", song_duration), ("num_transforms", num_transforms)):
+		if value < 1:
+			raise Exception(f"Invalid {parameter} {value}. Use a positive, non-zero integer value")
+
+	# Shift and extend can add up to song_duration samples on top of the planned length
+	if (get_song_length(num_notes, max_note_duration, song_duration) + song_duration) * PoisonSynth.SAMPLE_WIDTH > PoisonSynth.MAX_WAV_BYTES:
+		raise Exception(f"A song of {num_notes} notes up to {max_note_duration} beats of {song_duration} samples is over the {PoisonSynth.MAX_WAV_BYTES} bytes a WAV file can hold")
+
+# Get Layer Beats
+def get_layer_beats(num_notes=100, max_note_duration=100):
+	""" Get Layer Beats
+		:description:	Beats the planner fills every song layer with, the expected length of num_notes notes of 1 to max_note_duration beats
+		:param num_notes:			int
+		:param max_note_duration:	int 	beats
+		:return beats:				int
+	"""
+	return num_notes * (max_note_duration + 1) // 2
+
+# Get Song Length
+def get_song_length(num_notes=100, max_note_duration=100, song_duration=600):
+	""" Get Song Length
+		:description:	Planned samples in every song layer, known before the song is generated
+		:param num_notes:			int
+		:param max_note_duration:	int 	beats
+		:param song_duration:		int 	samples per beat
+		:return length:				int
+	"""
+	return get_layer_beats(num_notes, max_note_duration) * song_duration
+
+# Write Wav
+def write_wav(sink, audio):
+	""" Write Wav
+		:description:	Writes a realised signal as 16 bit PCM the way Signal.export does, but to any path or writable stream
+		:param sink:	str | writable binary stream
+		:param audio:	gensound.audio.Audio
+	"""
+	samples = audio.audio
 
-	elif signal.lower() == "square":
-		cmd = f"Square(song_layer, duration={song_duration})"
+	if audio.shift > 0:
+		samples = np.pad(samples, ((0, 0), (audio.shift, 0)))
 
-	elif signal.lower() == "sawtooth":
-		cmd = f"Sawtooth(song_layer, duration={song_duration})"
+	PoisonSynth.write_wav(sink, samples, audio.sample_rate)
 
-	else:
+# Build Signal
+def build_signal(signal, song_layer, song_duration):
+	""" Build Signal
+		:description:	gensound oscillator playing a song layer
+		:param signal:			str 	entry of DICT_OF_SIGNAL_CLASSES
+		:param song_layer:		str 	notes as parsed by gensound
+		:param song_duration:	int 	samples per beat
+		:return signal:			gensound.Signal
+	"""
+	if signal.lower() not in DICT_OF_SIGNAL_CLASSES:
 		raise Exception(f"Signal {signal} not recognized")
 
-	return cmd
+	return DICT_OF_SIGNAL_CLASSES[signal.lower()](song_layer, duration=song_duration)
 
 # Get Transform Attributes
 def get_transform_attributes(transform, duration, curve, degree, frequency, size, phase):
@@ -143,12 +239,12 @@ def get_transform_attributes(transform, duration, curve, degree, frequency, size
 		pass  # Reverse has no attributes
 
 	elif transform.lower() == "fadein":
-		attributes.update({'duration': duration})
+		attributes.update({'duration': max(duration, 1)})  # gensound cannot fade over 0 samples
 		attributes.update({'curve': curve})
 		attributes.update({'degree': degree})
 
 	elif transform.lower() == "fadeout":
-		attributes.update({'duration': duration})
+		attributes.update({'duration': max(duration, 1)})
 		attributes.update({'curve': curve})
 		attributes.update({'degree': degree})
 
@@ -177,50 +273,18 @@ def get_transform_attributes(transform, duration, curve, degree, frequency, size
 
 	return attributes
 
-# Select Transform
-def select_transform(transform, transform_attributes):
-	""" Select Transform
-		:description:
-		:param transform:				str
+# Build Transform
+def build_transform(transform, transform_attributes):
+	""" Build Transform
+		:description:	gensound transform from get_transform_attributes
+		:param transform:				str 	entry of DICT_OF_TRANSFORM_BUILDERS
 		:param transform_attributes:	dict
+		:return transform:				gensound.Transform
 	"""
-	if transform.lower() == "shift":
-		cmd = f"Shift(duration={transform_attributes['duration']})"
-
-	elif transform.lower() == "extend":
-		cmd = f"Extend(duration={transform_attributes['duration']})"
-
-	elif transform.lower() == "reverse":
-		cmd = f"Reverse()"  # Reverse has no arguments
-
-	elif transform.lower() == "fadein":
-		cmd = f"FadeIn(duration={transform_attributes['duration']}, curve=\'{transform_attributes['curve']}\', degree={transform_attributes['degree']})"
-
-	elif transform.lower() == "fadeout":
-		cmd = f"FadeOut(duration={transform_attributes['duration']}, curve=\'{transform_attributes['curve']}\', degree={transform_attributes['degree']})"
-
-	elif transform.lower() == "sineam":
-		cmd = f"SineAM(frequency={transform_attributes['frequency']}, size={transform_attributes['size']}, phase={transform_attributes['phase']})"
-
-	elif transform.lower() == "limiter":
-		cmd = f"Limiter()"  # Not implemented
-
-	elif transform.lower() == "mono":
-		cmd = f"Mono()"  # Not implemented
-
-	elif transform.lower() == "pan":
-		cmd = f"Pan"  # Not implemented
-
-	elif transform.lower() == "convolution":
-		cmd = f"Convolution()"  # Not implemented
-
-	elif transform.lower() == "adsr":
-		cmd = f"ADSR()"  # Not implemented
-
-	else:
+	if transform.lower() not in DICT_OF_TRANSFORM_BUILDERS:
 		raise Exception(f"Transform {transform} not recognized")
 
-	return cmd
+	return DICT_OF_TRANSFORM_BUILDERS[transform.lower()](transform_attributes)
 
 
 ###############################################################################
@@ -283,25 +347,49 @@ class Note(object):
 		self.duration = duration
 
 	def __str__(self):
-		return f"{self.pitch.upper()}{self.accidental}{self.octave}{self.sign}{self.cents}={self.duration}"
+		# gensound only parses a lower case rest
+		pitch = self.pitch.lower() if is_rest(self.pitch) else self.pitch.upper()
+
+		return f"{pitch}{self.accidental}{self.octave}{self.sign}{self.cents}={self.duration}"
 
 # PoisonSound Class
 class PoisonMusic(object):
 	# Initialize
-	def __init__(self, mode="", debug=False, verbose=False):
+	def __init__(self, mode="", debug=False, verbose=False, backend="gensound"):
 		""" Initialize
 			:description:	Initializes the PoisonSound class instantiation
 			:param mode:	str
 			:param debug:	bool
 			:param verbose:	bool
+			:param backend:	str 	entry of PoisonSynth.LIST_OF_BACKENDS, "numpy" renders the layers without gensound
 		"""
+		if backend.lower() not in PoisonSynth.LIST_OF_BACKENDS:
+			raise Exception(f"Backend {backend} not implemented. Try {PoisonSynth.LIST_OF_BACKENDS}")
+
 		self.mode = mode
 		self.debug = debug
 		self.verbose = verbose
+		self.backend = backend.lower()
+
+		# Counters behind get_stats, retries should stay near zero
+		self.num_songs = 0
+		self.num_retries = 0
 
 	def delete_music(self, music_file_name):
 		os.remove(music_file_name)
 
+	# Get Key
+	def get_key(self, seed, **parameters):
+		return Utils.generate_key(media="music", seed=seed, settings={"mode": self.mode.lower(), "backend": self.backend}, parameters=parameters)
+
+	# Get Worker Arguments
+	def get_worker_arguments(self):
+		return {"mode": self.mode, "debug": self.debug, "verbose": self.verbose, "backend": self.backend}
+
+	# Get Stats
+	def get_stats(self):
+		return {"songs": self.num_songs, "retries": self.num_retries}
+
 	def get_duration(self, file_path):
 		with wave.open(file_path, 'r') as audio_file:
 			frame_rate = audio_file.getframerate()
@@ -312,35 +400,39 @@ class PoisonMusic(object):
 		return duration
 
 	# Generate Music Simple
-	def generate_music_simple(self, octave_range="low", base_path=None, key=None, key_type="major", num_notes=100, max_note_duration=100, song_duration=600, extension='wav'):
+	def generate_music_simple(self, octave_range="low", base_path=None, key=None, key_type="major", num_notes=100, max_note_duration=100, song_duration=600, extension='wav', seed=None, name=None, sink=None, workers=None, mp_context=None):
 		""" Generate Music Simple
 			:description:	Generate music with a simple interface
 			:param octave_range: 		str
 			:param base_path:			str | None
 			:param key:					str
 			:param key_type:			str
-			:param num_notes:			int
-			:param max_note_duration:	int
-			:param song_duration:		int
+			:param num_notes:			int 	notes in each song layer
+			:param max_note_duration:	int 	beats
+			:param song_duration:		int 	samples per beat, every song layer is planned to get_song_length samples
 			:param extension:			str
-			:return file_name:			str
+			:param seed:				int | None 	same seed and parameters give the same file
+			:param name:				str | None 	file name without extension, defaults to the key when seeded
+			:param sink:				writable binary stream | None 	written instead of a file when set
+			:param workers:				int | None 	see generate_music
+			:param mp_context:			multiprocessing context | None
+			:return file_name:			str | stream 	the file name, or sink
 		"""
+		rand, rng = Utils.get_random(seed)
+
+		if name is None and seed is not None:
+			name = self.get_key(seed, octave_range=octave_range, key=key, key_type=key_type, num_notes=num_notes,
+								max_note_duration=max_note_duration, song_duration=song_duration, extension=extension)
+
 		pitches = []
 		accidentals = []
 		cents = []
 
-		if self.mode.lower() == "light":
-			num_song_layers = 5
-
-		elif self.mode.lower() == "medium":
-			num_song_layers = 50
-
-		elif self.mode.lower() == "heavy":
-			num_song_layers = 100
-
-		else:
+		if self.mode.lower() not in DICT_OF_SONG_LAYERS:
 			raise Exception(f"Mode {self.mode} is not known")
 
+		num_song_layers = DICT_OF_SONG_LAYERS[self.mode.lower()]
+
 		if key_type == "major" and key in list(DICT_OF_MAJOR_KEYS.keys()):
 			pitches = DICT_OF_MAJOR_KEYS[key]
 			accidentals = ['']
@@ -354,7 +446,7 @@ class PoisonMusic(object):
 		elif key_type == "all":
 			pitches = LIST_OF_PITCHES
 			accidentals = LIST_OF_ACCIDENTALS
-			cents = [random.randint(-255, 255) for _ in range(num_notes)]
+			cents = [rand.randint(-255, 255) for _ in range(num_notes)]
 
 		else:
 			raise Exception(f"Key {key} type {key_type} is not known")
@@ -381,12 +473,23 @@ class PoisonMusic(object):
 
 		return self.generate_music(base_path=base_path, extension=extension, pitches=pitches, accidentals=accidentals, octaves=octaves, cents=cents,
 								   max_note_duration=max_note_duration, num_notes=num_notes, num_song_layers=num_song_layers, song_duration=song_duration,
-								   signals=signals, transforms=transforms, num_transforms=num_transforms)
+								   signals=signals, transforms=transforms, num_transforms=num_transforms, rand=rand, rng=rng, name=name, sink=sink,
+								   workers=workers, mp_context=mp_context)
+
+	# Generate Music Bytes
+	def generate_music_bytes(self, **kwargs):
+		""" Generate Music Bytes
+			:description:	generate_music_simple written straight into memory
+			:param kwargs:	dict 	forwarded to generate_music_simple
+			:return music:	bytes
+		"""
+		return self.generate_music_simple(sink=io.BytesIO(), **kwargs).getvalue()
 
 	# Generate Music
 	def generate_music(self, base_path=None, extension='wav', pitches=[], accidentals=[], octaves=[], cents=[],
 					   max_note_duration=100, num_notes=100, num_song_layers=100, song_duration=600,
-					   signals=[], transforms=[], num_transforms=10):
+					   signals=[], transforms=[], num_transforms=10, seed=None, rand=None, rng=None, name=None, sink=None, block_size=PoisonSynth.BLOCK_SIZE,
+					   workers=None, mp_context=None):
 		""" Generate Music
 			:description:	Generate music in the desired location with the desired extension
 			:param base_path:		str | None 	
@@ -398,8 +501,27 @@ class PoisonMusic(object):
 			:param signals:			list
 			:param transforms:		list
 			:param num_transforms:	int
-			:return file_name:		str
+			:param seed:			int | None
+			:param rand:			random.Random | None 	overrides seed
+			:param rng:				np.random.Generator | None 	note sampling of the numpy backend, drawn from rand when None
+			:param name:			str | None 	file name without extension, defaults to the key when seeded
+			:param sink:			writable binary stream | None 	written instead of a file when set
+			:param block_size:		int 	samples per block written by the numpy backend
+			:param workers:			int | None 	processes rendering the blocks of a numpy backend song side by side, None or 1 renders on the calling process
+			:param mp_context:		multiprocessing context | None
+			:return file_name:		str | stream 	the file name, or sink
 		"""
+		if rand is None:
+			rand, rng = Utils.get_random(seed)
+
+		if rng is None:
+			rng = np.random.default_rng(rand.getrandbits(64))
+
+		if name is None and seed is not None:
+			name = self.get_key(seed, pitches=pitches, accidentals=accidentals, octaves=list(octaves), cents=cents,
+								max_note_duration=max_note_duration, num_notes=num_notes, num_song_layers=num_song_layers,
+								song_duration=song_duration, signals=signals, transforms=transforms, num_transforms=num_transforms)
+
 		if self.debug and self.verbose:
 			print(f"Pitches: {pitches}")
 			print(f"Accidentals: {accidentals}")
@@ -409,34 +531,80 @@ class PoisonMusic(object):
 			print(f"Num notes: {num_notes}")
 			print(f"Num song layers: {num_song_layers}")
 
-		save_succeeded = False
+		validate_parameters(pitches=pitches, accidentals=accidentals, octaves=octaves, cents=cents, max_note_duration=max_note_duration,
+							num_notes=num_notes, num_song_layers=num_song_layers, song_duration=song_duration,
+							signals=signals, transforms=transforms, num_transforms=num_transforms)
 
 		if base_path is None:
 			base_path = os.getcwd()
 
-		file_name = Utils.generate_file_name(path=base_path, length=32, extension='wav')
+		file_name = Utils.generate_file_name(path=base_path, length=32, extension='wav', name=name) if sink is None else None
+
+		self.num_songs += 1
+
+		# Every layer gets exactly the expected number of beats, so no sample is synthesized only to be padded or cut
+		durations = PoisonSynth.plan_durations(num_song_layers, num_notes, get_layer_beats(num_notes, max_note_duration), max_note_duration, rng)
+
+		if self.backend == "numpy":
+			note_arrays = self.generate_note_arrays(pitches=pitches, accidentals=accidentals, octaves=octaves, cents=cents, max_note_duration=max_note_duration,
+													num_notes=num_notes, num_song_layers=num_song_layers, rng=rng, durations=durations)
+			song = self.generate_synth_song(song_duration=song_duration, note_arrays=note_arrays, signals=signals, transforms=transforms, num_transforms=num_transforms, rand=rand)
+
+			# Streamed block by block, sink can be a pipe or socket and is readable while the song renders
+			if workers is not None and workers > 1:
+				with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+										 initializer=PoisonSynth.init_song_worker, initargs=(song,)) as executor:
+					PoisonSynth.write_song(file_name if sink is None else sink, song, block_size, executor=executor)
+
+			else:
+				PoisonSynth.write_song(file_name if sink is None else sink, song, block_size)
+
+		else:
+			audio = self.realise_song(pitches=pitches, accidentals=accidentals, octaves=octaves, cents=cents, max_note_duration=max_note_duration,
+									  num_notes=num_notes, num_song_layers=num_song_layers, song_duration=song_duration, signals=signals, transforms=transforms,
+									  num_transforms=num_transforms, rand=rand, durations=durations)
+
+			# Written once the signal realised, so a retry never leaves a partial song in the sink
+			write_wav(file_name if sink is None else sink, audio)
+
+		if sink is not None:
+			return sink
+
+		return file_name
+
+	# Realise Song
+	def realise_song(self, pitches=[], accidentals=[], octaves=[], cents=[], max_note_duration=100, num_notes=100, num_song_layers=100, song_duration=600,
+					 signals=[], transforms=[], num_transforms=10, rand=random, durations=None):
+		""" Realise Song
+			:description:	Draws and realises a gensound song, redrawing at most MAX_RETRIES times if gensound rejects it
+			:param durations:	np.ndarray | None 	planned by PoisonSynth.plan_durations, kept across redraws
+			:return audio:		gensound.audio.Audio
+		"""
+		for attempt in range(MAX_RETRIES + 1):
+			if attempt > 0:
+				self.num_retries += 1
 
-		while not save_succeeded:
-			notes = self.generate_notes(pitches=pitches, accidentals=accidentals, octaves=octaves, cents=cents, max_note_duration=max_note_duration, num_song_layers=num_song_layers)
+			notes = self.generate_notes(pitches=pitches, accidentals=accidentals, octaves=octaves, cents=cents, max_note_duration=max_note_duration,
+										num_notes=num_notes, num_song_layers=num_song_layers, rand=rand, durations=durations)
 
 			song_layers = self.generate_song_layers(notes=notes, num_song_layers=num_song_layers)
 
-			waveforms = self.generate_waveforms(song_duration=song_duration, song_layers=song_layers, signals=signals, transforms=transforms, num_transforms=num_transforms)
-			
+			waveforms = self.generate_waveforms(song_duration=song_duration, song_layers=song_layers, signals=signals, transforms=transforms, num_transforms=num_transforms, rand=rand)
+
 			combined_waveform = sum(waveforms)
 
 			try:
-				combined_waveform.export(file_name)
+				return combined_waveform.realise(SAMPLE_RATE)
 			except ValueError as ex:
+				error = ex
+
 				if self.debug and self.verbose:
 					print(f"Error in generating file: {ex}")
-			else:
-				save_succeeded = True
 
-		return file_name
+		raise Exception(f"Song could not be realised after {MAX_RETRIES} retries due to: {error}")
 
 	# Generate Notes
-	def generate_notes(self, pitches=[], accidentals=[], octaves=[], cents=[], max_note_duration=10, num_notes=100, num_song_layers=10):
+	def generate_notes(self, pitches=[], accidentals=[], octaves=[], cents=[], max_note_duration=10, num_notes=100, num_song_layers=10, rand=random, durations=None):
 		""" Generate Notes
 			:description:	Generates the notes in a song
 			:param pitches: 			list 	A list of pitches to be used to generate a song
@@ -446,12 +614,61 @@ class PoisonMusic(object):
 			:param max_note_duration:	int 	The maximum length of time for a note to last
 			:param num_notes:			int 	The number of notes to be used in generating a song
 			:param num_song_layers:		int 	The number of song layers to be used in generating a song
+			:param rand:				random.Random
+			:param durations:			np.ndarray | None 	beats, from PoisonSynth.plan_durations, a column past num_notes is a rest
 			:return notes:				list 	A list of notes generated
 		"""
-		notes = [[Note(random.choice(pitches), random.choice(accidentals), random.choice(octaves), random.choice(cents), random.randint(1, max_note_duration)) for _ in range(num_notes)] for __ in range(num_song_layers)]
+		if durations is None:
+			notes = [[Note(rand.choice(pitches), rand.choice(accidentals), rand.choice(octaves), rand.choice(cents), rand.randint(1, max_note_duration)) for _ in range(num_notes)] for __ in range(num_song_layers)]
+
+			return notes
+
+		notes = [[Note(rand.choice(pitches), rand.choice(accidentals), rand.choice(octaves), rand.choice(cents), int(duration)) for duration in durations[index, :num_notes]]
+				 + [Note('r', duration=int(duration)) for duration in durations[index, num_notes:]] for index in range(num_song_layers)]
 
 		return notes
 
+	# Generate Note Arrays
+	def generate_note_arrays(self, pitches=[], accidentals=[], octaves=[], cents=[], max_note_duration=10, num_notes=100, num_song_layers=10, rng=None, durations=None):
+		""" Generate Note Arrays
+			:description:	Vectorized generate_notes, samples every layer at once into a PoisonSynth.NoteArrays
+			:param pitches: 			list 	A list of pitches to be used to generate a song
+			:param accidentals:			list 	A list of accidentals to be used to generate a song
+			:param octaves:				list 	A list of octaves to be used to generate a song
+			:param cents:				list 	A list of cents to be used to generate a song
+			:param max_note_duration:	int 	The maximum length of time for a note to last
+			:param num_notes:			int 	The number of notes in each song layer
+			:param num_song_layers:		int 	The number of song layers to be used in generating a song
+			:param rng:					np.random.Generator | None
+			:param durations:			np.ndarray | None 	beats, from PoisonSynth.plan_durations, a column past num_notes is a rest
+			:return note_arrays:		PoisonSynth.NoteArrays
+		"""
+		if rng is None:
+			rng = np.random.default_rng()
+
+		shape = (num_song_layers, num_notes)
+
+		pitch_index = rng.integers(len(pitches), size=shape)
+		accidental = rng.choice(np.array([PoisonSynth.accidental_semitones(accidental) for accidental in accidentals]), size=shape)
+		octave = rng.choice(np.array(list(octaves)), size=shape)
+		cent = rng.choice(np.array([0 if value is None else value for value in cents]), size=shape)
+
+		if durations is None:
+			return PoisonSynth.NoteArrays(pitches, pitch_index, accidental, octave, cent, rng.integers(1, max_note_duration, endpoint=True, size=shape))
+
+		num_rests = durations.shape[1] - num_notes
+
+		if num_rests > 0:
+			# The planned rest points at an 'r' entry, appended when the scale has none
+			pitches = list(pitches) + (['r'] if 'r' not in [pitch.lower() for pitch in pitches] else [])
+			rest_index = [pitch.lower() for pitch in pitches].index('r')
+
+			padding = np.zeros((num_song_layers, num_rests), dtype=pitch_index.dtype)
+			pitch_index = np.concatenate([pitch_index, padding + rest_index], axis=1)
+			accidental, octave, cent = [np.concatenate([values, padding.astype(values.dtype)], axis=1) for values in (accidental, octave, cent)]
+
+		return PoisonSynth.NoteArrays(pitches, pitch_index, accidental, octave, cent, durations)
+
 	# Generate Song Layers
 	def generate_song_layers(self, notes=[], num_song_layers=10):
 		""" Generate Song Layers
@@ -465,45 +682,91 @@ class PoisonMusic(object):
 		return song_layers
 
 	# Generate Waveforms
-	def generate_waveforms(self, song_duration=600, song_layers=[], signals=["sine"], transforms=[], num_transforms=10):
+	def generate_waveforms(self, song_duration=600, song_layers=[], signals=["sine"], transforms=[], num_transforms=10, rand=random):
 		""" Generate Waveforms
 			:description:	Generates a number of waveforms equal to len(song_layers) to be combined later into a single song track
 			:param song_duration:	int 	Duration of the song
 			:param song_layers:		list 	A list of song layers
 			:param signals:			list 	A list of signals to be used
 			:param transforms:		list    A list of transforms to be used
-			:param num_transforms:  int 	Number of transforms to apply
+			:param num_transforms:  int 	Kept for compatibility, each layer draws one transform
+			:param rand:			random.Random
 			:return waveforms:		list 	A list of waveforms generated from the signals and transforms
 		"""
-		list_of_signals = [select_signal(random.choice(signals), song_duration) for _ in range(len(song_layers))]
+		list_of_signals = [rand.choice(signals).lower() for _ in range(len(song_layers))]
 
 		if self.debug and self.verbose:
 			print(list_of_signals)
 
-		list_of_transforms = []
-		for _ in range(num_transforms * len(transforms)):
-			transform = random.choice(transforms)
-			curve = random.choice(["linear", "polynomial"])
-			duration = random.choice(list(range(song_duration)))
-			degree = random.choice(list(range(0, 360)))
-			frequency = random.randint(300, 3000)
-			size = random.randint(300, 3000)
-			phase = random.randint(0, 361)
-
-			transform_attributes = get_transform_attributes(transform, duration, curve, degree, frequency, size, phase)
-			list_of_transforms.append(select_transform(transform, transform_attributes))
-
 		waveforms = []
 		for song_layer, signal in zip(song_layers, list_of_signals):
-			transform = random.choice(list_of_transforms)
+			transform, transform_attributes = self.generate_transform(song_duration, transforms, rand)
 
 			if self.debug and self.verbose:
-				print(f"Transform: {transform}")
+				print(f"Transform: {transform} {transform_attributes}")
 
-			waveforms.append(eval(signal) * eval(transform))
+			waveform = build_signal(signal, song_layer, song_duration)
+
+			# Signal * Transform deep copies the whole note sequence so the signal can be reused, this one never is
+			waveform.transforms.append(build_transform(transform, transform_attributes))
+			waveforms.append(waveform)
 
 		return waveforms
 
+	# Generate Transform
+	def generate_transform(self, song_duration=600, transforms=[], rand=random):
+		""" Generate Transform
+			:description:	Draws one transform and its attributes
+			:param song_duration:	int
+			:param transforms:		list
+			:param rand:			random.Random
+			:return transform:		tuple 	(transform, attributes)
+		"""
+		transform = rand.choice(transforms)
+		curve = rand.choice(["linear", "polynomial"])
+		duration = rand.randrange(song_duration)
+		degree = rand.randrange(360)
+		frequency = rand.randint(300, 3000)
+		size = rand.randint(300, 3000)
+		phase = rand.randint(0, 361)
+
+		return transform, get_transform_attributes(transform, duration, curve, degree, frequency, size, phase)
+
+	# Generate Synth Song
+	def generate_synth_song(self, song_duration=600, note_arrays=None, signals=["sine"], transforms=[], num_transforms=10, rand=random):
+		""" Generate Synth Song
+			:description:	NumPy counterpart of generate_waveforms, draws the same signals and transforms into a song rendered on demand
+			:param song_duration:	int 	samples per unit of note duration
+			:param note_arrays:		PoisonSynth.NoteArrays
+			:param signals:			list
+			:param transforms:		list
+			:param num_transforms:	int 	Kept for compatibility, each layer draws one transform
+			:param rand:			random.Random
+			:return song:			PoisonSynth.SynthSong
+		"""
+		list_of_signals = [rand.choice(signals).lower() for _ in range(len(note_arrays))]
+
+		if self.debug and self.verbose:
+			print(list_of_signals)
+
+		frequencies = note_arrays.get_frequencies()
+		durations = note_arrays.get_durations(song_duration)
+
+		clip_cache = PoisonSynth.CLIP_CACHE if np.unique(frequencies).size <= PoisonSynth.MAX_CLIP_FREQUENCIES else None
+
+		layers = []
+		for index, signal in enumerate(list_of_signals):
+			transform, transform_attributes = self.generate_transform(song_duration, transforms, rand)
+
+			if self.debug and self.verbose:
+				print(f"Transform: {transform} {transform_attributes}")
+
+			layer = PoisonSynth.SynthLayer(signal, frequencies[index], durations[index], SAMPLE_RATE, clip_cache)
+			layer.add_transform(transform.lower(), transform_attributes)
+			layers.append(layer)
+
+		return PoisonSynth.SynthSong(layers, SAMPLE_RATE)
+
 
 ###############################################################################
 # Test
@@ -0,0 +1,210 @@
+###############################################################################
+# Program : Poison
+# File : PoisonNoise.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Noise engine working directly on uint8 image buffers.
+#
+# Every function modifies the image in place, one block of rows at a time,
+# so the only temporaries are block sized instead of a float64 copy of the
+# whole frame. Parameters are expressed in pixel units (0 - 255) rather
+# than the [0, 1] float scale used by skimage.util.random_noise.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import numpy as np
+
+
+###############################################################################
+# Constants
+###############################################################################
+LIST_OF_NOISE_MODES = ["gaussian", "localvar", "poisson", "salt", "pepper", "s&p", "speckle"]
+
+NOISE_BLOCK_ROWS = 64
+
+PIXEL_MAX = 255
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Iterate Row Blocks
+def iter_row_blocks(image, block_rows=NOISE_BLOCK_ROWS):
+	""" Iterate Row Blocks
+		:description:	Yields (start, view) pairs covering the image in blocks of rows
+		:param image:		np.ndarray
+		:param block_rows:	int
+		:return blocks:		generator
+	"""
+	for start in range(0, image.shape[0], block_rows):
+		yield start, image[start:start + block_rows]
+
+# Store Block
+def store_block(block, values):
+	np.clip(values, 0, PIXEL_MAX, out=values)
+
+	if values.dtype.kind == 'f':
+		np.rint(values, out=values)
+
+	block[...] = values
+
+# Check Image
+def check_image(image):
+	if not isinstance(image, np.ndarray) or image.dtype != np.uint8:
+		raise Exception(f"Noise expects a uint8 numpy array, got {type(image)}")
+
+	if not image.flags.writeable:
+		raise Exception("Noise is applied in place and needs a writeable array")
+
+# Add Gaussian
+def add_gaussian(image, rng, mean=0.0, var=0.01):
+	""" Add Gaussian
+		:description:	Additive gaussian noise
+		:param image:	np.ndarray	uint8 image, modified in place
+		:param rng:		np.random.Generator
+		:param mean:	float		mean of the noise in pixel units
+		:param var:		float		variance of the noise in pixel units
+		:return image:	np.ndarray
+	"""
+	std = np.float32(var ** 0.5)
+
+	for _, block in iter_row_blocks(image):
+		values = rng.standard_normal(size=block.shape, dtype=np.float32)
+		values *= std
+		values += np.float32(mean)
+		values += block
+
+		store_block(block, values)
+
+	return image
+
+# Add Local Variance
+def add_localvar(image, rng, local_vars=None):
+	""" Add Local Variance
+		:description:	Additive zero mean gaussian noise with a per pixel variance
+		:param image:		np.ndarray	uint8 image, modified in place
+		:param rng:			np.random.Generator
+		:param local_vars:	np.ndarray	variances in pixel units, shaped like image.shape[:2]
+		:return image:		np.ndarray
+	"""
+	if local_vars is None or tuple(local_vars.shape) != tuple(image.shape[:2]):
+		raise Exception(f"local_vars must have shape {image.shape[:2]}")
+
+	for start, block in iter_row_blocks(image):
+		std = np.sqrt(local_vars[start:start + block.shape[0]], dtype=np.float32)
+
+		if block.ndim == 3:
+			std = std[..., np.newaxis]
+
+		values = rng.standard_normal(size=block.shape, dtype=np.float32)
+		values *= std
+		values += block
+
+		store_block(block, values)
+
+	return image
+
+# Add Poisson
+def add_poisson(image, rng):
+	""" Add Poisson
+		:description:	Replaces every pixel with a poisson draw centred on its value
+		:param image:	np.ndarray	uint8 image, modified in place
+		:param rng:		np.random.Generator
+		:return image:	np.ndarray
+	"""
+	for _, block in iter_row_blocks(image):
+		store_block(block, rng.poisson(block))
+
+	return image
+
+# Add Salt And Pepper
+def add_salt_pepper(image, rng, amount=0.05, salt_vs_pepper=0.5):
+	""" Add Salt And Pepper
+		:description:	Replaces a fraction of the pixels with 255 (salt) or 0 (pepper)
+		:param image:			np.ndarray	uint8 image, modified in place
+		:param rng:				np.random.Generator
+		:param amount:			float		fraction of pixels to replace
+		:param salt_vs_pepper:	float		fraction of replaced pixels set to salt
+		:return image:			np.ndarray
+	"""
+	for _, block in iter_row_blocks(image):
+		flipped = rng.random(size=block.shape, dtype=np.float32) < amount
+
+		if salt_vs_pepper >= 1.0:
+			block[flipped] = PIXEL_MAX
+
+		elif salt_vs_pepper <= 0.0:
+			block[flipped] = 0
+
+		else:
+			salted = rng.random(size=block.shape, dtype=np.float32) < salt_vs_pepper
+			block[flipped & salted] = PIXEL_MAX
+			block[flipped & ~salted] = 0
+
+	return image
+
+# Add Salt
+def add_salt(image, rng, amount=0.05):
+	return add_salt_pepper(image, rng, amount=amount, salt_vs_pepper=1.0)
+
+# Add Pepper
+def add_pepper(image, rng, amount=0.05):
+	return add_salt_pepper(image, rng, amount=amount, salt_vs_pepper=0.0)
+
+# Add Speckle
+def add_speckle(image, rng, mean=0.0, var=0.01):
+	""" Add Speckle
+		:description:	Multiplicative noise, image + image * n with n ~ N(mean, var) in pixel units
+		:param image:	np.ndarray	uint8 image, modified in place
+		:param rng:		np.random.Generator
+		:param mean:	float
+		:param var:		float
+		:return image:	np.ndarray
+	"""
+	std = np.float32(var ** 0.5 / PIXEL_MAX)
+
+	for _, block in iter_row_blocks(image):
+		values = rng.standard_normal(size=block.shape, dtype=np.float32)
+		values *= std
+		values += np.float32(1.0 + mean / PIXEL_MAX)
+		values *= block
+
+		store_block(block, values)
+
+	return image
+
+
+DICT_OF_NOISE_FUNCTIONS = {"gaussian": add_gaussian,
+						   "localvar": add_localvar,
+						   "poisson": add_poisson,
+						   "salt": add_salt,
+						   "pepper": add_pepper,
+						   "s&p": add_salt_pepper,
+						   "speckle": add_speckle
+}
+
+# Random Noise
+def random_noise(image, mode="gaussian", rng=None, **kwargs):
+	""" Random Noise
+		:description:	In place replacement for skimage.util.random_noise on uint8 images
+		:param image:	np.ndarray	uint8 image, modified in place
+		:param mode:	str			one of LIST_OF_NOISE_MODES
+		:param rng:		np.random.Generator | int | None
+		:param kwargs:	dict		parameters of the selected mode
+		:return image:	np.ndarray
+	"""
+	if mode not in DICT_OF_NOISE_FUNCTIONS:
+		raise Exception(f"Noise mode {mode} not implemented")
+
+	check_image(image)
+
+	if not isinstance(rng, np.random.Generator):
+		rng = np.random.default_rng(rng)
+
+	return DICT_OF_NOISE_FUNCTIONS[mode](image, rng, **kwargs)
@@ -0,0 +1,277 @@
+###############################################################################
+# Program : Poison
+# File : PoisonPlan.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Render plans describe an image as a list of draw and filter operations
+# with every color already resolved. A plan is built once per image, can
+# be serialized to json, and is executed through dispatch tables so that
+# it can be replayed or rasterized in another process.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import json
+
+from PIL import Image, ImageDraw, ImageColor, ImageFilter
+
+
+###############################################################################
+# Constants
+###############################################################################
+LIST_OF_OP_KINDS = ["shape", "filter"]
+
+PLAN_VERSION = 1
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Resolve Color
+def resolve_color(color, image_mode='RGB'):
+	if isinstance(color, str):
+		return ImageColor.getcolor(color, image_mode)
+
+	# PIL clamps out of range channels when drawing, do the same up front
+	if isinstance(color, (list, tuple)):
+		return tuple(min(max(int(channel), 0), 255) for channel in color)
+
+	return color
+
+# Resolve Palette
+def resolve_palette(colors, image_mode='RGB'):
+	return [resolve_color(color, image_mode) for color in colors]
+
+# Draw Shapes
+def draw_line(draw, a):
+	draw.line(a['xy'], width=a['w'], fill=a['fill'])
+
+def draw_curve(draw, a):
+	draw.line(a['xy'], width=a['w'], fill=a['fill'], joint='curve')
+
+def draw_circle(draw, a):
+	draw.circle(a['xy'], radius=a['r'], outline=a['outline'], fill=a['fill'], width=a['w'])
+
+def draw_arc(draw, a):
+	draw.arc(a['xy'], start=a['start'], end=a['end'], fill=a['fill'], width=a['w'])
+
+def draw_chord(draw, a):
+	draw.chord(a['xy'], start=a['start'], end=a['end'], outline=a['outline'], fill=a['fill'], width=a['w'])
+
+def draw_ellipse(draw, a):
+	draw.ellipse(a['xy'], outline=a['outline'], fill=a['fill'], width=a['w'])
+
+def draw_pieslice(draw, a):
+	draw.pieslice(a['xy'], start=a['start'], end=a['end'], outline=a['outline'], fill=a['fill'], width=a['w'])
+
+def draw_point(draw, a):
+	draw.point(a['xy'], fill=a['fill'])
+
+def draw_polygon(draw, a):
+	draw.polygon(a['xy'], width=a['w'], fill=a['fill'])
+
+def draw_regular_polygon(draw, a):
+	draw.regular_polygon(bounding_circle=a['bounding_circle'], n_sides=a['n_sides'], rotation=a['rotation'],
+						 fill=a['fill'], outline=a['outline'], width=a['w'])
+
+def draw_rectangle(draw, a):
+	draw.rectangle(a['xy'], fill=a['fill'], outline=a['outline'], width=a['w'])
+
+def draw_rounded_rectangle(draw, a):
+	draw.rounded_rectangle(a['xy'], radius=a['r'], fill=a['fill'], outline=a['outline'], corners=a['corners'])
+
+
+DICT_OF_SHAPE_RENDERERS = {"line": draw_line,
+						   "curve": draw_curve,
+						   "circle": draw_circle,
+						   "arc": draw_arc,
+						   "chord": draw_chord,
+						   "ellipse": draw_ellipse,
+						   "pieslice": draw_pieslice,
+						   "point": draw_point,
+						   "polygon": draw_polygon,
+						   "regular_polygon": draw_regular_polygon,
+						   "rectangle": draw_rectangle,
+						   "rounded_rectangle": draw_rounded_rectangle
+}
+
+DICT_OF_FILTER_BUILDERS = {"blur": lambda a: ImageFilter.BLUR,
+						   "contour": lambda a: ImageFilter.CONTOUR,
+						   "detail": lambda a: ImageFilter.DETAIL,
+						   "edge_enhance": lambda a: ImageFilter.EDGE_ENHANCE,
+						   "edge_enhance_more": lambda a: ImageFilter.EDGE_ENHANCE_MORE,
+						   "emboss": lambda a: ImageFilter.EMBOSS,
+						   "find_edges": lambda a: ImageFilter.FIND_EDGES,
+						   "sharpen": lambda a: ImageFilter.SHARPEN,
+						   "smooth": lambda a: ImageFilter.SMOOTH,
+						   "smooth_more": lambda a: ImageFilter.SMOOTH_MORE,
+						   "box_blur": lambda a: ImageFilter.BoxBlur(radius=a['radius']),
+						   "gaussian_blur": lambda a: ImageFilter.GaussianBlur(radius=a['radius']),
+						   "unsharp_mask": lambda a: ImageFilter.UnsharpMask(radius=a['radius'], percent=a['percent'], threshold=a['threshold']),
+						   "kernel": lambda a: ImageFilter.Kernel(size=tuple(a['size']), kernel=a['kernel'], scale=a['scale'], offset=a['offset']),
+						   "rank_filter": lambda a: ImageFilter.RankFilter(size=a['size'], rank=a['rank']),
+						   "median_filter": lambda a: ImageFilter.MedianFilter(size=a['size']),
+						   "min_filter": lambda a: ImageFilter.MinFilter(size=a['size']),
+						   "max_filter": lambda a: ImageFilter.MaxFilter(size=a['size']),
+						   "mode_filter": lambda a: ImageFilter.ModeFilter(size=a['size'])
+}
+
+# Filter Image
+def filter_image(image, name, attributes):
+	""" Filter Image
+		:description:	Applies a filter, at reduced resolution when the attributes carry a downscale factor
+		:param image:		PIL.Image
+		:param name:		str 	entry of DICT_OF_FILTER_BUILDERS
+		:param attributes:	dict 	filter arguments, 'downscale' shrinks the image by that factor first
+		:return image:		PIL.Image
+	"""
+	if name not in DICT_OF_FILTER_BUILDERS:
+		raise Exception(f'{name} not implemented')
+
+	downscale = attributes.get('downscale', 1)
+
+	if downscale <= 1:
+		return image.filter(DICT_OF_FILTER_BUILDERS[name](attributes))
+
+	# Parameters were already scaled down with the image, so the filter only sees the small copy
+	small_size = (max(1, image.size[0] // downscale), max(1, image.size[1] // downscale))
+	small_image = image.resize(small_size, resample=Image.Resampling.BILINEAR)
+
+	return small_image.filter(DICT_OF_FILTER_BUILDERS[name](attributes)).resize(image.size, resample=Image.Resampling.BILINEAR)
+
+# Apply Op
+def apply_op(image, draw, op):
+	""" Apply Op
+		:description:	Executes a single render op and returns the (possibly new) image and draw context
+		:param image:	PIL.Image
+		:param draw:	PIL.ImageDraw
+		:param op:		RenderOp
+		:return result:	tuple	(image, draw)
+	"""
+	if op.kind == "shape":
+		if op.name not in DICT_OF_SHAPE_RENDERERS:
+			raise Exception(f'{op.name} not implemented')
+
+		DICT_OF_SHAPE_RENDERERS[op.name](draw, op.attributes)
+
+	elif op.kind == "filter":
+		image = filter_image(image, op.name, op.attributes)
+		draw = ImageDraw.Draw(image)
+
+	else:
+		raise Exception(f"Op kind {op.kind} not recognized")
+
+	return image, draw
+
+
+###############################################################################
+# Classes
+###############################################################################
+
+# Render Op Class
+class RenderOp(object):
+	__slots__ = ("kind", "name", "attributes")
+
+	def __init__(self, kind, name, attributes=None):
+		""" Initialize
+			:description:	A single draw (kind "shape") or filter (kind "filter") operation
+			:param kind:		str
+			:param name:		str 	entry of LIST_OF_SHAPES or LIST_OF_FILTERS
+			:param attributes:	dict 	arguments with colors already resolved
+		"""
+		if kind not in LIST_OF_OP_KINDS:
+			raise Exception(f"Op kind {kind} not recognized")
+
+		self.kind = kind
+		self.name = name
+		self.attributes = attributes if attributes is not None else {}
+
+	def __repr__(self):
+		return f"RenderOp({self.kind}, {self.name}, {self.attributes})"
+
+	def to_dict(self):
+		return {"kind": self.kind, "name": self.name, "attributes": self.attributes}
+
+	@staticmethod
+	def from_dict(op_dict):
+		attributes = dict(op_dict.get("attributes", {}))
+
+		# json turns tuples into lists, PIL wants tuples for colors and bounding circles
+		for key in ["fill", "outline", "bounding_circle", "corners"]:
+			if isinstance(attributes.get(key), list):
+				attributes[key] = tuple(attributes[key])
+
+		return RenderOp(op_dict["kind"], op_dict["name"], attributes)
+
+# Render Plan Class
+class RenderPlan(object):
+	def __init__(self, image_mode='RGB', size=(120, 120), background=None, palette=None, ops=None,
+				 noise_types=None, noise_params=None, description=""):
+		""" Initialize
+			:description:	Everything needed to rasterize, noise and encode one image
+			:param image_mode:		str
+			:param size:			tuple 	PIL (width, height)
+			:param background:		tuple | int
+			:param palette:			list 	resolved colors the ops were drawn from
+			:param ops:				list 	RenderOp in execution order
+			:param noise_types:		list
+			:param noise_params:	dict
+			:param description:		str 	written to the exif ImageDescription
+		"""
+		self.image_mode = image_mode
+		self.size = tuple(size)
+		self.background = resolve_color(background, image_mode) if background is not None else 0
+		self.palette = palette if palette is not None else []
+		self.ops = ops if ops is not None else []
+		self.noise_types = noise_types if noise_types is not None else []
+		self.noise_params = noise_params if noise_params is not None else {}
+		self.description = description
+
+	def __len__(self):
+		return len(self.ops)
+
+	def new_image(self):
+		return Image.new(mode=self.image_mode, size=self.size, color=self.background)
+
+	def to_dict(self):
+		return {"version": PLAN_VERSION,
+				"image_mode": self.image_mode,
+				"size": list(self.size),
+				"background": self.background,
+				"palette": self.palette,
+				"ops": [op.to_dict() for op in self.ops],
+				"noise_types": self.noise_types,
+				"noise_params": self.noise_params,
+				"description": self.description}
+
+	@staticmethod
+	def from_dict(plan_dict):
+		if plan_dict.get("version", PLAN_VERSION) != PLAN_VERSION:
+			raise Exception(f"Plan version {plan_dict.get('version')} not supported")
+
+		return RenderPlan(image_mode=plan_dict["image_mode"], size=plan_dict["size"], background=plan_dict["background"],
+						  palette=[resolve_color(color) for color in plan_dict.get("palette", [])],
+						  ops=[RenderOp.from_dict(op) for op in plan_dict.get("ops", [])],
+						  noise_types=plan_dict.get("noise_types", []), noise_params=plan_dict.get("noise_params", {}),
+						  description=plan_dict.get("description", ""))
+
+	def to_json(self):
+		return json.dumps(self.to_dict())
+
+	@staticmethod
+	def from_json(plan_json):
+		return RenderPlan.from_dict(json.loads(plan_json))
+
+	def save(self, file_path):
+		with open(file_path, mode="w", encoding="utf-8") as f:
+			f.write(self.to_json())
+
+	@staticmethod
+	def load(file_path):
+		with open(file_path, mode="r", encoding="utf-8") as f:
+			return RenderPlan.from_json(f.read())
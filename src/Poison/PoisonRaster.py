@@ -0,0 +1,341 @@
+###############################################################################
+# Program : Poison
+# File : PoisonRaster.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# NumPy rasterizer backend for render plans.
+#
+# Shapes are painted straight into a uint8 array, so the noise and encode
+# stages can work on the same buffer without a PIL round trip. Filters are
+# still PIL filters and are the only ops that convert the buffer.
+#
+# The backend is opt-in, PoisonImage draws with PIL unless it is given
+# backend="numpy". Running this file benchmarks both on 250 shape plans of
+# 1080x1920: PIL takes 0.12 s per plan and this rasterizer 0.80 s. Most of
+# that is the span copies, a plan fills about 190k row spans, so the copies
+# cost more than PIL's whole render.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import numpy as np
+
+from PIL import Image
+
+import skimage.draw
+
+import PoisonPlan
+
+
+###############################################################################
+# Constants
+###############################################################################
+LIST_OF_BACKENDS = ["pil", "numpy"]
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# New Canvas
+def new_canvas(plan):
+	return np.array(plan.new_image())
+
+# Polygon Spans
+def polygon_spans(xs, ys, height, width):
+	""" Polygon Spans
+		:description:	Even-odd scanline fill of a polygon, sampled at integer pixel centres like skimage.draw.polygon.
+						Work is proportional to the number of rows instead of the bounding box.
+		:return spans:	tuple 	(starts, ends) flat row * width + column offsets, ends exclusive
+	"""
+	xs = np.asarray(xs, dtype=np.float64)
+	ys = np.asarray(ys, dtype=np.float64)
+
+	r0 = max(int(np.ceil(ys.min())), 0)
+	r1 = min(int(np.floor(ys.max())), height - 1)
+
+	if r1 < r0:
+		return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+	rows = np.arange(r0, r1 + 1, dtype=np.float64)[:, np.newaxis]
+
+	x0, y0 = xs, ys
+	x1, y1 = np.roll(xs, -1), np.roll(ys, -1)
+
+	crosses = ((y0 <= rows) & (rows < y1)) | ((y1 <= rows) & (rows < y0))
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		x = x0 + (rows - y0) * (x1 - x0) / (y1 - y0)
+
+	x = np.sort(np.where(crosses, x, np.inf), axis=1)
+
+	if x.shape[1] % 2:
+		x = np.concatenate([x, np.full((x.shape[0], 1), np.inf)], axis=1)
+
+	starts = np.ceil(x[:, 0::2])
+	ends = np.floor(x[:, 1::2])
+
+	valid = np.isfinite(starts) & np.isfinite(ends)
+	starts = np.clip(starts, 0, width - 1)
+	ends = np.clip(ends, -1, width - 1)
+	valid &= ends >= starts
+
+	offsets = np.broadcast_to(rows.astype(np.int64) * width, starts.shape)[valid]
+
+	return offsets + starts[valid].astype(np.int64), offsets + ends[valid].astype(np.int64) + 1
+
+# Fill Polygon
+def fill_polygon(canvas, xs, ys, color):
+	if color is None or len(xs) < 3:
+		return
+
+	starts, ends = polygon_spans(xs, ys, canvas.shape[0], canvas.shape[1])
+
+	# Copying from a pre-filled row is much cheaper than broadcasting the color into every span
+	pixels = canvas.reshape(canvas.shape[0] * canvas.shape[1], -1)
+	row = np.empty((canvas.shape[1], pixels.shape[1]), dtype=canvas.dtype)
+	row[:] = np.asarray(color, dtype=canvas.dtype).reshape(-1)
+
+	for start, end in zip(starts.tolist(), ends.tolist()):
+		pixels[start:end] = row[:end - start]
+
+# Stroke Polyline
+def stroke_polyline(canvas, xs, ys, width, color, closed=False, joints=False):
+	if color is None or width <= 0 or len(xs) < 2:
+		return
+
+	xs = list(xs)
+	ys = list(ys)
+
+	if closed:
+		xs.append(xs[0])
+		ys.append(ys[0])
+
+	half = width / 2.0
+
+	for x0, y0, x1, y1 in zip(xs[:-1], ys[:-1], xs[1:], ys[1:]):
+		length = np.hypot(x1 - x0, y1 - y0)
+
+		if width <= 1 or length == 0:
+			rr, cc = skimage.draw.line(int(round(y0)), int(round(x0)), int(round(y1)), int(round(x1)))
+			keep = (rr >= 0) & (rr < canvas.shape[0]) & (cc >= 0) & (cc < canvas.shape[1])
+			canvas[rr[keep], cc[keep]] = color
+			continue
+
+		nx = -(y1 - y0) / length * half
+		ny = (x1 - x0) / length * half
+
+		fill_polygon(canvas, [x0 + nx, x1 + nx, x1 - nx, x0 - nx], [y0 + ny, y1 + ny, y1 - ny, y0 - ny], color)
+
+	if joints and width > 2:
+		for x, y in zip(xs[1:-1], ys[1:-1]):
+			rr, cc = skimage.draw.disk((y, x), half, shape=canvas.shape[:2])
+			canvas[rr, cc] = color
+
+# Ellipse Points
+def ellipse_points(x0, y0, x1, y1, inset=0, start=0.0, end=360.0):
+	""" Ellipse Points
+		:description:	Points along the ellipse inscribed in a bounding box, from start to end degrees clockwise
+		:return points:	tuple | None 	(xs, ys, centre)
+	"""
+	cx = (x0 + x1) / 2.0
+	cy = (y0 + y1) / 2.0
+	a = (x1 - x0) / 2.0 - inset
+	b = (y1 - y0) / 2.0 - inset
+
+	if a <= 0 or b <= 0:
+		return None
+
+	span = (end - start) % 360.0 or 360.0
+	num_points = int(np.clip(np.pi * (a + b) * span / 360.0 / 4.0, 8, 256))
+	angles = np.radians(start + np.linspace(0.0, span, num_points))
+
+	return cx + a * np.cos(angles), cy + b * np.sin(angles), (cx, cy)
+
+# Fill Ellipse
+def fill_ellipse(canvas, x0, y0, x1, y1, color, inset=0, start=0.0, end=360.0, pie=False):
+	points = ellipse_points(x0, y0, x1, y1, inset=inset, start=start, end=end)
+
+	if points is None:
+		return
+
+	xs, ys, (cx, cy) = points
+
+	if pie:
+		xs = np.append(xs, cx)
+		ys = np.append(ys, cy)
+
+	fill_polygon(canvas, xs, ys, color)
+
+# Fill Rectangle
+def fill_rectangle(canvas, x0, y0, x1, y1, color):
+	rows = slice(max(int(np.ceil(y0)), 0), max(min(int(np.floor(y1)) + 1, canvas.shape[0]), 0))
+	cols = slice(max(int(np.ceil(x0)), 0), max(min(int(np.floor(x1)) + 1, canvas.shape[1]), 0))
+
+	if color is not None:
+		canvas[rows, cols] = color
+
+# Paint Shapes
+def paint_line(canvas, a):
+	xy = a['xy']
+	stroke_polyline(canvas, xy[0::2], xy[1::2], a['w'], a['fill'])
+
+def paint_curve(canvas, a):
+	xy = a['xy']
+	stroke_polyline(canvas, xy[0::2], xy[1::2], a['w'], a['fill'], joints=True)
+
+def paint_circle(canvas, a):
+	x, y = a['xy']
+	r = a['r']
+	paint_ellipse(canvas, {'xy': [x - r, y - r, x + r, y + r], 'w': a['w'], 'fill': a['fill'], 'outline': a['outline']})
+
+def paint_ellipse(canvas, a):
+	fill_ellipse(canvas, *a['xy'], a['outline'])
+	fill_ellipse(canvas, *a['xy'], a['fill'], inset=a['w'])
+
+def paint_arc(canvas, a):
+	outer = ellipse_points(*a['xy'], start=a['start'], end=a['end'])
+
+	if outer is None or a['w'] <= 0 or a['fill'] is None:
+		return
+
+	inner = ellipse_points(*a['xy'], inset=a['w'], start=a['start'], end=a['end'])
+
+	if inner is None:
+		inner = ([outer[2][0]], [outer[2][1]], outer[2])
+
+	fill_polygon(canvas, np.concatenate([outer[0], inner[0][::-1]]), np.concatenate([outer[1], inner[1][::-1]]), a['fill'])
+
+def paint_chord(canvas, a):
+	fill_ellipse(canvas, *a['xy'], a['outline'], start=a['start'], end=a['end'])
+	fill_ellipse(canvas, *a['xy'], a['fill'], inset=a['w'], start=a['start'], end=a['end'])
+
+def paint_pieslice(canvas, a):
+	fill_ellipse(canvas, *a['xy'], a['outline'], start=a['start'], end=a['end'], pie=True)
+	fill_ellipse(canvas, *a['xy'], a['fill'], inset=a['w'], start=a['start'], end=a['end'], pie=True)
+
+def paint_point(canvas, a):
+	x, y = a['xy'][:2]
+
+	if 0 <= y < canvas.shape[0] and 0 <= x < canvas.shape[1]:
+		canvas[y, x] = a['fill']
+
+def paint_polygon(canvas, a):
+	xy = a['xy']
+	fill_polygon(canvas, xy[0::2], xy[1::2], a['fill'])
+
+def paint_regular_polygon(canvas, a):
+	cx, cy, r = a['bounding_circle']
+	n_sides = a['n_sides']
+
+	angles = np.radians((270 - 180.0 / n_sides) + a['rotation'] + np.arange(n_sides) * 360.0 / n_sides)
+	xs = cx + r * np.cos(angles)
+	ys = cy - r * np.sin(angles)
+
+	fill_polygon(canvas, xs, ys, a['fill'])
+	stroke_polyline(canvas, xs, ys, a['w'], a['outline'], closed=True, joints=True)
+
+def paint_rectangle(canvas, a):
+	x0, y0, x1, y1 = a['xy']
+	w = a['w']
+
+	fill_rectangle(canvas, x0, y0, x1, y1, a['outline'])
+	fill_rectangle(canvas, x0 + w, y0 + w, x1 - w, y1 - w, a['fill'])
+
+def paint_rounded_rectangle(canvas, a):
+	x0, y0, x1, y1 = a['xy']
+
+	def outline(inset):
+		radius = max(a['r'] - inset, 0)
+		left, top, right, bottom = x0 + inset, y0 + inset, x1 - inset, y1 - inset
+
+		# corners are ordered top left, top right, bottom right, bottom left like PIL
+		corners = [(left, top, 180.0), (right, top, 270.0), (right, bottom, 0.0), (left, bottom, 90.0)]
+		centres = [(left + radius, top + radius), (right - radius, top + radius), (right - radius, bottom - radius), (left + radius, bottom - radius)]
+
+		xs, ys = [], []
+		for flag, (x, y, start), (cx, cy) in zip(a['corners'], corners, centres):
+			if flag and radius > 0:
+				angles = np.radians(start + np.linspace(0.0, 90.0, 9))
+				xs.extend(cx + radius * np.cos(angles))
+				ys.extend(cy + radius * np.sin(angles))
+
+			else:
+				xs.append(x)
+				ys.append(y)
+
+		return xs, ys
+
+	fill_polygon(canvas, *outline(0), a['outline'])
+	fill_polygon(canvas, *outline(1), a['fill'])
+
+
+DICT_OF_SHAPE_PAINTERS = {"line": paint_line,
+						  "curve": paint_curve,
+						  "circle": paint_circle,
+						  "arc": paint_arc,
+						  "chord": paint_chord,
+						  "ellipse": paint_ellipse,
+						  "pieslice": paint_pieslice,
+						  "point": paint_point,
+						  "polygon": paint_polygon,
+						  "regular_polygon": paint_regular_polygon,
+						  "rectangle": paint_rectangle,
+						  "rounded_rectangle": paint_rounded_rectangle
+}
+
+# Apply Op
+def apply_op(canvas, op):
+	""" Apply Op
+		:description:	Executes a single render op on a uint8 canvas and returns the (possibly new) canvas
+		:param canvas:	np.ndarray
+		:param op:		PoisonPlan.RenderOp
+		:return canvas:	np.ndarray
+	"""
+	if op.kind == "shape":
+		if op.name not in DICT_OF_SHAPE_PAINTERS:
+			raise Exception(f'{op.name} not implemented')
+
+		DICT_OF_SHAPE_PAINTERS[op.name](canvas, op.attributes)
+
+	elif op.kind == "filter":
+		image = PoisonPlan.filter_image(Image.fromarray(canvas), op.name, op.attributes)
+		canvas = np.array(image)
+
+	else:
+		raise Exception(f"Op kind {op.kind} not recognized")
+
+	return canvas
+
+
+###############################################################################
+# Benchmark
+###############################################################################
+if __name__ == "__main__":
+	import time
+
+	from PoisonImage import PoisonImage, DICT_OF_COLORS, LIST_OF_SHAPES
+
+	num_plans = 10
+
+	image = PoisonImage("medium", False, False, 100, 100, (100, 10), 10, 10)
+
+	timings = {backend: 0.0 for backend in LIST_OF_BACKENDS}
+
+	for index in range(num_plans):
+		plan = image.build_plan(height=1920, width=1080, colors=DICT_OF_COLORS["pansexual"], density=index + 2,
+								num_shapes=250, shapes=LIST_OF_SHAPES)
+
+		for backend in LIST_OF_BACKENDS:
+			image.backend = backend
+
+			start_time = time.perf_counter()
+			image.render_plan_array(plan)
+			timings[backend] += time.perf_counter() - start_time
+
+	for backend, elapsed_time in timings.items():
+		print(f"{backend}: {elapsed_time / num_plans:3.3f} s per plan")
@@ -0,0 +1,401 @@
+###############################################################################
+# Program : Poison
+# File : PoisonReservoir.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Reservoir of pre-generated assets.
+#
+# Keeps a target number of ready assets per (media, mode, size) pool and
+# refills the pools from a background process pool, so handing an asset to
+# a crawler costs a file read instead of a generation run. Each asset is
+# served up to max_uses times and retired once it is older than max_age_s.
+# A pool whose generations fail is retried one generation at a time, with
+# the wait doubling after every failure up to MAX_BACKOFF_S.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import os, random, threading, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+###############################################################################
+# Constants
+###############################################################################
+LIST_OF_MEDIA = ["image", "music"]
+
+REFILL_INTERVAL_S = 0.5
+
+MAX_BACKOFF_S = 60.0
+
+
+###############################################################################
+# Workers
+###############################################################################
+WORKER_ARGUMENTS = None
+
+WORKER_GENERATORS = {}
+
+# Init Reservoir Worker
+def init_reservoir_worker(arguments):
+	global WORKER_ARGUMENTS, WORKER_GENERATORS
+
+	# Forked workers inherit the parent's random state and would draw identical assets
+	random.seed()
+
+	WORKER_ARGUMENTS = arguments
+	WORKER_GENERATORS = {}
+
+# Get Worker Generator
+def get_worker_generator(media, mode):
+	if (media, mode) not in WORKER_GENERATORS:
+		arguments = dict(WORKER_ARGUMENTS[media], mode=mode)
+
+		if media == "image":
+			from PoisonImage import PoisonImage
+			WORKER_GENERATORS[(media, mode)] = PoisonImage(**arguments)
+
+		else:
+			from PoisonMusic import PoisonMusic
+			WORKER_GENERATORS[(media, mode)] = PoisonMusic(**arguments)
+
+	return WORKER_GENERATORS[(media, mode)]
+
+# Generate Asset Worker
+def generate_asset_worker(media, mode, kwargs):
+	generator = get_worker_generator(media, mode)
+
+	if media == "image":
+		return generator.generate_image_simple(**kwargs)
+
+	return generator.generate_music_simple(**kwargs)
+
+
+###############################################################################
+# Classes
+###############################################################################
+
+# Reservoir Entry Class
+class ReservoirEntry(object):
+	__slots__ = ("file_path", "created_time", "uses")
+
+	def __init__(self, file_path):
+		self.file_path = file_path
+		self.created_time = time.monotonic()
+		self.uses = 0
+
+	def __repr__(self):
+		return f"ReservoirEntry({self.file_path}, uses={self.uses})"
+
+# Reservoir Pool Class
+class ReservoirPool(object):
+	def __init__(self, media, mode, size, target, kwargs):
+		""" Initialize
+			:description:	Ready assets for one (media, mode, size) key
+			:param media:	str
+			:param mode:	str
+			:param size:	tuple | int 	image_size for images, song_duration for music
+			:param target:	int 			number of ready assets to keep
+			:param kwargs:	dict 			forwarded to generate_image_simple or generate_music_simple
+		"""
+		self.media = media
+		self.mode = mode
+		self.size = size
+		self.target = target
+		self.kwargs = kwargs
+		self.entries = deque()
+		self.pending = 0
+
+		# Entries a get has taken out to read, they go back in unless they were used up
+		self.checked_out = 0
+
+		# Failed generations in a row, the pool is not refilled again before retry_time
+		self.failures = 0
+		self.total_failures = 0
+		self.last_error = None
+		self.retry_time = 0.0
+
+	def deficit(self):
+		if self.failures > 0:
+			# A failing pool only probes with one generation at a time
+			return 1 if self.pending == 0 and time.monotonic() >= self.retry_time else 0
+
+		return max(0, self.target - len(self.entries) - self.pending - self.checked_out)
+
+	# Record Failure
+	def record_failure(self, error):
+		self.failures += 1
+		self.total_failures += 1
+		self.last_error = str(error)
+		self.retry_time = time.monotonic() + min(MAX_BACKOFF_S, REFILL_INTERVAL_S * 2 ** (self.failures - 1))
+
+	# Record Success
+	def record_success(self):
+		self.failures = 0
+		self.retry_time = 0.0
+
+# Poison Reservoir Class
+class PoisonReservoir(object):
+	def __init__(self, poison, target=8, max_uses=1, max_age_s=None, workers=None, mp_context=None):
+		""" Initialize
+			:description:	Pre-generated asset reservoir on top of a Poison instance
+			:param poison:		Poison 		supplies the generator settings, image and/or music must be enabled
+			:param target:		int 		default number of ready assets per pool
+			:param max_uses:	int 		times an asset is handed out before it is deleted
+			:param max_age_s:	float | None 	assets older than this are deleted unserved, None keeps them
+			:param workers:		int | None 	background pool size, defaults to os.cpu_count()
+			:param mp_context:	multiprocessing context | None
+		"""
+		if max_uses < 1:
+			raise Exception(f"Invalid max_uses {max_uses}. Use at least 1")
+
+		self.poison = poison
+		self.target = target
+		self.max_uses = max_uses
+		self.max_age_s = max_age_s
+		self.workers = workers
+		self.mp_context = mp_context
+
+		self.pools = {}
+		self.condition = threading.Condition()
+		self.executor = None
+		self.thread = None
+		self.running = False
+
+		# Set by stop(delete=True), an entry handed back by a get still reading it is then deleted instead of kept
+		self.discard = False
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.stop()
+
+	# Get Key
+	def get_key(self, media, mode=None, size=None):
+		if media not in LIST_OF_MEDIA:
+			raise Exception(f"Media {media} not implemented. Try {LIST_OF_MEDIA}")
+
+		mode = (mode if mode is not None else self.poison.mode).lower()
+
+		if media == "image":
+			if not self.poison.generate_image:
+				raise Exception("Image generation is not enabled")
+
+			size = tuple(size) if size is not None else (1920, 1080)
+
+		else:
+			if not self.poison.generate_music:
+				raise Exception("Music generation is not enabled")
+
+			size = size if size is not None else self.poison.song_duration
+
+		return (media, mode, size)
+
+	# Get Worker Arguments
+	def get_worker_arguments(self):
+		arguments = {}
+
+		if self.poison.generate_image:
+			arguments["image"] = self.poison.image.get_worker_arguments()
+
+		if self.poison.generate_music:
+			arguments["music"] = self.poison.music.get_worker_arguments()
+
+		return arguments
+
+	# Register
+	def register(self, media="image", mode=None, size=None, target=None, **kwargs):
+		""" Register
+			:description:	Adds a pool, the refill thread fills it in the background
+			:param media:	str 			entry of LIST_OF_MEDIA
+			:param mode:	str | None 		defaults to the Poison mode
+			:param size:	tuple | int | None 	image_size for images, song_duration for music
+			:param target:	int | None 		defaults to the reservoir target
+			:param kwargs:	dict 			forwarded to the generator
+			:return key:	tuple 			(media, mode, size)
+		"""
+		key = self.get_key(media, mode, size)
+
+		if media == "image":
+			kwargs = dict(kwargs, image_size=key[2])
+
+		else:
+			defaults = {"octave_range": self.poison.octave_range, "key": self.poison.musical_key, "key_type": self.poison.key_type,
+						"num_notes": self.poison.num_notes, "max_note_duration": self.poison.max_note_duration,
+						"extension": self.poison.song_extension}
+
+			kwargs = dict(defaults, **kwargs, song_duration=key[2])
+
+		with self.condition:
+			# Replacing a pool would orphan its ready files and let its running generations land in the new one
+			if key in self.pools:
+				raise Exception(f"A pool is already registered for {key}")
+
+			self.pools[key] = ReservoirPool(key[0], key[1], key[2], target if target is not None else self.target, kwargs)
+			self.condition.notify_all()
+
+		return key
+
+	# Start
+	def start(self):
+		if self.running:
+			return
+
+		self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context,
+											initializer=init_reservoir_worker, initargs=(self.get_worker_arguments(),))
+		self.running = True
+		self.discard = False
+
+		self.thread = threading.Thread(target=self.run_refill, name="PoisonReservoir", daemon=True)
+		self.thread.start()
+
+	# Stop
+	def stop(self, delete=True):
+		""" Stop
+			:description:	Stops refilling, waits for running generations and deletes every unserved asset
+			:param delete:	bool
+		"""
+		if not self.running:
+			return
+
+		with self.condition:
+			self.running = False
+			self.condition.notify_all()
+
+		self.thread.join()
+		self.executor.shutdown(wait=True, cancel_futures=True)
+
+		if delete:
+			with self.condition:
+				self.discard = True
+
+				for pool in self.pools.values():
+					while pool.entries:
+						self.delete_entry(pool.entries.popleft())
+
+	# Run Refill
+	def run_refill(self):
+		with self.condition:
+			while self.running:
+				for key, pool in self.pools.items():
+					self.retire_stale(pool)
+
+					for _ in range(pool.deficit()):
+						pool.pending += 1
+						future = self.executor.submit(generate_asset_worker, pool.media, pool.mode, pool.kwargs)
+						future.add_done_callback(lambda future, key=key: self.on_generated(key, future))
+
+				self.condition.wait(timeout=REFILL_INTERVAL_S)
+
+	# On Generated
+	def on_generated(self, key, future):
+		with self.condition:
+			pool = self.pools[key]
+			pool.pending -= 1
+
+			if future.cancelled():
+				return
+
+			if future.exception() is not None:
+				pool.record_failure(future.exception())
+
+				if self.poison.debug:
+					print(f"Reservoir generation for {key} failed {pool.failures} times in a row due to: {future.exception()}")
+
+				return
+
+			pool.record_success()
+			entry = ReservoirEntry(future.result())
+
+			if self.running:
+				pool.entries.append(entry)
+				self.condition.notify_all()
+
+			else:
+				self.delete_entry(entry)
+
+	# Retire Stale
+	def retire_stale(self, pool):
+		if self.max_age_s is None:
+			return
+
+		oldest_time = time.monotonic() - self.max_age_s
+
+		while pool.entries and pool.entries[0].created_time < oldest_time:
+			self.delete_entry(pool.entries.popleft())
+
+	# Delete Entry
+	def delete_entry(self, entry):
+		try:
+			os.remove(entry.file_path)
+		except OSError as ex:
+			if self.poison.debug:
+				print(f"Could not delete {entry.file_path} due to: {ex}")
+
+	# Get
+	def get(self, media="image", mode=None, size=None, block=False, timeout=None):
+		""" Get
+			:description:	Hands out a ready asset, the least used entries go first
+			:param media:	str
+			:param mode:	str | None
+			:param size:	tuple | int | None
+			:param block:	bool 			wait for the refill when the pool is empty
+			:param timeout:	float | None 	seconds to wait when blocking
+			:return asset:	bytes | None 	None when the pool is empty and block is False or the wait timed out
+		"""
+		key = self.get_key(media, mode, size)
+
+		with self.condition:
+			if key not in self.pools:
+				raise Exception(f"No pool registered for {key}")
+
+			pool = self.pools[key]
+			self.retire_stale(pool)
+
+			if not pool.entries and block:
+				self.condition.wait_for(lambda: pool.entries or not self.running, timeout=timeout)
+
+			if not pool.entries:
+				return None
+
+			entry = pool.entries.popleft()
+			entry.uses += 1
+			pool.checked_out += 1
+
+		# The entry is out of the pool so nothing retires it, the read does not need to hold up other gets and the refill
+		try:
+			with open(entry.file_path, mode="rb") as f:
+				asset = f.read()
+
+		finally:
+			with self.condition:
+				pool.checked_out -= 1
+
+				if entry.uses < self.max_uses and not self.discard:
+					pool.entries.append(entry)
+
+				else:
+					self.delete_entry(entry)
+
+					# Wake the refill thread for the replacement
+					self.condition.notify_all()
+
+		return asset
+
+	# Get Stats
+	def get_stats(self):
+		""" Get Stats
+			:description:	State of every pool. failures counts failed generations in a row, total_failures every one so far
+			:return stats:	dict 	key -> dict
+		"""
+		with self.condition:
+			return {key: {"ready": len(pool.entries), "pending": pool.pending, "checked_out": pool.checked_out, "target": pool.target,
+						  "failures": pool.failures, "total_failures": pool.total_failures, "last_error": pool.last_error}
+					for key, pool in self.pools.items()}
@@ -0,0 +1,113 @@
+###############################################################################
+# Program : Poison
+# File : PoisonRing.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Shared memory ring buffer of frame slots.
+#
+# Worker processes write a finished frame into a slot and only hand the
+# slot index back, so a frame never goes through a pipe. The consumer reads
+# the slot in place. Frame i uses slot i % num_slots, and the producer only
+# submits frame i once frame i - num_slots has been consumed, which is what
+# lets slots be reused and holds the workers back when the consumer is slow.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+###############################################################################
+# Classes
+###############################################################################
+
+# Frame Ring Class
+class FrameRing(object):
+	def __init__(self, shape, num_slots, name=None, dtype=np.uint8):
+		""" Initialize
+			:description:	Creates the ring, or attaches to the ring called name from another process
+			:param shape:		tuple 		shape of every frame
+			:param num_slots:	int
+			:param name:		str | None 	shared memory block to attach to, None creates one
+			:param dtype:		np.dtype
+		"""
+		if num_slots < 1:
+			raise Exception(f"Invalid num_slots {num_slots}. Use a positive, non-zero integer value")
+
+		self.shape = tuple(shape)
+		self.num_slots = num_slots
+		self.dtype = np.dtype(dtype)
+		self.slot_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+
+		# Only the process that created the block unlinks it
+		self.owner = name is None
+
+		if self.owner:
+			self.memory = shared_memory.SharedMemory(create=True, size=max(self.slot_bytes * num_slots, 1))
+
+		else:
+			self.memory = shared_memory.SharedMemory(name=name)
+
+		self.slots = np.ndarray((num_slots,) + self.shape, dtype=self.dtype, buffer=self.memory.buf)
+
+	def __len__(self):
+		return self.num_slots
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	# Get Arguments
+	def get_arguments(self):
+		""" Get Arguments
+			:description:	What another process passes to FrameRing to attach to this ring
+			:return arguments:	dict
+		"""
+		return {"shape": self.shape, "num_slots": self.num_slots, "name": self.memory.name, "dtype": self.dtype.str}
+
+	# Get Slot
+	def get_slot(self, index):
+		""" Get Slot
+			:description:	View of the slot of frame index, valid until that slot is written again
+			:param index:	int
+			:return slot:	np.ndarray
+		"""
+		return self.slots[index % self.num_slots]
+
+	# Write
+	def write(self, index, frame):
+		""" Write
+			:description:	Copies frame into the slot of frame index
+			:param index:	int
+			:param frame:	np.ndarray
+			:return slot:	int 	the slot written
+		"""
+		if frame.shape != self.shape:
+			raise Exception(f"Frame #{index} is {frame.shape}, the ring holds {self.shape}")
+
+		slot = index % self.num_slots
+		np.copyto(self.slots[slot], frame, casting="unsafe")
+
+		return slot
+
+	# Close
+	def close(self):
+		self.slots = None
+
+		try:
+			self.memory.close()
+		except BufferError:
+			# A consumer still holds a view, the mapping goes away with it
+			pass
+
+		if self.owner:
+			self.owner = False
+			self.memory.unlink()
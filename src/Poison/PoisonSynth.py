@@ -0,0 +1,748 @@
+###############################################################################
+# Program : Poison
+# File : PoisonSynth.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# NumPy oscillator engine for PoisonMusic.
+#
+# The phase at the start of every note is accumulated once per layer, so the
+# waveform of any sample is a closed form of its position and a layer can be
+# rendered for any range of samples. Transforms map positions and scale the
+# gain instead of rewriting a buffer, which lets a song be mixed and written
+# a block at a time in constant memory. The note, waveform and transform
+# semantics follow gensound, which stays available as the other backend.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import io, threading, wave
+from collections import OrderedDict
+
+import numpy as np
+
+# Poison
+import Utils
+
+
+###############################################################################
+# Constants
+###############################################################################
+LIST_OF_BACKENDS = ["gensound", "numpy"]
+
+SAMPLE_RATE = 44100
+
+SAMPLE_WIDTH = 2
+
+# The RIFF header stores the data size and the 36 header bytes after it in 32 bits
+MAX_WAV_BYTES = 2 ** 32 - 1 - 36
+
+# Samples per channel rendered at a time by the streaming writer
+BLOCK_SIZE = 2 ** 16
+
+RAMP = np.arange(BLOCK_SIZE, dtype=np.float64)
+
+# Bytes of clips kept by the shared ClipCache, a clip is up to a block of float32 sines and cosines,
+# so this holds the 8 scale degrees x 5 octaves of a key with room to spare
+CLIP_CACHE_BYTES = 64 * 1024 ** 2
+
+# Only sines are worth caching, the other waves are cheaper to compute than to shift out of a clip
+LIST_OF_CLIP_SIGNALS = ["sine"]
+
+# Songs with more distinct frequencies than this (random cents) would only churn the cache
+MAX_CLIP_FREQUENCIES = 256
+
+# gensound tunes from A4 = 440 Hz, middle C is 9 semitones below
+MIDDLE_A = 440.0
+
+DICT_OF_STEP_SEMITONES = {"c": 0, "d": 2, "e": 4, "f": 5, "g": 7, "a": 9, "b": 11}
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Pitch Semitones
+def pitch_semitones(pitch):
+	""" Pitch Semitones
+		:description:	Semitones above C of a scale entry such as "c", "f#" or "bb"
+		:param pitch:		str 			"r" for a rest
+		:return semitones:	int | None 		None for a rest
+	"""
+	if pitch.lower() == 'r':
+		return None
+
+	return DICT_OF_STEP_SEMITONES[pitch[0].lower()] + pitch.count('#') - pitch[1:].count('b')
+
+# Accidental Semitones
+def accidental_semitones(accidental):
+	if accidental == '#':
+		return 1
+
+	elif accidental == 'b':
+		return -1
+
+	return 0
+
+# Semitones To Frequency
+def semitones_to_frequency(semitones):
+	""" Semitones To Frequency
+		:description:	gensound's tuning, semitones are counted from middle C
+		:param semitones:	float | np.ndarray
+		:return frequency:	float | np.ndarray
+	"""
+	return MIDDLE_A * 2 ** ((semitones - 9) / 12)
+
+# Waves, phase is float32 in cycles within [0, 1), rint is much cheaper than %
+def sine_wave(phase):
+	return np.sin(np.float32(2 * np.pi) * phase)
+
+def triangle_wave(phase):
+	phase = phase - np.float32(0.25)
+	return 1 - 4 * np.abs(phase - np.rint(phase))
+
+def square_wave(phase):
+	return (phase < 0.5).astype(np.float32) * 2 - 1
+
+def sawtooth_wave(phase):
+	return 2 * (phase - np.rint(phase))
+
+
+DICT_OF_WAVES = {"sine": sine_wave,
+				 "triangle": triangle_wave,
+				 "square": square_wave,
+				 "sawtooth": sawtooth_wave
+}
+
+# Get Ramp
+def get_ramp(length):
+	""" Get Ramp
+		:description:	View of 0, 1, ..., length - 1 as float64, grown on demand and shared between calls
+		:param length:	int
+		:return ramp:	np.ndarray
+	"""
+	global RAMP
+
+	if len(RAMP) < length:
+		RAMP = np.arange(max(length, BLOCK_SIZE), dtype=np.float64)
+
+	return RAMP[:length]
+
+# Plan Durations
+def plan_durations(num_layers, num_notes, length, max_duration, rng):
+	""" Plan Durations
+		:description:	Note durations filling every layer with exactly length beats. Random weights are scaled
+						to the budget, what goes over max_duration is handed to the notes still under it and the
+						rounding error goes to the largest remainders. When num_notes notes of max_duration cannot
+						fill the budget, every note gets max_duration and a trailing rest takes the rest.
+		:param num_layers:		int
+		:param num_notes:		int
+		:param length:			int 	beats per layer, at least num_notes
+		:param max_duration:	int 	beats
+		:param rng:				np.random.Generator
+		:return durations:		np.ndarray 	int64 beats, (num_layers, num_notes) or (num_layers, num_notes + 1) with the rest last
+	"""
+	if length < num_notes:
+		raise Exception(f"Cannot fit {num_notes} notes in {length} beats")
+
+	if num_notes * max_duration <= length:
+		durations = np.full((num_layers, num_notes), max_duration, dtype=np.int64)
+		rest = length - num_notes * max_duration
+
+		if rest == 0:
+			return durations
+
+		return np.concatenate([durations, np.full((num_layers, 1), rest, dtype=np.int64)], axis=1)
+
+	# Every note keeps one sample, the weights share out the remainder
+	budget = length - num_notes
+	cap = max_duration - 1
+
+	weights = rng.integers(1, max_duration, endpoint=True, size=(num_layers, num_notes)).astype(np.float64)
+	shares = weights * (budget / weights.sum(axis=1, keepdims=True))
+
+	# Each pass caps at least one more note, num_notes * cap >= budget so the notes under the cap can always take the excess
+	for _ in range(num_notes):
+		excess = np.maximum(shares - cap, 0).sum(axis=1, keepdims=True)
+
+		if not excess.any():
+			break
+
+		shares = np.minimum(shares, cap)
+		free = np.where(shares < cap, shares, 0)
+		shares += free * (excess / np.maximum(free.sum(axis=1, keepdims=True), 1e-12))
+
+	durations = np.floor(shares).astype(np.int64)
+	remainders = budget - durations.sum(axis=1)
+
+	# Remainders sum to an integer below the number of fractional shares, so no capped note is raised
+	ranks = np.argsort(np.argsort(durations - shares, axis=1, kind="stable"), axis=1, kind="stable")
+	durations += ranks < remainders[:, None]
+
+	return np.minimum(durations, cap) + 1
+
+# Transforms map output positions back to positions before the transform and scale the gain there,
+# so a layer can be rendered for any block of samples. length is the layer length before the transform
+def shift_transform(positions, gain, length, attributes, sample_rate):
+	# Applied as the layer offset, like gensound keeps it apart from the samples
+	return positions, gain
+
+def extend_transform(positions, gain, length, attributes, sample_rate):
+	gain[positions >= length] = 0.0
+	return positions, gain
+
+def reverse_transform(positions, gain, length, attributes, sample_rate):
+	return length - 1 - positions, gain
+
+def fade_amplitude(positions, attributes, length):
+	amplitude = positions / max(min(attributes['duration'], length) - 1, 1)
+
+	if attributes['curve'] == "polynomial":
+		amplitude = amplitude ** attributes['degree']
+
+	return amplitude.astype(np.float32)
+
+def fadein_transform(positions, gain, length, attributes, sample_rate):
+	fading = positions < min(attributes['duration'], length)
+	gain[fading] *= fade_amplitude(positions[fading], attributes, length)
+
+	return positions, gain
+
+def fadeout_transform(positions, gain, length, attributes, sample_rate):
+	fading = positions >= length - min(attributes['duration'], length)
+	gain[fading] *= fade_amplitude(length - 1 - positions[fading], attributes, length)
+
+	return positions, gain
+
+def sineam_transform(positions, gain, length, attributes, sample_rate):
+	# Reduced to cycles in float64 first, so the float32 sine stays exact however long the song is
+	cycles = attributes['phase'] / (2 * np.pi) + positions * (attributes['frequency'] / sample_rate)
+	cycles -= np.floor(cycles)
+
+	gain *= sine_wave(cycles.astype(np.float32)) * np.float32(attributes['size']) + np.float32(1 - attributes['size'])
+
+	return positions, gain
+
+
+DICT_OF_TRANSFORM_FUNCTIONS = {"shift": shift_transform,
+							   "extend": extend_transform,
+							   "reverse": reverse_transform,
+							   "fadein": fadein_transform,
+							   "fadeout": fadeout_transform,
+							   "sineam": sineam_transform
+}
+
+# Get PCM
+def get_pcm(samples, peak):
+	""" Get PCM
+		:description:	16 bit frames, shrinking by peak only when it is over 1 like gensound's default fit
+		:param samples:	np.ndarray 	(num_samples,) or (num_channels, num_samples)
+		:param peak:	float
+		:return frames:	bytes 		interleaved
+	"""
+	samples = np.atleast_2d(samples)
+
+	if peak > 1:
+		samples = samples * (1 / peak)
+
+	return np.ascontiguousarray((samples * (2 ** (8 * SAMPLE_WIDTH - 1) - 1)).astype(np.int16).T).tobytes()
+
+# Get Block Peak
+def get_block_peak(block):
+	return float(np.max(np.abs(block))) if len(block) > 0 else 0.0
+
+# Write Wav
+def write_wav(sink, samples, sample_rate=SAMPLE_RATE):
+	""" Write Wav
+		:description:	Writes samples held in memory as 16 bit PCM
+		:param sink:		str | writable binary stream
+		:param samples:		np.ndarray 	(num_samples,) or (num_channels, num_samples)
+		:param sample_rate:	int
+	"""
+	samples = np.atleast_2d(samples)
+
+	peak = np.max(np.abs(samples)) if samples.size > 0 else 0.0
+
+	with wave.open(sink, "wb") as wav_file:
+		wav_file.setnchannels(samples.shape[0])
+		wav_file.setsampwidth(SAMPLE_WIDTH)
+		wav_file.setframerate(sample_rate)
+		wav_file.writeframes(get_pcm(samples, peak))
+
+# Iterate Wav
+def iterate_wav(song, block_size=BLOCK_SIZE, peak=None, exact_peak=True, executor=None, max_in_flight=None):
+	""" Iterate Wav
+		:description:	Renders a song block by block and yields the WAV file as it goes, the header first
+		:param song:		SynthSong
+		:param block_size:	int 			samples rendered at a time, memory does not grow with the song
+		:param peak:		float | None 	None measures it as set by exact_peak
+		:param exact_peak:	bool 			True mixes the song twice to scale by its real peak like gensound does,
+											False scales by song.get_peak_bound() in one pass, which is quieter
+		:param executor:	ProcessPoolExecutor | None 	renders the blocks side by side, its workers must run init_song_worker(song)
+		:param max_in_flight:	int | None 	blocks queued or waiting to be written, defaults to twice the pool size
+		:return chunks:		generator 		bytes
+	"""
+	buffer = io.BytesIO()
+
+	# The frame count is known up front, so wave never has to seek back and patch the header
+	wav_file = wave.open(buffer, "wb")
+	wav_file.setnchannels(1)
+	wav_file.setsampwidth(SAMPLE_WIDTH)
+	wav_file.setframerate(song.sample_rate)
+	wav_file.setnframes(song.get_length())
+
+	# The header goes out before the peak is measured, so a reader waiting on it is not held up by the first pass
+	wav_file.writeframesraw(b"")
+
+	yield buffer.getvalue()
+
+	buffer.seek(0)
+	buffer.truncate()
+
+	if peak is None:
+		peak = song.get_peak(block_size, executor, max_in_flight) if exact_peak else song.get_peak_bound()
+
+	if executor is None:
+		chunks = (get_pcm(block, peak) for block in song.iterate_blocks(block_size))
+
+	else:
+		# Workers send back 16 bit frames, half the bytes of the float32 block
+		chunks = Utils.run_ordered(executor, render_pcm_worker, [(start, end, peak) for start, end in song.get_ranges(block_size)], max_in_flight=max_in_flight)
+
+	for frames in chunks:
+		wav_file.writeframesraw(frames)
+
+		yield buffer.getvalue()
+
+		buffer.seek(0)
+		buffer.truncate()
+
+	wav_file.close()
+
+	if buffer.tell() > 0:
+		yield buffer.getvalue()
+
+# Write Song
+def write_song(sink, song, block_size=BLOCK_SIZE, peak=None, exact_peak=True, executor=None, max_in_flight=None):
+	""" Write Song
+		:description:	Streams a song into a WAV file or a writable stream, which does not need to be seekable
+		:param sink:		str | writable binary stream
+		:param song:		SynthSong
+		:param block_size:	int
+		:param peak:		float | None
+		:param exact_peak:	bool 	see iterate_wav
+		:param executor:	ProcessPoolExecutor | None 	see iterate_wav
+		:param max_in_flight:	int | None
+	"""
+	if isinstance(sink, str):
+		with open(sink, "wb") as f:
+			return write_song(f, song, block_size, peak, exact_peak, executor, max_in_flight)
+
+	for chunk in iterate_wav(song, block_size, peak, exact_peak, executor, max_in_flight):
+		sink.write(chunk)
+
+
+###############################################################################
+# Classes
+###############################################################################
+
+# Note Arrays Class
+class NoteArrays(object):
+	def __init__(self, pitches, pitch_index, accidental, octave, cents, duration):
+		""" Initialize
+			:description:	Struct of arrays for the notes of every layer, each array is (num_layers, num_notes)
+			:param pitches:		list 		scale entries the pitch indices point into
+			:param pitch_index:	np.ndarray 	int
+			:param accidental:	np.ndarray 	int, semitones added by the accidental
+			:param octave:		np.ndarray 	int
+			:param cents:		np.ndarray 	int
+			:param duration:	np.ndarray 	int, in beats, a planned rest can follow the notes
+		"""
+		self.pitches = list(pitches)
+		self.pitch_index = pitch_index
+		self.accidental = accidental
+		self.octave = octave
+		self.cents = cents
+		self.duration = duration
+
+		scale = [pitch_semitones(pitch) for pitch in self.pitches]
+
+		# Rests get a placeholder, their frequency is zeroed below
+		self.scale_semitones = np.array([0 if semitones is None else semitones for semitones in scale], dtype=np.float64)
+		self.scale_rests = np.array([semitones is None for semitones in scale], dtype=bool)
+
+	def __len__(self):
+		return self.pitch_index.shape[0]
+
+	# Get Rests
+	def get_rests(self):
+		return self.scale_rests[self.pitch_index]
+
+	# Get Frequencies
+	def get_frequencies(self):
+		""" Get Frequencies
+			:description:	Frequencies of every note in one vectorized pass
+			:return frequencies:	np.ndarray 	Hz, 0 for rests
+		"""
+		semitones = 12 * (self.octave - 4) + self.scale_semitones[self.pitch_index] + self.accidental + self.cents / 100
+
+		return np.where(self.get_rests(), 0.0, semitones_to_frequency(semitones))
+
+	# Get Durations
+	def get_durations(self, samples_per_beat=1):
+		return self.duration * samples_per_beat
+
+# Clip Cache Class
+class ClipCache(object):
+	def __init__(self, max_bytes=CLIP_CACHE_BYTES):
+		""" Initialize
+			:description:	LRU cache of sine clips starting at phase 0, one per frequency / sample rate. A clip holds the sine
+							and the cosine, which combine into the note at the exact phase it starts with.
+			:param max_bytes:	int
+		"""
+		self.max_bytes = max_bytes
+		self.lock = threading.Lock()
+		self.clips = OrderedDict()
+		self.total_bytes = 0
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self):
+		with self.lock:
+			return len(self.clips)
+
+	def __getstate__(self):
+		# Sent to song workers empty and without the lock, each warms its own clips
+		state = dict(self.__dict__, clips=OrderedDict(), total_bytes=0, hits=0, misses=0)
+		del state["lock"]
+
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.lock = threading.Lock()
+
+	# Get
+	def get(self, increment, length):
+		""" Get
+			:description:	Clip of at least length samples, rendered on a miss
+			:param increment:	float 	frequency / sample rate
+			:param length:		int
+			:return clip:		np.ndarray 	float32 (2, length), sine and cosine, read only
+		"""
+		key = increment
+
+		with self.lock:
+			clip = self.clips.get(key)
+
+			if clip is not None and clip.shape[-1] >= length:
+				self.hits += 1
+				self.clips.move_to_end(key)
+				return clip
+
+			self.misses += 1
+
+		# Only what was asked for, a frequency that never repeats costs no more than computing it directly
+		phase = get_ramp(length) * increment
+		phase -= np.floor(phase)
+		phase = phase.astype(np.float32)
+
+		clip = np.stack([sine_wave(phase), sine_wave(phase + np.float32(0.25))])
+		clip.flags.writeable = False
+
+		with self.lock:
+			if key in self.clips:
+				self.total_bytes -= self.clips.pop(key).nbytes
+
+			self.clips[key] = clip
+			self.total_bytes += clip.nbytes
+
+			while self.total_bytes > self.max_bytes and len(self.clips) > 1:
+				self.total_bytes -= self.clips.popitem(last=False)[1].nbytes
+
+		return clip
+
+	# Clear
+	def clear(self):
+		with self.lock:
+			self.clips.clear()
+			self.total_bytes = 0
+
+	# Get Stats
+	def get_stats(self):
+		with self.lock:
+			return {"clips": len(self.clips), "bytes": self.total_bytes, "hits": self.hits, "misses": self.misses}
+
+
+CLIP_CACHE = ClipCache()
+
+# Synth Layer Class
+class SynthLayer(object):
+	def __init__(self, signal, frequencies, durations, sample_rate=SAMPLE_RATE, clip_cache=None):
+		""" Initialize
+			:description:	A note sequence that can be rendered for any range of samples, the phase stays continuous from note to note
+			:param signal:		str 		entry of DICT_OF_WAVES
+			:param frequencies:	np.ndarray 	Hz per note, 0 for rests
+			:param durations:	np.ndarray 	samples per note
+			:param sample_rate:	int
+			:param clip_cache:	ClipCache | None 	builds sine notes out of cached clips, None computes every sample
+		"""
+		if signal not in DICT_OF_WAVES:
+			raise Exception(f"Signal {signal} not recognized")
+
+		durations = np.asarray(durations, dtype=np.int64)
+
+		self.signal = signal
+		self.sample_rate = sample_rate
+		self.clip_cache = clip_cache if signal in LIST_OF_CLIP_SIGNALS else None
+		self.increments = np.asarray(frequencies, dtype=np.float64) / sample_rate
+		self.note_ends = np.cumsum(durations)
+		self.note_starts = self.note_ends - durations
+
+		# Phase in cycles at the start of every note
+		cycles = self.increments * durations
+		self.note_phases = np.concatenate([[0.0], np.cumsum(cycles[:-1])]) % 1.0 if len(cycles) > 0 else cycles
+
+		self.notes_length = int(self.note_ends[-1]) if len(durations) > 0 else 0
+		self.length = self.notes_length
+		self.offset = 0
+		self.peak = 1.0
+		self.transforms = []
+
+	# Add Transform
+	def add_transform(self, transform, attributes):
+		""" Add Transform
+			:description:	Appends a transform, nothing is rendered until render is called
+			:param transform:	str 	entry of DICT_OF_TRANSFORM_FUNCTIONS
+			:param attributes:	dict
+		"""
+		if transform not in DICT_OF_TRANSFORM_FUNCTIONS:
+			raise Exception(f"Transform {transform} not implemented")
+
+		self.transforms.append((transform, attributes, self.length))
+
+		if transform == "shift":
+			self.offset += attributes['duration']
+
+		elif transform == "extend":
+			self.length += attributes['duration']
+
+		elif transform == "sineam":
+			self.peak *= max(1.0, abs(1 - 2 * attributes['size']))
+
+	# Render Notes
+	def render_notes(self, start, end):
+		""" Render Notes
+			:description:	Untransformed samples start to end, the notes are located once per call rather than per sample
+			:param start:		int
+			:param end:			int
+			:return samples:	np.ndarray 	float32
+		"""
+		first = np.searchsorted(self.note_ends, start, side="right")
+		last = np.searchsorted(self.note_ends, end - 1, side="right") + 1
+
+		if self.clip_cache is not None:
+			return self.copy_notes(start, end, first, last)
+
+		phase = np.empty(end - start)
+		rests = []
+
+		# A block spans a handful of notes, each is a linear phase ramp from where the note enters the block
+		for index in range(first, last):
+			note_start = max(self.note_starts[index], start)
+			note_end = min(self.note_ends[index], end)
+			increment = self.increments[index]
+
+			if increment == 0:
+				rests.append((note_start - start, note_end - start))
+
+			piece = phase[note_start - start:note_end - start]
+			np.multiply(get_ramp(note_end - note_start), increment, out=piece)
+			piece += self.note_phases[index] + (note_start - self.note_starts[index]) * increment
+
+		phase -= np.floor(phase)
+
+		samples = DICT_OF_WAVES[self.signal](phase.astype(np.float32))
+
+		for rest_start, rest_end in rests:
+			samples[rest_start:rest_end] = 0.0
+
+		return samples
+
+	# Copy Notes
+	def copy_notes(self, start, end, first, last):
+		""" Copy Notes
+			:description:	render_notes out of the clip cache, every note is its clip shifted by the exact phase it enters with
+			:param start:		int
+			:param end:			int
+			:param first:		int 	first note in the range
+			:param last:		int 	one past the last note in the range
+			:return samples:	np.ndarray 	float32
+		"""
+		samples = np.empty(end - start, dtype=np.float32)
+
+		for index in range(first, last):
+			note_start = max(self.note_starts[index], start)
+			note_end = min(self.note_ends[index], end)
+			increment = self.increments[index]
+
+			if increment == 0:
+				samples[note_start - start:note_end - start] = 0.0
+				continue
+
+			cycles = (self.note_phases[index] + (note_start - self.note_starts[index]) * increment) % 1.0
+			length = note_end - note_start
+			clip = self.clip_cache.get(increment, length)
+			piece = samples[note_start - start:note_end - start]
+
+			# sin(a + b) = sin(a) cos(b) + cos(a) sin(b)
+			np.multiply(clip[0, :length], np.float32(np.cos(2 * np.pi * cycles)), out=piece)
+			piece += clip[1, :length] * np.float32(np.sin(2 * np.pi * cycles))
+
+		return samples
+
+	# Render
+	def render(self, start, end):
+		""" Render
+			:description:	Samples start to end of the transformed layer, relative to its offset
+			:param start:		int
+			:param end:			int
+			:return samples:	np.ndarray 	float32
+		"""
+		positions = np.arange(start, end)
+		gain = np.ones(end - start, dtype=np.float32)
+
+		for transform, attributes, length in reversed(self.transforms):
+			positions, gain = DICT_OF_TRANSFORM_FUNCTIONS[transform](positions, gain, length, attributes, self.sample_rate)
+
+		samples = np.zeros(end - start, dtype=np.float32)
+
+		if end <= start:
+			return samples
+
+		# Every transform maps positions with a slope of 1 or -1, so they still form one contiguous range
+		reverse = positions[-1] < positions[0]
+		low = min(positions[0], positions[-1])
+		high = max(positions[0], positions[-1]) + 1
+
+		note_start = max(low, 0)
+		note_end = min(high, self.notes_length)
+
+		if note_start < note_end:
+			samples[note_start - low:note_end - low] = self.render_notes(note_start, note_end)
+
+		if reverse:
+			samples = samples[::-1]
+
+		samples *= gain
+
+		return samples
+
+# Synth Song Class
+class SynthSong(object):
+	def __init__(self, layers, sample_rate=SAMPLE_RATE):
+		""" Initialize
+			:description:	Layers mixed on the fly, a block at a time
+			:param layers:		list 	SynthLayer
+			:param sample_rate:	int
+		"""
+		self.layers = layers
+		self.sample_rate = sample_rate
+
+	# Get Length
+	def get_length(self):
+		return max((layer.offset + layer.length for layer in self.layers), default=0)
+
+	# Get Peak Bound
+	def get_peak_bound(self):
+		""" Get Peak Bound
+			:description:	Upper bound of the mixed peak, known before anything is rendered
+			:return peak:	float
+		"""
+		return float(sum(layer.peak for layer in self.layers))
+
+	# Get Peak
+	def get_peak(self, block_size=BLOCK_SIZE, executor=None, max_in_flight=None):
+		""" Get Peak
+			:description:	Real peak of the mix, found by mixing every block once without keeping any
+			:param block_size:		int
+			:param executor:		ProcessPoolExecutor | None 	its workers must run init_song_worker(self)
+			:param max_in_flight:	int | None
+			:return peak:			float
+		"""
+		if executor is not None:
+			return max(Utils.run_ordered(executor, get_peak_worker, self.get_ranges(block_size), max_in_flight=max_in_flight), default=0.0)
+
+		return max((get_block_peak(block) for block in self.iterate_blocks(block_size)), default=0.0)
+
+	# Get Ranges
+	def get_ranges(self, block_size=BLOCK_SIZE):
+		""" Get Ranges
+			:description:	(start, end) of every block, the last one may be shorter
+			:param block_size:	int
+			:return ranges:		list
+		"""
+		length = self.get_length()
+
+		return [(start, min(start + block_size, length)) for start in range(0, length, block_size)]
+
+	# Render Block
+	def render_block(self, start, end):
+		""" Render Block
+			:description:	Mix of every layer over samples start to end, blocks are independent of each other
+			:param start:	int
+			:param end:		int
+			:return block:	np.ndarray 	float32
+		"""
+		block = np.zeros(end - start, dtype=np.float32)
+
+		for layer in self.layers:
+			layer_start = max(start, layer.offset)
+			layer_end = min(end, layer.offset + layer.length)
+
+			if layer_start < layer_end:
+				block[layer_start - start:layer_end - start] += layer.render(layer_start - layer.offset, layer_end - layer.offset)
+
+		return block
+
+	# Iterate Blocks
+	def iterate_blocks(self, block_size=BLOCK_SIZE):
+		""" Iterate Blocks
+			:description:	Mixes the song one block of samples at a time, in order
+			:param block_size:	int
+			:return blocks:		generator 	np.ndarray float32, the last one may be shorter
+		"""
+		for start, end in self.get_ranges(block_size):
+			yield self.render_block(start, end)
+
+	# Render
+	def render(self):
+		""" Render
+			:description:	The whole mix in memory
+			:return samples:	np.ndarray 	float32
+		"""
+		return np.concatenate([np.zeros(0, dtype=np.float32)] + list(self.iterate_blocks()))
+
+
+###############################################################################
+# Workers
+###############################################################################
+WORKER_SONG = None
+
+# Init Song Worker
+def init_song_worker(song):
+	global WORKER_SONG
+
+	# The song is pickled once per worker, the blocks only carry their range
+	WORKER_SONG = song
+
+# Get Peak Worker
+def get_peak_worker(start, end):
+	return get_block_peak(WORKER_SONG.render_block(start, end))
+
+# Render PCM Worker
+def render_pcm_worker(start, end, peak):
+	return get_pcm(WORKER_SONG.render_block(start, end), peak)
@@ -1,6 +1,6 @@
 ###############################################################################
 # Program : Poison
-# File : PoisonImage.py
+# File : PoisonVideo.py
 # Author : catte
 # Created : Sept 20, 2024
 # Copyright : catte @ 2024
@@ -10,10 +10,13 @@
 ###############################################################################
 # Imports
 ###############################################################################
-import os, random, subprocess
+import os, random, subprocess, tempfile, shutil, threading, itertools, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
-from PoisonImage import PoisonImage
-from PoisonMusic import PoisonMusic
+import numpy as np
+
+from PoisonImage import PoisonImage, get_frame_shape
+from PoisonMusic import PoisonMusic, get_song_length, SAMPLE_RATE
 
 import Utils
 
@@ -21,12 +24,51 @@ import Utils
 ###############################################################################
 # Constants
 ###############################################################################
+FFMPEG_PATH = "/usr/bin/ffmpeg"
+
+# "files" writes a numbered PNG per frame into the job's workspace, "pipe" streams raw frames into ffmpeg's stdin
+LIST_OF_FRAME_MODES = ["files", "pipe"]
+
+# The frame pool starts while the song thread runs and ffmpeg's pipes are open. Forked workers would inherit
+# both the pipes, holding back ffmpeg's end of input, and any lock the song thread held, so they start from a clean process
+FRAME_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# ffmpeg pixel format of a frame by its number of channels
+DICT_OF_PIXEL_FORMATS = {1: "gray", 3: "rgb24", 4: "rgba"}
 
 
 ###############################################################################
 # Helper Functions
 ###############################################################################
 
+# Get Pipe Command
+def get_pipe_command(width, height, pixel_format, music_file_name, video_file_name, framerate=1):
+	""" Get Pipe Command
+		:description:	ffmpeg arguments reading raw frames from stdin and the song from music_file_name
+		:param width:			int
+		:param height:			int
+		:param pixel_format:	str 	entry of DICT_OF_PIXEL_FORMATS
+		:param music_file_name:	str
+		:param video_file_name:	str
+		:param framerate:		int 	frames per second
+		:return cmd:			list
+	"""
+	return [FFMPEG_PATH, "-y", "-f", "rawvideo", "-pix_fmt", pixel_format, "-s", f"{width}x{height}", "-framerate", str(framerate), "-i", "-",
+			"-i", music_file_name, "-c:v", "libx264", "-pix_fmt", "yuv420p", video_file_name]
+
+# Get Files Command
+def get_files_command(image_pattern, music_file_name, video_file_name, framerate=1):
+	""" Get Files Command
+		:description:	ffmpeg arguments reading numbered image files and the song from music_file_name
+		:param image_pattern:	str 	image2 pattern such as frames/%06d.png
+		:param music_file_name:	str
+		:param video_file_name:	str
+		:param framerate:		int 	frames per second
+		:return cmd:			list
+	"""
+	return [FFMPEG_PATH, "-y", "-framerate", str(framerate), "-i", image_pattern,
+			"-i", music_file_name, "-c:v", "libx264", "-pix_fmt", "yuv420p", video_file_name]
+
 
 ###############################################################################
 # Classes
@@ -34,7 +76,16 @@ import Utils
 
 # PoisonVideo Class
 class PoisonVideo(object):
-	def __init__(self, debug=False, verbose=False, mode=None, config=None):
+	def __init__(self, debug=False, verbose=False, mode=None, config=None, frame_mode="pipe", frame_workers=None, max_frames_in_flight=None, frame_start_method=FRAME_START_METHOD):
+		if frame_mode not in LIST_OF_FRAME_MODES:
+			raise Exception(f"Frame mode {frame_mode} not implemented. Try {LIST_OF_FRAME_MODES}")
+
+		self.frame_mode = frame_mode
+
+		# Processes rendering the frames of a piped video, None uses every core and 1 renders them one after another
+		self.frame_workers = frame_workers
+		self.max_frames_in_flight = max_frames_in_flight
+		self.frame_start_method = frame_start_method
 		self.debug = debug
 		self.verbose = verbose
 		self.config = config
@@ -52,7 +103,8 @@ class PoisonVideo(object):
 			                     max_kernel=self.config['max_kernel'], max_scale=self.config['max_scale'],
 			                     max_offset=self.config['max_offset'])
 
-		self.music = PoisonMusic(mode=self.mode, debug=self.debug, verbose=self.verbose)
+		# The numpy backend writes the song block by block, so ffmpeg gets the WAV header right away and reads the song while frames are encoded
+		self.music = PoisonMusic(mode=self.mode, debug=self.debug, verbose=self.verbose, backend="numpy")
 
 	def cleanup(self, image_file_names, music_file_name):
 		self.cleanup_images(image_file_names)
@@ -66,16 +118,16 @@ class PoisonVideo(object):
 	def cleanup_music(self, music_file_name):
 		self.music.delete_music(music_file_name)
 
-	def generate_video_simple(self, base_path=None, extension='mp4', video_duration=600, colors=[]):
+	def generate_video_simple(self, base_path=None, extension='mp4', video_duration=600, colors=[], seed=None):
 		return self.generate_video(image_base_path=base_path, image_directory='Images', image_file_extension='png',
 								   music_base_path=base_path, music_directory='Music', music_extension='wav',
 								   video_base_path=base_path, video_directory='Videos', video_extension='mp4',
-								   video_duration=video_duration, colors=colors)
+								   video_duration=video_duration, colors=colors, seed=seed)
 
 	def generate_video(self, image_base_path=None, image_directory=None, image_file_extension='png',
 					   music_base_path=None, music_directory=None, music_extension='wav',
 					   video_base_path=None, video_directory=None, video_extension='mp4',
-					   video_duration=600, colors=[]):
+					   video_duration=600, colors=[], seed=None):
 		image_base_path = Utils.check_path(base_path=image_base_path, folder_name=image_directory if image_directory is not None else 'Images')
 
 		music_base_path = Utils.check_path(base_path=music_base_path, folder_name=music_directory if music_directory is not None else 'Music')
@@ -87,38 +139,257 @@ class PoisonVideo(object):
 			print(f"Music base path: {music_base_path}")
 			print(f"Video base path: {video_base_path}")
 
-		music_file_name = self.music.generate_music_simple(base_path=music_base_path, key=self.config['musical_key'], key_type=self.config['key_type'], octave_range=self.config['octave_range'], song_duration=self.config['song_duration'])
+		# The planner fills every song layer to a length known up front, so the frames are known before the song exists
+		num_images = get_song_length(self.config['num_notes'], self.config['max_note_duration'], self.config['song_duration']) // SAMPLE_RATE
 
-		num_images = int(self.music.get_duration(music_file_name))
+		if num_images < 1:
+			raise Exception(f"A song of {self.config['num_notes']} notes is too short for a single frame")
 
 		if self.debug:
 			print(f"Creating {num_images} images")
 
-		image_file_names = []
-		for index in range(num_images):
+		# Every job renders in folders of its own, so jobs running side by side never pick up each other's frames or song.
+		# A piped job streams its song to ffmpeg and needs no music folder
+		image_workspace = tempfile.mkdtemp(prefix="job-", dir=image_base_path) if self.frame_mode == "files" else None
+		music_workspace = tempfile.mkdtemp(prefix="job-", dir=music_base_path) if self.frame_mode == "files" else None
+		music_thread = None
+
+		# Encoded under a name of its own and moved into place, so two jobs for the same seed never write one file together
+		descriptor, part_file_name = tempfile.mkstemp(prefix=".job-", suffix=f".{video_extension}", dir=video_base_path)
+		os.close(descriptor)
+
+		try:
+			name = None
+			if seed is not None:
+				name = Utils.generate_key(media="video", seed=seed, settings={"mode": self.mode.lower(), "config": self.config, "backend": self.music.backend},
+										  parameters={"image_file_extension": image_file_extension, "music_extension": music_extension,
+													  "video_extension": video_extension, "video_duration": video_duration, "colors": colors})
+
+			video_file_name = Utils.generate_file_name(path=video_base_path, length=32, extension=video_extension, name=name)
+
+			if self.frame_mode == "pipe":
+				# The song is synthesized on a thread while the frames render and reaches ffmpeg through a pipe, never as a file
+				read_descriptor, write_descriptor = os.pipe()
+				music_thread, music_result = self.start_music(seed, sink=os.fdopen(write_descriptor, "wb"))
+
+				# A lossless image_file_extension is never encoded and the frames match the files mode. A lossy one is still encoded
+				# in memory between noise stages, but the frame skips the final encode the files mode writes to disk
+				frames = self.image.generate_frames([Utils.derive_seed(seed, "image", index) for index in range(num_images)],
+													workers=self.frame_workers, max_in_flight=self.max_frames_in_flight, colors=colors,
+													mp_context=multiprocessing.get_context(self.frame_start_method), image_mode="RGB", extension=image_file_extension, image_size=(1920, 1080))
+
+				try:
+					# Started before the first frame is done, so ffmpeg takes the song in while the frames render
+					self.encode_frames(frames, f"pipe:{read_descriptor}", part_file_name, shape=get_frame_shape((1920, 1080), "RGB"), pass_fds=(read_descriptor,))
+				finally:
+					# Shuts the frame pool down now rather than whenever the generator is collected
+					frames.close()
+
+					# A song that failed leaves ffmpeg with a truncated input, its error says more than ffmpeg's exit code
+					music_thread.join()
+
+					if "error" in music_result:
+						raise Exception(f"Song could not be generated due to: {music_result['error']}")
+
+			else:
+				music_thread, music_result = self.start_music(seed, base_path=music_workspace)
+
+				for index in range(num_images):
+					if self.debug:
+						print(f"Generating image #{index}")
+
+					# Named by index, the order ffmpeg reads them in
+					self.image.generate_image_simple(path=image_workspace, image_mode="RGB", extension=image_file_extension, image_name_length=32, image_size=(1920, 1080), colors=colors,
+													 seed=Utils.derive_seed(seed, "image", index), name=f"{index:06d}")
+
+				music_thread.join()
+
+				if "error" in music_result:
+					raise Exception(f"Song could not be generated due to: {music_result['error']}")
+
+				if self.debug and self.verbose:
+					print(f"Music file name: {music_result['file_name']}\n")
+
+				cmd = get_files_command(os.path.join(image_workspace, f"%06d.{image_file_extension}"), music_result['file_name'], part_file_name)
+
+				if self.debug:
+					print(' '.join(cmd))
+
+				returncode = subprocess.run(cmd).returncode
+
+				if returncode != 0:
+					raise Exception(f"ffmpeg exited with {returncode} while encoding {video_file_name}")
+
+			os.replace(part_file_name, video_file_name)
+
+		finally:
+			# ffmpeg is gone by now, so a thread still writing to it stops at the broken pipe
+			if music_thread is not None:
+				music_thread.join()
+
+			for workspace in (image_workspace, music_workspace):
+				if workspace is not None:
+					shutil.rmtree(workspace, ignore_errors=True)
+
+			if os.path.isfile(part_file_name):
+				os.remove(part_file_name)
+
+		return video_file_name
+
+	# Generate Videos
+	def generate_videos(self, n, workers=None, max_in_flight=None, mp_context=None, seed=None, frame_workers=1, **kwargs):
+		""" Generate Videos
+			:description:	Runs generate_video_simple jobs side by side over a process pool and yields results as they complete
+			:param n:				int 		number of videos to generate
+			:param workers:			int | None 	pool size, defaults to os.cpu_count()
+			:param max_in_flight:	int | None 	jobs queued at once, defaults to twice the pool size
+			:param mp_context:		multiprocessing context | None
+			:param seed:			int | None 	video i is generated from Utils.derive_seed(seed, i)
+			:param frame_workers:	int | None 	frame processes of each job, 1 since the jobs already fill the cores
+			:param kwargs:			dict 		forwarded to generate_video_simple
+			:return results:		generator 	video file names
+		"""
+		list_of_args = [(kwargs, Utils.derive_seed(seed, index)) for index in range(n)]
+
+		with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+								 initializer=init_video_worker, initargs=(dict(self.get_worker_arguments(), frame_workers=frame_workers),)) as executor:
+			yield from Utils.run_bounded(executor, generate_video_worker, list_of_args, max_in_flight=max_in_flight)
+
+	# Get Worker Arguments
+	def get_worker_arguments(self):
+		return {"debug": self.debug, "verbose": self.verbose, "mode": self.mode, "config": self.config, "frame_mode": self.frame_mode,
+				"frame_workers": self.frame_workers, "max_frames_in_flight": self.max_frames_in_flight, "frame_start_method": self.frame_start_method}
+
+	# Start Music
+	def start_music(self, seed=None, base_path=None, sink=None):
+		""" Start Music
+			:description:	Generates the job's song on a thread of its own, so it overlaps with the frames
+			:param seed:		int | None 	the video's seed
+			:param base_path:	str | None 	folder of the song file when there is no sink
+			:param sink:		writable binary stream | None 	written and closed by the thread
+			:return result:		tuple 	(thread, result), result holds "file_name" or "error" once the thread finished
+		"""
+		result = {}
+
+		def run():
+			try:
+				result["file_name"] = self.music.generate_music_simple(base_path=base_path, key=self.config['musical_key'], key_type=self.config['key_type'], octave_range=self.config['octave_range'],
+																	   num_notes=self.config['num_notes'], max_note_duration=self.config['max_note_duration'], song_duration=self.config['song_duration'],
+																	   seed=Utils.derive_seed(seed, "music"), sink=sink)
+			except OSError as ex:
+				# Writing to the sink only fails once ffmpeg stopped reading, its exit code says why
+				if sink is None:
+					result["error"] = ex
+
+			except Exception as ex:
+				result["error"] = ex
+
+			finally:
+				if sink is not None:
+					try:
+						sink.close()
+					except OSError:
+						pass  # ffmpeg already stopped reading
+
+		thread = threading.Thread(target=run, daemon=True)
+		thread.start()
+
+		return thread, result
+
+	# Encode Frames
+	def encode_frames(self, frames, music_file_name, video_file_name, framerate=1, shape=None, pass_fds=()):
+		""" Encode Frames
+			:description:	Starts ffmpeg once and streams every frame's pixels into its stdin, no frame touches the disk
+			:param frames:			iterable 	np.ndarray uint8 frames of the same shape, one per 1 / framerate seconds
+			:param music_file_name:	str 	path or ffmpeg url of the song, such as pipe:N for a descriptor in pass_fds
+			:param video_file_name:	str
+			:param framerate:		int
+			:param shape:			tuple | None 	shape of the frames, None waits for the first frame to start ffmpeg
+			:param pass_fds:		tuple 	descriptors handed over to ffmpeg, closed here once it started
+			:return video_file_name:	str
+		"""
+		frames = iter(frames)
+
+		if shape is None:
+			frame = next(frames, None)
+
+			if frame is None:
+				for descriptor in pass_fds:
+					os.close(descriptor)
+
+				raise Exception("No frames to encode")
+
+			shape = frame.shape
+			frames = itertools.chain([frame], frames)
+
+		shape = tuple(shape)
+		height, width = shape[:2]
+		channels = 1 if len(shape) == 2 else shape[2]
+
+		try:
+			if channels not in DICT_OF_PIXEL_FORMATS:
+				raise Exception(f"Cannot encode frames with {channels} channels. Try {list(DICT_OF_PIXEL_FORMATS.keys())}")
+
+			cmd = get_pipe_command(width, height, DICT_OF_PIXEL_FORMATS[channels], music_file_name, video_file_name, framerate)
+
 			if self.debug:
-				print(f"Generating image #{index}")
+				print(' '.join(cmd))
 
-			image_file_names.append(self.image.generate_image_simple(path=image_base_path, image_mode="RGB", extension=image_file_extension, image_name_length=32, image_size=(1920, 1080), colors=colors))
+			process = subprocess.Popen(cmd, stdin=subprocess.PIPE, pass_fds=pass_fds)
 
-		video_file_name = Utils.generate_file_name(path=video_base_path, length=32, extension=video_extension)
+		finally:
+			# Only ffmpeg keeps them open, so whoever writes to them sees a broken pipe if it exits
+			for descriptor in pass_fds:
+				os.close(descriptor)
 
-		if self.debug and self.verbose:
-			print(f"\nImage file names: {image_file_names}")
-			print(f"Music file name: {music_file_name}\n")
+		try:
+			for index, frame in enumerate(frames):
+				if frame.shape != shape:
+					raise Exception(f"Frame #{index} is {frame.shape}, expected {shape}")
 
-		cmd = f"/usr/bin/ffmpeg -framerate 1 -pattern_type glob -i '{image_base_path}/*.{image_file_extension}' -i {music_file_name} -c:v libx264 -pix_fmt yuv420p {video_file_name}"
+				if self.debug and self.verbose:
+					print(f"Encoding frame #{index}")
 
-		if self.debug:
-			print(cmd)
+				process.stdin.write(memoryview(np.ascontiguousarray(frame, dtype=np.uint8)).cast('B'))
 
-		subprocess.run(cmd, shell=True)
+			process.stdin.close()
 
-		self.cleanup(image_file_names, music_file_name)
+		except BrokenPipeError:
+			# ffmpeg stopped reading, its exit code below says why
+			pass
+
+		except BaseException:
+			process.kill()
+			process.wait()
+			raise
+
+		returncode = process.wait()
+
+		if returncode != 0:
+			raise Exception(f"ffmpeg exited with {returncode} while encoding {video_file_name}")
 
 		return video_file_name
 
 
+###############################################################################
+# Workers
+###############################################################################
+WORKER_VIDEO = None
+
+# Init Video Worker
+def init_video_worker(video_arguments):
+	global WORKER_VIDEO
+
+	# Forked workers inherit the parent's random state and would draw identical videos and file names
+	random.seed()
+
+	WORKER_VIDEO = PoisonVideo(**video_arguments)
+
+# Generate Video Worker
+def generate_video_worker(kwargs, seed=None):
+	return WORKER_VIDEO.generate_video_simple(seed=seed, **kwargs)
+
+
 ###############################################################################
 # Test
 ###############################################################################
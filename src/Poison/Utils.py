@@ -6,7 +6,11 @@
 # Copyright : catte @ 2024
 # License : CC BY-NC 4.0
 ###############################################################################
-import os, random, string
+import os, random, string, time, json, hashlib
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+
+import numpy as np
 
 
 ###############################################################################
@@ -49,8 +53,8 @@ EXPECTED_CONFIG_DICT = { "config": str(),
 
 # Check Path
 def check_path(base_path=None, folder_name="Images"):
-	if not os.path.isdir(base_path):
-		os.mkdir(base_path)
+	# exist_ok, jobs running side by side create the same folders
+	os.makedirs(base_path, exist_ok=True)
 
 	if folder_name in base_path:
 		path = base_path
@@ -58,8 +62,7 @@ def check_path(base_path=None, folder_name="Images"):
 	else:
 		path = os.path.join(base_path, folder_name)
 
-	if not os.path.isdir(path):
-		os.mkdir(path)
+	os.makedirs(path, exist_ok=True)
 
 	return path
 
@@ -85,7 +88,7 @@ def generate_url(root=None, length=32, extension="html"):
 	return url
 
 # Generate File Name
-def generate_file_name(path=None, length=32, extension='jpg'):
+def generate_file_name(path=None, length=32, extension='jpg', name=None):
 	if extension in LIST_OF_IMAGE_EXTENSIONS:
 		folder_name = 'Images'
 
@@ -100,7 +103,150 @@ def generate_file_name(path=None, length=32, extension='jpg'):
 
 	path = check_path(base_path=path, folder_name=folder_name)
 
-	str_name = str(''.join(random.choices(string.ascii_letters + string.digits, k=length)))
+	# Seeded assets are named by their key so the same inputs always land on the same file
+	str_name = name if name is not None else str(''.join(random.choices(string.ascii_letters + string.digits, k=length)))
 	file_name =  str_name + '.' + extension
 
 	return os.path.join(path, file_name)
+
+# Generate Key
+def generate_key(**inputs):
+	""" Generate Key
+		:description:	Content address of a generated asset, the sha256 of its inputs
+		:param inputs:	dict 	json serializable seed, mode and parameters
+		:return key:	str 	hex digest
+	"""
+	return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+# Derive Seed
+def derive_seed(seed, *labels):
+	""" Derive Seed
+		:description:	Independent child seed, e.g. one per image of a batch or video
+		:param seed:	int | None 	None stays None
+		:param labels:	tuple
+		:return seed:	int | None
+	"""
+	if seed is None:
+		return None
+
+	return int(generate_key(seed=seed, labels=labels)[:16], 16)
+
+# Get Random
+def get_random(seed=None):
+	""" Get Random
+		:description:	Python and numpy generators that are both reproducible from seed
+		:param seed:	int | None 	None draws fresh entropy
+		:return result:	tuple 	(random.Random, np.random.Generator)
+	"""
+	if seed is None:
+		seed = random.SystemRandom().getrandbits(64)
+
+	return random.Random(seed), np.random.default_rng(seed)
+
+# Run Bounded
+def run_bounded(executor, fn, list_of_args, max_in_flight=None):
+	""" Run Bounded
+		:description:	Submits fn(*args) for every args in list_of_args, keeping at most max_in_flight
+						tasks queued, and yields results in completion order. Nothing new is
+						submitted while the caller is not consuming, which gives backpressure.
+		:param executor:		concurrent.futures.Executor
+		:param fn:				callable 	must be picklable for process pools
+		:param list_of_args:	iterable 	tuples of positional arguments
+		:param max_in_flight:	int | None 	defaults to twice the executor's workers
+		:return results:		generator
+	"""
+	if max_in_flight is None:
+		max_in_flight = 2 * getattr(executor, "_max_workers", os.cpu_count() or 1)
+
+	max_in_flight = max(1, max_in_flight)
+
+	list_of_args = iter(list_of_args)
+	pending = set()
+	exhausted = False
+
+	try:
+		while True:
+			while not exhausted and len(pending) < max_in_flight:
+				try:
+					args = next(list_of_args)
+				except StopIteration:
+					exhausted = True
+				else:
+					pending.add(executor.submit(fn, *args))
+
+			if not pending:
+				return
+
+			done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+			for future in done:
+				yield future.result()
+
+	finally:
+		for future in pending:
+			future.cancel()
+
+# Run Ordered
+def run_ordered(executor, fn, list_of_args, max_in_flight=None):
+	""" Run Ordered
+		:description:	run_bounded that yields results in submission order. At most max_in_flight tasks
+						are queued or finished but not yet consumed, so memory stays bounded even when
+						one slow task holds back the ones after it.
+		:param executor:		concurrent.futures.Executor
+		:param fn:				callable
+		:param list_of_args:	iterable 	tuples of positional arguments
+		:param max_in_flight:	int | None 	defaults to twice the executor's workers
+		:return results:		generator
+	"""
+	if max_in_flight is None:
+		max_in_flight = 2 * getattr(executor, "_max_workers", os.cpu_count() or 1)
+
+	max_in_flight = max(1, max_in_flight)
+
+	pending = deque()
+
+	try:
+		for args in list_of_args:
+			pending.append(executor.submit(fn, *args))
+
+			if len(pending) >= max_in_flight:
+				yield pending.popleft().result()
+
+		while pending:
+			yield pending.popleft().result()
+
+	finally:
+		for future in pending:
+			future.cancel()
+
+
+###############################################################################
+# Classes
+###############################################################################
+
+# Deadline Class
+class Deadline(object):
+	""" Deadline
+		:description:	Monotonic time budget checked cooperatively between render steps.
+						Unlike signal.alarm it works from any thread and has sub-second resolution.
+		:param deadline_ms:	int | float | None 	budget in milliseconds, None never expires
+	"""
+	def __init__(self, deadline_ms=None):
+		if deadline_ms is not None and deadline_ms < 0:
+			raise Exception(f"Invalid deadline {deadline_ms}. Use a non-negative number of milliseconds")
+
+		self.deadline_ms = deadline_ms
+		self.start_time = time.monotonic()
+		self.end_time = None if deadline_ms is None else self.start_time + deadline_ms / 1000.0
+
+	def expired(self):
+		return self.end_time is not None and time.monotonic() >= self.end_time
+
+	def elapsed_ms(self):
+		return (time.monotonic() - self.start_time) * 1000.0
+
+	def remaining_ms(self):
+		if self.end_time is None:
+			return None
+
+		return max(0.0, (self.end_time - time.monotonic()) * 1000.0)
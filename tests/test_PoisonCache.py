@@ -0,0 +1,105 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonCache.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# The on-disk LRU cache and seeded, content-addressed assets.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import os, sys
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonCache
+from Poison import Poison
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Write File
+def write_file(path, key, size=100, mtime=None):
+	file_path = os.path.join(path, f"{key}.bin")
+
+	with open(file_path, mode="wb") as f:
+		f.write(b"x" * size)
+
+	if mtime is not None:
+		os.utime(file_path, (mtime, mtime))
+
+	return file_path
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_least_recently_used_asset_is_evicted(tmp_path):
+	cache = PoisonCache.PoisonCache(str(tmp_path), max_bytes=250)
+	cache.put("a", write_file(tmp_path, "a"))
+	cache.put("b", write_file(tmp_path, "b"))
+
+	# A hit makes a the most recently used, so b goes first
+	assert cache.get("a") is not None
+
+	cache.put("c", write_file(tmp_path, "c"))
+
+	assert "b" not in cache and not os.path.exists(os.path.join(tmp_path, "b.bin"))
+	assert "a" in cache and "c" in cache and cache.total_bytes == 200
+
+def test_newest_asset_stays_even_over_budget(tmp_path):
+	cache = PoisonCache.PoisonCache(str(tmp_path), max_bytes=50)
+	cache.put("a", write_file(tmp_path, "a"))
+
+	assert len(cache) == 1 and cache.get("a") is not None
+
+def test_recency_survives_a_restart(tmp_path):
+	write_file(tmp_path, "old", mtime=1000)
+	write_file(tmp_path, "new", mtime=2000)
+	write_file(tmp_path, "newest", mtime=3000)
+
+	cache = PoisonCache.PoisonCache(str(tmp_path), max_bytes=250)
+
+	assert "old" not in cache and "new" in cache and "newest" in cache
+
+def test_missing_files_are_dropped_from_the_index(tmp_path):
+	cache = PoisonCache.PoisonCache(str(tmp_path))
+	os.remove(cache.put("a", write_file(tmp_path, "a")))
+
+	assert cache.get("a") is None and len(cache) == 0 and cache.total_bytes == 0
+
+def test_get_or_create_only_creates_once(tmp_path):
+	cache = PoisonCache.PoisonCache(str(tmp_path))
+	calls = []
+	create = lambda: calls.append(1) or write_file(tmp_path, "a")
+
+	assert cache.get_or_create("a", create) == cache.get_or_create("a", create)
+	assert len(calls) == 1
+
+def test_same_seed_gives_the_same_cached_asset(tmp_path):
+	poison = Poison(mode="light", generate_image=True, cache=PoisonCache.PoisonCache(str(tmp_path)))
+	first = poison.get_asset(seed=3, image_size=(32, 32), extension="png")
+
+	with open(first, mode="rb") as f:
+		data = f.read()
+
+	os.remove(first)
+	poison.cache.load()
+
+	# Regenerated from the seed under the same key after the file is gone
+	second = poison.get_asset(seed=3, image_size=(32, 32), extension="png")
+
+	with open(second, mode="rb") as f:
+		assert second == first and f.read() == data
+
+	assert poison.get_asset(seed=4, image_size=(32, 32), extension="png") != first
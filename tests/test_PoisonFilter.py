@@ -0,0 +1,78 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonFilter.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# The filter cost model keeps filters inside a budget and only calibrates
+# what it has not timed yet.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import os, sys
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonFilter
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# A flat cost of 1 ms per 1000 pixels for every filter, so estimates are exact
+COEFFICIENTS = {"smooth": [0.001], "gaussian_blur": [0.001, 0.0], "median_filter": [0.001, 0.0, 0.0], PoisonFilter.RESIZE_KEY: [0.0]}
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_no_budget_leaves_attributes_untouched():
+	cost_model = PoisonFilter.FilterCostModel(COEFFICIENTS)
+
+	assert cost_model.fit_attributes("gaussian_blur", {'radius': 5}, 1000, 1000) == ({'radius': 5}, 0.0)
+
+def test_filter_inside_budget_runs_at_full_size():
+	cost_model = PoisonFilter.FilterCostModel(COEFFICIENTS)
+
+	assert cost_model.fit_attributes("gaussian_blur", {'radius': 5}, 100, 100, budget_ms=20) == ({'radius': 5}, 10.0)
+
+def test_filter_over_budget_is_downscaled():
+	cost_model = PoisonFilter.FilterCostModel(COEFFICIENTS)
+	attributes, cost = cost_model.fit_attributes("gaussian_blur", {'radius': 8}, 1000, 1000, budget_ms=300)
+
+	assert attributes == {'radius': 4.0, 'downscale': 2} and cost == 250.0
+
+def test_fixed_kernel_over_budget_is_dropped():
+	cost_model = PoisonFilter.FilterCostModel(COEFFICIENTS)
+
+	assert cost_model.fit_attributes("smooth", {}, 1000, 1000, budget_ms=300) == (None, 0.0)
+
+def test_downscaled_rank_filters_keep_an_odd_size():
+	for size in range(3, 40):
+		for downscale in range(2, 8):
+			scaled = PoisonFilter.scale_attributes("median_filter", {'size': size}, downscale)['size']
+
+			assert scaled >= PoisonFilter.MIN_RANK_SIZE and scaled % 2 == 1
+
+def test_prepare_only_calibrates_missing_filters():
+	cost_model = PoisonFilter.FilterCostModel(COEFFICIENTS)
+	cost_model.prepare(["smooth", "kernel", "emboss"])
+
+	assert cost_model.coefficients["smooth"] == COEFFICIENTS["smooth"]
+	assert cost_model.coefficients["kernel"] == [0.0]
+	assert cost_model.coefficients["emboss"][0] > 0
+
+def test_cost_model_round_trips_through_json(tmp_path):
+	file_path = os.path.join(tmp_path, "costs.json")
+	PoisonFilter.FilterCostModel(COEFFICIENTS).save(file_path)
+
+	assert PoisonFilter.FilterCostModel.load(file_path).coefficients == COEFFICIENTS
@@ -0,0 +1,146 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonImage.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Image generation: seeded renders, budgets and the process pools.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import io, multiprocessing, os, subprocess, sys
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonFilter, PoisonPlan, Utils
+from PoisonImage import PoisonImage, DICT_OF_COLORS, LIST_OF_SHAPES, get_shape_attributes
+
+
+###############################################################################
+# Constants
+###############################################################################
+RENDER_SCRIPT = """
+import hashlib, sys
+sys.path[:0] = sys.argv[1:3]
+from PoisonImage import PoisonImage, DICT_OF_COLORS, LIST_OF_SHAPES
+image = PoisonImage("medium", False, False, 100, 100, (100, 10), 10, 10)
+pixels = image.generate_image(seed=7, height=96, width=128, colors=DICT_OF_COLORS["pansexual"], density=3, num_shapes=6, shapes=LIST_OF_SHAPES,
+							  num_filters=2, filters=["emboss", "find_edges", "contour", "smooth"], as_array=True)
+print(hashlib.sha256(pixels.tobytes()).hexdigest())
+"""
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Get Image
+def get_image(**kwargs):
+	return PoisonImage("medium", False, False, 100, 100, (100, 10), 10, 10, **kwargs)
+
+# Render
+def render(image, seed=7, **kwargs):
+	arguments = dict(seed=seed, height=96, width=128, colors=DICT_OF_COLORS["pansexual"], density=3, num_shapes=6, shapes=LIST_OF_SHAPES,
+					 num_filters=1, filters=["smooth"], as_array=True)
+	arguments.update(kwargs)
+
+	return image.generate_image(**arguments)
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_no_budget_skips_calibration():
+	cost_model = PoisonFilter.FilterCostModel()
+	render(get_image(cost_model=cost_model))
+
+	assert cost_model.coefficients == {}
+
+def test_deadline_calibrates_the_filters_used():
+	cost_model = PoisonFilter.FilterCostModel()
+	render(get_image(cost_model=cost_model), deadline_ms=10000)
+
+	assert "smooth" in cost_model.coefficients
+
+def test_filter_budget_calibrates_the_filters_used():
+	cost_model = PoisonFilter.FilterCostModel()
+	render(get_image(cost_model=cost_model, filter_budget_ms=1000))
+
+	assert "smooth" in cost_model.coefficients
+
+def test_seeded_render_is_stable_across_processes():
+	paths = [os.path.join(SOURCE_PATH, "Poison"), SOURCE_PATH]
+	digests = {subprocess.run([sys.executable, "-c", RENDER_SCRIPT] + paths, check=True, capture_output=True, text=True).stdout.split()[-1]
+			   for _ in range(3)}
+
+	assert len(digests) == 1
+
+def test_lossless_frames_skip_the_encodes_between_noise_stages(monkeypatch):
+	image = get_image()
+	expected = image.generate_frame(seed=3, extension="png", image_size=(64, 48), single_encode=False)
+
+	# Only the noise stages decode an image
+	monkeypatch.setattr(Image, "open", lambda *args, **kwargs: pytest.fail("encoded between noise stages"))
+
+	np.testing.assert_array_equal(image.generate_frame(seed=3, extension="png", image_size=(64, 48)), expected)
+
+def test_single_encode_writes_one_jpeg_without_intermediate_decodes(monkeypatch):
+	image = get_image()
+	sink = io.BytesIO()
+
+	with monkeypatch.context() as patch:
+		patch.setattr(Image, "open", lambda *args, **kwargs: pytest.fail("encoded between noise stages"))
+		image.generate_image_simple(extension="jpg", image_size=(64, 48), single_encode=True, seed=3, sink=sink)
+
+	with Image.open(io.BytesIO(sink.getvalue())) as result:
+		assert result.format == "JPEG" and result.size == (64, 48)
+
+def test_expired_deadline_leaves_only_the_background():
+	pixels = render(get_image(), deadline_ms=0, single_encode=True)
+
+	assert len(np.unique(pixels.reshape(-1, pixels.shape[-1]), axis=0)) == 1
+
+def test_seeded_pool_matches_serial_generation():
+	image = get_image()
+	arguments = dict(extension="png", image_size=(64, 48))
+
+	pooled = image.generate_images(5, workers=2, chunksize=2, as_bytes=True, mp_context=multiprocessing.get_context("fork"), seed=11, **arguments)
+	serial = [image.generate_image_bytes(seed=Utils.derive_seed(11, index), **arguments) for index in range(5)]
+
+	# Pooled results arrive as they complete
+	assert sorted(pooled) == sorted(serial)
+
+def test_unseeded_pool_draws_distinct_images():
+	images = list(get_image().generate_images(4, workers=2, as_bytes=True, mp_context=multiprocessing.get_context("fork"), extension="png", image_size=(64, 48)))
+
+	assert len(set(images)) == 4
+
+@pytest.mark.parametrize("shape", LIST_OF_SHAPES)
+def test_batched_shape_attributes_are_drawable(shape):
+	height, width = 128, 96
+	list_of_attributes = get_shape_attributes(height, width, shape, 50, density=3, rng=np.random.default_rng(2))
+
+	assert len(list_of_attributes) == 50
+	assert list_of_attributes == get_shape_attributes(height, width, shape, 50, density=3, rng=np.random.default_rng(2))
+
+	canvas = Image.new("RGB", (height, width))
+	draw = ImageDraw.Draw(canvas)
+
+	for attributes in list_of_attributes:
+		if "xy" in attributes:
+			assert all(0 <= x <= height for x in attributes["xy"][0::2]) and all(0 <= y <= width for y in attributes["xy"][1::2])
+
+		# Raises on any attribute PIL cannot draw
+		PoisonPlan.apply_op(canvas, draw, PoisonPlan.RenderOp("shape", shape, dict(attributes, fill=(255, 0, 0), outline=(0, 255, 0))))
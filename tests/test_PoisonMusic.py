@@ -0,0 +1,59 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonMusic.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Music generation: notes, parameter validation and song layout.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import os, sys
+
+import pytest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonMusic
+from Poison import Poison
+
+
+###############################################################################
+# Constants
+###############################################################################
+MAX_PRESET_SECONDS = 10 * 60
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_rests_stay_lower_case():
+	notes = [PoisonMusic.Note("c", octave=4, duration=2), PoisonMusic.Note("r", duration=1), PoisonMusic.Note("e", octave=4, duration=1)]
+
+	assert [str(note) for note in notes] == ["C4+0=2", "r=1", "E4+0=1"]
+
+def test_gensound_renders_a_layer_with_rests():
+	song_layer = " ".join(str(note) for note in [PoisonMusic.Note("c", octave=4, duration=2), PoisonMusic.Note("r", duration=1)])
+
+	assert PoisonMusic.build_signal("sine", song_layer, 100).realise(PoisonMusic.SAMPLE_RATE).audio.shape == (1, 300)
+
+@pytest.mark.parametrize("mode", list(PoisonMusic.DICT_OF_SONG_LAYERS))
+def test_presets_pass_validation_at_a_sane_length(mode):
+	poison = Poison(mode=mode, generate_music=True)
+
+	PoisonMusic.validate_parameters(pitches=PoisonMusic.DICT_OF_MAJOR_KEYS[poison.musical_key], accidentals=[''], octaves=range(3, 7), cents=[None],
+									max_note_duration=poison.max_note_duration, num_notes=poison.num_notes,
+									num_song_layers=PoisonMusic.DICT_OF_SONG_LAYERS[mode], song_duration=poison.song_duration,
+									signals=PoisonMusic.LIST_OF_SIGNALS, transforms=PoisonMusic.LIST_OF_TRANSFORMS, num_transforms=10)
+
+	song_length = PoisonMusic.get_song_length(poison.num_notes, poison.max_note_duration, poison.song_duration)
+
+	assert song_length <= MAX_PRESET_SECONDS * PoisonMusic.SAMPLE_RATE
@@ -0,0 +1,97 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonNoise.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# The uint8 noise engine: in place updates, seeding and the noise statistics.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import os, sys
+
+import numpy as np
+import pytest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonNoise
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Get Image
+def get_image(value=128, shape=(200, 300, 3)):
+	return np.full(shape, value, dtype=np.uint8)
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+@pytest.mark.parametrize("mode", [mode for mode in PoisonNoise.LIST_OF_NOISE_MODES if mode != "localvar"])
+def test_noise_is_applied_in_place_and_seeded(mode):
+	image = get_image()
+	result = PoisonNoise.random_noise(image, mode, rng=5)
+
+	assert result is image and result.dtype == np.uint8
+	np.testing.assert_array_equal(PoisonNoise.random_noise(get_image(), mode, rng=5), image)
+
+def test_gaussian_noise_has_the_requested_mean_and_variance():
+	image = PoisonNoise.random_noise(get_image(), "gaussian", rng=1, mean=4.0, var=100.0).astype(np.float64)
+
+	assert abs(image.mean() - 132.0) < 0.5
+	assert abs(image.var() - 100.0) < 5.0
+
+def test_localvar_follows_the_variance_of_each_pixel():
+	local_vars = np.zeros((200, 300), dtype=np.float32)
+	local_vars[:, 150:] = 400.0
+
+	image = PoisonNoise.random_noise(get_image(), "localvar", rng=1, local_vars=local_vars).astype(np.float64)
+
+	assert image[:, :150].var() == 0.0
+	assert abs(image[:, 150:].std() - 20.0) < 1.0
+
+def test_localvar_needs_a_variance_per_pixel():
+	with pytest.raises(Exception, match="local_vars"):
+		PoisonNoise.random_noise(get_image(), "localvar", rng=1, local_vars=np.ones((2, 2)))
+
+def test_salt_and_pepper_replace_the_requested_share():
+	image = PoisonNoise.random_noise(get_image(), "s&p", rng=1, amount=0.2, salt_vs_pepper=0.25)
+
+	assert abs(np.mean(image != 128) - 0.2) < 0.01
+	assert abs(np.mean(image == 255) - 0.05) < 0.01
+	assert set(np.unique(image)) == {0, 128, 255}
+
+def test_values_are_clipped_to_the_pixel_range():
+	image = PoisonNoise.random_noise(get_image(value=250), "gaussian", rng=1, var=400.0)
+
+	assert np.mean(image == 255) > 0.3
+
+def test_poisson_keeps_the_mean():
+	image = PoisonNoise.random_noise(get_image(value=60), "poisson", rng=1).astype(np.float64)
+
+	assert abs(image.mean() - 60.0) < 0.2 and abs(image.var() - 60.0) < 2.0
+
+def test_noise_needs_a_writeable_uint8_array():
+	with pytest.raises(Exception, match="uint8"):
+		PoisonNoise.random_noise(get_image().astype(np.float32), "gaussian")
+
+	image = get_image()
+	image.flags.writeable = False
+
+	with pytest.raises(Exception, match="writeable"):
+		PoisonNoise.random_noise(image, "gaussian")
+
+def test_unknown_modes_are_rejected():
+	with pytest.raises(Exception, match="not implemented"):
+		PoisonNoise.random_noise(get_image(), "nope")
@@ -0,0 +1,81 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonPlan.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Render plans survive a JSON round trip and render the same image after it.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import json, os, random, sys
+
+import numpy as np
+import pytest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonPlan
+from PoisonImage import PoisonImage, DICT_OF_COLORS, LIST_OF_SHAPES
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Get Image
+def get_image():
+	return PoisonImage("medium", False, False, 100, 100, (100, 10), 10, 10)
+
+# Get Plan
+def get_plan(image, seed=7):
+	return image.build_plan(height=96, width=128, colors=DICT_OF_COLORS["pansexual"], density=3, num_shapes=12, shapes=LIST_OF_SHAPES,
+							num_filters=2, filters=["smooth", "emboss", "gaussian_blur"], noise_level="light", noise_types=["guassian"],
+							rng=np.random.default_rng(seed), rand=random.Random(seed))
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_plan_survives_a_json_round_trip(tmp_path):
+	plan = get_plan(get_image())
+	file_path = os.path.join(tmp_path, "plan.json")
+	plan.save(file_path)
+
+	loaded = PoisonPlan.RenderPlan.load(file_path)
+
+	assert len(loaded) == len(plan) > 0
+	assert json.loads(loaded.to_json()) == json.loads(plan.to_json())
+	assert [(op.kind, op.name) for op in loaded.ops] == [(op.kind, op.name) for op in plan.ops]
+
+def test_loaded_plan_renders_the_same_pixels():
+	image = get_image()
+	plan = get_plan(image)
+
+	expected = np.array(image.render_plan(plan))
+
+	np.testing.assert_array_equal(np.array(image.render_plan(PoisonPlan.RenderPlan.from_json(plan.to_json()))), expected)
+
+def test_json_lists_come_back_as_tuples_for_pil():
+	op = PoisonPlan.RenderOp.from_dict({"kind": "shape", "name": "circle", "attributes": {"fill": [1, 2, 3], "bounding_circle": [4, 5, 6]}})
+
+	assert op.attributes == {"fill": (1, 2, 3), "bounding_circle": (4, 5, 6)}
+
+def test_other_plan_versions_are_rejected():
+	plan_dict = get_plan(get_image()).to_dict()
+	plan_dict["version"] = PoisonPlan.PLAN_VERSION + 1
+
+	with pytest.raises(Exception, match="not supported"):
+		PoisonPlan.RenderPlan.from_dict(plan_dict)
+
+def test_unknown_op_kinds_are_rejected():
+	with pytest.raises(Exception, match="not recognized"):
+		PoisonPlan.RenderOp("eval", "blur")
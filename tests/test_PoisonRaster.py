@@ -0,0 +1,64 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonRaster.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# The numpy rasterizer is opt-in and paints the same pixels as PIL where
+# both fill exactly.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import os, sys
+
+import numpy as np
+
+import pytest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonPlan
+from PoisonImage import PoisonImage, DICT_OF_COLORS, LIST_OF_SHAPES
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Get Image
+def get_image(**kwargs):
+	return PoisonImage("medium", False, False, 100, 100, (100, 10), 10, 10, **kwargs)
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_pil_is_the_default_backend():
+	assert get_image().backend == "pil"
+
+def test_unknown_backend_is_rejected():
+	with pytest.raises(Exception, match="Backend"):
+		get_image(backend="cairo")
+
+def test_rectangle_matches_pil():
+	op = PoisonPlan.RenderOp("shape", "rectangle", {'xy': [3, 4, 20, 25], 'fill': (200, 10, 10), 'outline': (0, 255, 0), 'w': 2})
+	plan = PoisonPlan.RenderPlan(size=(40, 30), background=(0, 0, 0), ops=[op])
+
+	np.testing.assert_array_equal(get_image(backend="numpy").render_plan_array(plan), get_image().render_plan_array(plan))
+
+def test_numpy_backend_renders_a_full_image():
+	pixels = get_image(backend="numpy").generate_image(seed=3, height=96, width=128, colors=DICT_OF_COLORS["pride"], density=3, num_shapes=6,
+													   shapes=LIST_OF_SHAPES, as_array=True)
+
+	assert pixels.shape == (128, 96, 3) and pixels.dtype == np.uint8
+
+def test_backend_is_part_of_the_key():
+	assert get_image().get_key(seed=1) != get_image(backend="numpy").get_key(seed=1)
@@ -0,0 +1,110 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonReservoir.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# The reservoir refills its pools, serves each asset max_uses times and
+# backs off from pools whose generations fail.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import multiprocessing, os, sys, time
+
+import pytest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonReservoir
+from Poison import Poison
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Get Reservoir
+def get_reservoir(**kwargs):
+	poison = Poison(mode="light", generate_image=True)
+
+	return PoisonReservoir.PoisonReservoir(poison, workers=1, mp_context=multiprocessing.get_context("fork"), **kwargs)
+
+# Wait For
+def wait_for(predicate, timeout=30):
+	end_time = time.monotonic() + timeout
+
+	while not predicate():
+		if time.monotonic() > end_time:
+			return False
+
+		time.sleep(0.05)
+
+	return True
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_checked_out_entries_count_towards_the_target():
+	pool = PoisonReservoir.ReservoirPool("image", "light", (32, 32), 3, {})
+	pool.entries.append(PoisonReservoir.ReservoirEntry("a"))
+	pool.checked_out = 1
+
+	assert pool.deficit() == 1
+
+def test_failures_back_off_and_probe_one_at_a_time():
+	pool = PoisonReservoir.ReservoirPool("image", "light", (32, 32), 3, {})
+	pool.record_failure(Exception("boom"))
+
+	assert pool.deficit() == 0
+
+	pool.retry_time = 0.0
+	assert pool.deficit() == 1
+
+	for _ in range(20):
+		pool.record_failure(Exception("boom"))
+
+	assert pool.retry_time - time.monotonic() <= PoisonReservoir.MAX_BACKOFF_S
+
+	pool.record_success()
+	assert pool.deficit() == 3
+
+def test_pool_fills_and_serves_each_asset_max_uses_times(tmp_path):
+	with get_reservoir(target=1, max_uses=2) as reservoir:
+		key = reservoir.register(size=(32, 32), path=str(tmp_path), extension="png")
+
+		assert wait_for(lambda: reservoir.get_stats()[key]["ready"] == 1)
+
+		first = reservoir.get(size=(32, 32))
+		second = reservoir.get(size=(32, 32))
+
+		assert first == second and first.startswith(b"\x89PNG")
+		assert wait_for(lambda: reservoir.get_stats()[key]["ready"] == 1)
+		assert reservoir.get(size=(32, 32)) != first
+
+	assert os.listdir(os.path.join(tmp_path, "Images")) == []
+
+def test_failed_generations_are_reported(tmp_path):
+	with get_reservoir(target=2) as reservoir:
+		key = reservoir.register(size=(32, 32), path=str(tmp_path), extension="nope")
+
+		assert wait_for(lambda: reservoir.get_stats()[key]["failures"] >= 2)
+
+		stats = reservoir.get_stats()[key]
+
+		assert stats["ready"] == 0 and stats["pending"] <= 1 and stats["last_error"]
+
+def test_duplicate_pools_are_rejected(tmp_path):
+	reservoir = get_reservoir()
+	reservoir.register(size=(32, 32), path=str(tmp_path))
+
+	with pytest.raises(Exception, match="already registered"):
+		reservoir.register(size=(32, 32), path=str(tmp_path))
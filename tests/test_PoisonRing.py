@@ -0,0 +1,95 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonRing.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# The shared memory frame ring: slot reuse and ordered handoff from workers.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import multiprocessing, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonRing, Utils
+
+
+###############################################################################
+# Constants
+###############################################################################
+SHAPE = (4, 6, 3)
+
+
+###############################################################################
+# Workers
+###############################################################################
+WORKER_RING = None
+
+# Init Ring Worker
+def init_ring_worker(ring_arguments):
+	global WORKER_RING
+
+	WORKER_RING = PoisonRing.FrameRing(**ring_arguments)
+
+# Write Frame Worker
+def write_frame_worker(index):
+	# Early frames finish last, so the ring has to hold them back in order
+	time.sleep(0.02 * (index % 3 == 0))
+
+	return WORKER_RING.write(index, np.full(SHAPE, index, dtype=np.uint8))
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_frames_reuse_slots_in_turn():
+	with PoisonRing.FrameRing(SHAPE, 3) as ring:
+		assert [ring.write(index, np.full(SHAPE, index, dtype=np.uint8)) for index in range(5)] == [0, 1, 2, 0, 1]
+		assert ring.get_slot(4).max() == 4 and ring.get_slot(2).max() == 2
+
+def test_pooled_frames_are_consumed_in_order():
+	num_frames = 12
+	max_in_flight = 3
+
+	with PoisonRing.FrameRing(SHAPE, max_in_flight + 1) as ring:
+		with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork"),
+								 initializer=init_ring_worker, initargs=(ring.get_arguments(),)) as executor:
+			frames = [int(ring.get_slot(slot).max()) for slot in Utils.run_ordered(executor, write_frame_worker, [(index,) for index in range(num_frames)],
+																				  max_in_flight=max_in_flight)]
+
+	assert frames == list(range(num_frames))
+
+def test_attached_ring_shares_the_frames():
+	with PoisonRing.FrameRing(SHAPE, 2) as ring:
+		attached = PoisonRing.FrameRing(**ring.get_arguments())
+		attached.write(1, np.full(SHAPE, 7, dtype=np.uint8))
+
+		assert ring.get_slot(1).min() == 7
+
+		attached.close()
+
+def test_frames_of_another_shape_are_rejected():
+	with PoisonRing.FrameRing(SHAPE, 2) as ring:
+		with pytest.raises(Exception, match="the ring holds"):
+			ring.write(0, np.zeros((2, 2, 3), dtype=np.uint8))
+
+def test_closing_the_ring_frees_its_memory():
+	ring = PoisonRing.FrameRing(SHAPE, 2)
+	name = ring.get_arguments()["name"]
+	ring.close()
+
+	with pytest.raises(FileNotFoundError):
+		PoisonRing.FrameRing(SHAPE, 2, name=name)
@@ -0,0 +1,179 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonSynth.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# The numpy synthesis engine: note duration planning, streamed WAV output
+# and its loudness.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import io, multiprocessing, os, pickle, sys, wave
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonSynth
+
+
+###############################################################################
+# Classes
+###############################################################################
+
+# Pipe Sink Class
+class PipeSink(object):
+	""" Pipe Sink
+		:description:	Write only stream that cannot seek or tell, like a pipe
+	"""
+	def __init__(self):
+		self.chunks = []
+
+	def write(self, data):
+		self.chunks.append(bytes(data))
+		return len(data)
+
+	def flush(self):
+		pass
+
+	def getvalue(self):
+		return b"".join(self.chunks)
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Get Song
+def get_song(num_layers=8, num_notes=20):
+	rng = np.random.default_rng(3)
+	layers = [PoisonSynth.SynthLayer("sine", rng.uniform(100, 1000, num_notes), rng.integers(500, 5000, num_notes)) for _ in range(num_layers)]
+
+	return PoisonSynth.SynthSong(layers)
+
+# Read Wav
+def read_wav(data):
+	with wave.open(io.BytesIO(data), "rb") as wav_file:
+		return np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_song_streams_to_a_sink_that_cannot_seek():
+	song = get_song()
+	sink = PipeSink()
+	PoisonSynth.write_song(sink, song, block_size=4096)
+
+	assert len(read_wav(sink.getvalue())) == song.get_length()
+
+def test_header_is_yielded_before_any_samples():
+	header = next(PoisonSynth.iterate_wav(get_song()))
+
+	assert len(header) == 44 and header.startswith(b"RIFF")
+
+def test_streamed_song_matches_the_song_in_memory():
+	song = get_song()
+	buffer = io.BytesIO()
+	PoisonSynth.write_song(buffer, song, block_size=1000)
+
+	samples = song.render()
+	expected = (samples * (1 / np.max(np.abs(samples))) * 32767).astype(np.int16)
+
+	np.testing.assert_array_equal(read_wav(buffer.getvalue()), expected)
+
+def test_exact_peak_reaches_full_scale():
+	song = get_song()
+	buffer = io.BytesIO()
+	PoisonSynth.write_song(buffer, song)
+
+	assert song.get_peak() < song.get_peak_bound()
+	assert np.max(np.abs(read_wav(buffer.getvalue()))) == 32767
+
+def test_peak_bound_is_quieter_but_never_clips():
+	song = get_song()
+	exact, bound = io.BytesIO(), io.BytesIO()
+	PoisonSynth.write_song(exact, song)
+	PoisonSynth.write_song(bound, song, exact_peak=False)
+
+	assert np.max(np.abs(read_wav(bound.getvalue()))) < np.max(np.abs(read_wav(exact.getvalue())))
+
+def test_cached_notes_keep_their_exact_phase():
+	# About 5 samples per period, where rounding the phase to a sample was a 30 degree jump at every note and block
+	durations = np.random.default_rng(5).integers(1000, 90000, 12)
+	frequencies = np.full(12, 8372.0)
+
+	cached = PoisonSynth.SynthSong([PoisonSynth.SynthLayer("sine", frequencies, durations, clip_cache=PoisonSynth.ClipCache())])
+	direct = PoisonSynth.SynthSong([PoisonSynth.SynthLayer("sine", frequencies, durations)])
+
+	np.testing.assert_allclose(cached.render(), direct.render(), atol=1e-5)
+
+def test_only_sines_use_the_clip_cache():
+	clip_cache = PoisonSynth.ClipCache()
+
+	for signal in PoisonSynth.DICT_OF_WAVES:
+		layer = PoisonSynth.SynthLayer(signal, [440.0], [1000], clip_cache=clip_cache)
+
+		assert (layer.clip_cache is clip_cache) == (signal in PoisonSynth.LIST_OF_CLIP_SIGNALS)
+
+def test_clip_cache_evicts_the_least_recently_used_clip():
+	clip_cache = PoisonSynth.ClipCache(max_bytes=2 * 2 * 4 * 1000)
+
+	for increment in (0.01, 0.02, 0.01, 0.03):
+		clip_cache.get(increment, 1000)
+
+	assert list(clip_cache.clips) == [0.01, 0.03]
+	assert clip_cache.get_stats()["hits"] == 1
+
+def test_pooled_song_matches_the_serial_song():
+	song = get_song()
+	serial, pooled = io.BytesIO(), PipeSink()
+	PoisonSynth.write_song(serial, song, block_size=1000)
+
+	with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork"),
+							 initializer=PoisonSynth.init_song_worker, initargs=(song,)) as executor:
+		PoisonSynth.write_song(pooled, song, block_size=1000, executor=executor, max_in_flight=3)
+
+	assert pooled.getvalue() == serial.getvalue()
+
+def test_clip_cache_pickles_empty():
+	clip_cache = PoisonSynth.ClipCache()
+	clip_cache.get(0.01, 1000)
+
+	layer = pickle.loads(pickle.dumps(PoisonSynth.SynthLayer("sine", [440.0], [1000], clip_cache=clip_cache)))
+
+	assert len(layer.clip_cache) == 0 and layer.clip_cache.max_bytes == clip_cache.max_bytes
+
+@pytest.mark.parametrize("num_notes, length, max_duration", [(100, 5050, 100), (7, 7, 1), (10, 11, 2), (50, 4000, 100), (3, 1000, 5), (1, 9, 9), (200, 10100, 100)])
+def test_planned_durations_fill_every_layer_exactly(num_notes, length, max_duration):
+	durations = PoisonSynth.plan_durations(6, num_notes, length, max_duration, np.random.default_rng(num_notes))
+
+	np.testing.assert_array_equal(durations.sum(axis=1), length)
+
+	notes = durations[:, :num_notes]
+
+	assert notes.min() >= 1 and notes.max() <= max_duration
+
+	# A trailing rest only when num_notes notes of max_duration fall short
+	assert durations.shape[1] == num_notes + (num_notes * max_duration < length)
+
+def test_planned_durations_are_seeded():
+	plans = [PoisonSynth.plan_durations(4, 100, 5050, 100, np.random.default_rng(9)) for _ in range(2)]
+
+	np.testing.assert_array_equal(plans[0], plans[1])
+	assert len({tuple(layer) for layer in plans[0]}) == 4
+
+def test_too_many_notes_for_the_budget_are_rejected():
+	with pytest.raises(Exception, match="Cannot fit"):
+		PoisonSynth.plan_durations(1, 10, 9, 5, np.random.default_rng(0))
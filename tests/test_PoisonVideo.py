@@ -0,0 +1,198 @@
+###############################################################################
+# Program : Poison
+# File : test_PoisonVideo.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Video jobs in the pipe and files frame modes, run against a stand-in for
+# ffmpeg that records the frames and the song it was given.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import json, multiprocessing, os, stat, sys, threading
+
+import pytest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import PoisonVideo
+from PoisonImage import DICT_OF_COLORS
+from PoisonMusic import SAMPLE_RATE
+
+
+###############################################################################
+# Constants
+###############################################################################
+
+# Reads its inputs the way the commands built by PoisonVideo hand them over and writes what it got to the output file
+FAKE_FFMPEG = """
+import hashlib, json, os, sys
+
+import numpy as np
+from PIL import Image
+
+args = sys.argv[1:]
+inputs = [args[index + 1] for index, arg in enumerate(args) if arg == "-i"]
+frames = []
+
+if "rawvideo" in args:
+	width, height = map(int, args[args.index("-s") + 1].split("x"))
+
+	while True:
+		frame = sys.stdin.buffer.read(width * height * 3)
+
+		if not frame:
+			break
+
+		frames.append(hashlib.sha256(frame).hexdigest())
+
+else:
+	while os.path.isfile(inputs[0] % len(frames)):
+		frames.append(hashlib.sha256(np.array(Image.open(inputs[0] % len(frames)).convert("RGB")).tobytes()).hexdigest())
+
+with (os.fdopen(int(inputs[1][5:]), "rb") if inputs[1].startswith("pipe:") else open(inputs[1], "rb")) as f:
+	song = f.read()
+
+with open(args[-1], "w") as f:
+	f.write(json.dumps({"inputs": inputs, "frames": frames, "song": hashlib.sha256(song).hexdigest(), "song_bytes": len(song)}))
+
+sys.exit(int(os.environ.get("FAKE_FFMPEG_EXIT", "0")))
+"""
+
+# Two beats of one second each, so every video has two frames
+CONFIG = {"mode": "light", "max_percent": 100, "max_threshold": 100, "max_kernel": [100, 10], "max_scale": 10, "max_offset": 10,
+		  "octave_range": "middle", "musical_key": "C", "key_type": "major", "num_notes": 2, "max_note_duration": 1,
+		  "song_duration": SAMPLE_RATE, "song_extension": "wav"}
+
+NUM_FRAMES = 2
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+# Fake Ffmpeg
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+	file_path = os.path.join(tmp_path, "ffmpeg")
+
+	with open(file_path, mode="w") as f:
+		f.write(f"#!{sys.executable}\n" + FAKE_FFMPEG)
+
+	os.chmod(file_path, os.stat(file_path).st_mode | stat.S_IXUSR)
+	monkeypatch.setattr(PoisonVideo, "FFMPEG_PATH", file_path)
+
+	return file_path
+
+# Get Video
+def get_video(frame_mode="pipe", frame_workers=1, **kwargs):
+	return PoisonVideo.PoisonVideo(config=CONFIG, frame_mode=frame_mode, frame_workers=frame_workers, **kwargs)
+
+# Generate
+def generate(video, path, seed=5):
+	with open(video.generate_video_simple(base_path=str(path), colors=DICT_OF_COLORS["pride"], seed=seed)) as f:
+		return json.loads(f.read())
+
+# List Files
+def list_files(path):
+	return sorted(os.path.relpath(os.path.join(root, file_name), path) for root, _, file_names in os.walk(path) for file_name in file_names)
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_pipe_mode_streams_frames_and_song_without_files(fake_ffmpeg, tmp_path):
+	path = os.path.join(tmp_path, "out")
+	result = generate(get_video("pipe"), path)
+
+	assert len(result["frames"]) == NUM_FRAMES
+	assert result["inputs"][0] == "-" and result["inputs"][1].startswith("pipe:")
+
+	# Shift and extend can make the song longer than planned, never shorter
+	assert result["song_bytes"] >= 44 + NUM_FRAMES * SAMPLE_RATE * 2
+
+	# Only the video is left behind
+	assert [os.path.dirname(file_name) for file_name in list_files(path)] == ["Videos"]
+
+def test_pipe_and_files_modes_encode_the_same_video(fake_ffmpeg, tmp_path):
+	piped = generate(get_video("pipe"), os.path.join(tmp_path, "pipe"))
+	files = generate(get_video("files"), os.path.join(tmp_path, "files"))
+
+	assert piped["frames"] == files["frames"] and piped["song"] == files["song"]
+	assert [os.path.dirname(file_name) for file_name in list_files(os.path.join(tmp_path, "files"))] == ["Videos"]
+
+def test_jobs_side_by_side_keep_to_their_own_workspaces(fake_ffmpeg, tmp_path):
+	path = os.path.join(tmp_path, "out")
+	file_names = list(get_video("files").generate_videos(3, workers=2, mp_context=multiprocessing.get_context("fork"), seed=9,
+															 base_path=path, colors=DICT_OF_COLORS["pride"]))
+
+	results = []
+	for file_name in file_names:
+		with open(file_name) as f:
+			results.append(json.loads(f.read()))
+
+	assert len(set(file_names)) == 3 and all(len(result["frames"]) == NUM_FRAMES for result in results)
+	assert len({result["song"] for result in results}) == 3
+	assert sorted(list_files(path)) == sorted(os.path.relpath(file_name, path) for file_name in file_names)
+
+@pytest.mark.parametrize("frame_mode", PoisonVideo.LIST_OF_FRAME_MODES)
+def test_failed_encodes_leave_nothing_behind(fake_ffmpeg, tmp_path, monkeypatch, frame_mode):
+	monkeypatch.setenv("FAKE_FFMPEG_EXIT", "1")
+
+	with pytest.raises(Exception, match="ffmpeg exited with 1"):
+		generate(get_video(frame_mode), tmp_path)
+
+	assert list_files(tmp_path) == ["ffmpeg"]
+
+def test_pooled_frames_reach_ffmpeg_in_order(fake_ffmpeg, tmp_path):
+	serial = generate(get_video("pipe"), os.path.join(tmp_path, "serial"))
+
+	# One frame in flight, so the ring reuses its two slots for every frame
+	pooled = generate(get_video("pipe", frame_workers=2, max_frames_in_flight=1), os.path.join(tmp_path, "pooled"))
+
+	assert pooled["frames"] == serial["frames"]
+
+@pytest.mark.parametrize("frame_mode", PoisonVideo.LIST_OF_FRAME_MODES)
+def test_song_renders_while_the_frames_do(fake_ffmpeg, tmp_path, frame_mode):
+	video = get_video(frame_mode)
+	song_started = threading.Event()
+	overlapped = []
+
+	generate_music_simple = video.music.generate_music_simple
+	generate_image_simple = video.image.generate_image_simple
+
+	def run_music(**kwargs):
+		song_started.set()
+		return generate_music_simple(**kwargs)
+
+	def run_image(**kwargs):
+		overlapped.append(song_started.wait(timeout=10))
+		return generate_image_simple(**kwargs)
+
+	video.music.generate_music_simple = run_music
+	video.image.generate_image_simple = run_image
+
+	assert len(generate(video, tmp_path)["frames"]) == NUM_FRAMES
+	assert overlapped == [True] * NUM_FRAMES
+
+@pytest.mark.parametrize("frame_mode", PoisonVideo.LIST_OF_FRAME_MODES)
+def test_failed_songs_fail_the_video(fake_ffmpeg, tmp_path, frame_mode):
+	video = get_video(frame_mode)
+
+	def fail(**kwargs):
+		raise Exception("no song")
+
+	video.music.generate_music_simple = fail
+
+	with pytest.raises(Exception, match="Song could not be generated due to: no song"):
+		generate(video, tmp_path)
+
+	assert list_files(tmp_path) == ["ffmpeg"]
@@ -0,0 +1,60 @@
+###############################################################################
+# Program : Poison
+# File : test_Utils.py
+# Author : agent
+# Created : Oct 18, 2026
+# Copyright : agent @ 2026
+# License : CC BY-NC 4.0
+#
+# Shared helpers: render deadlines.
+###############################################################################
+
+###############################################################################
+# Imports
+###############################################################################
+import os, sys, threading, time
+
+import pytest
+
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+sys.path.insert(0, SOURCE_PATH)
+sys.path.insert(0, os.path.join(SOURCE_PATH, "Poison"))
+
+import Utils
+
+
+###############################################################################
+# Tests
+###############################################################################
+
+def test_deadline_without_a_budget_never_expires():
+	deadline = Utils.Deadline()
+
+	assert not deadline.expired() and deadline.remaining_ms() is None
+
+def test_zero_deadline_is_expired_right_away():
+	deadline = Utils.Deadline(0)
+
+	assert deadline.expired() and deadline.remaining_ms() == 0.0
+
+def test_deadline_expires_once_its_budget_is_spent():
+	deadline = Utils.Deadline(50)
+
+	assert not deadline.expired() and 0.0 < deadline.remaining_ms() <= 50.0
+
+	time.sleep(0.06)
+
+	assert deadline.expired() and deadline.remaining_ms() == 0.0 and deadline.elapsed_ms() >= 50.0
+
+def test_deadline_works_off_the_main_thread():
+	results = []
+	thread = threading.Thread(target=lambda: results.append((Utils.Deadline(0).expired(), Utils.Deadline(10000).expired())))
+	thread.start()
+	thread.join()
+
+	assert results == [(True, False)]
+
+def test_negative_deadlines_are_rejected():
+	with pytest.raises(Exception, match="non-negative"):
+		Utils.Deadline(-1)